@@ -1,14 +1,16 @@
-import json
+import os
+import time
 import networkx as nx
 from functools import partial
+from concurrent.futures import ProcessPoolExecutor
 from sim.graph_model import GraphModel
 from sim.distance_metrics import euclidean_distance
-from solvers.convert import convert_distance_matrix_to_string, render_tsplib_file
+from sim.utils import load_points
+from solvers.convert import binary_matrix_path, render_tsplib_file
 
 a_star_shortest_path = partial(nx.astar_path, heuristic=euclidean_distance)
-a_star_shortest_path_length = partial(
-    nx.astar_path_length, heuristic=euclidean_distance
-)
+
+Scenario = tuple[int, int, int]
 
 scenarios = [
     (3, 0, 0), (3, 2, 8), (3, 3, 8), (3, 4, 7),
@@ -17,32 +19,93 @@ scenarios = [
     (6, 1, 4), (6, 2, 3), (6, 3, 2), (6, 4, 0)
 ]
 
-for scenario in scenarios:
+STAGES = ("load", "insert", "matrix", "render")
+
+
+def scenario_paths(scenario: Scenario, output_dir: str) -> tuple[str, str, str]:
+    """Returns the graph, packages and TSPLIB paths of a scenario."""
     gen, n, m = scenario
-    graph_data_path = f"gen{gen}/visibility_graph-{n}-{m}.json"
-    packages_path = f"gen{gen}/packages-{n}-{m}.json"
+    # prefer the binary format when the generator wrote it
+    extension = "npz" if os.path.exists(f"gen{gen}/visibility_graph-{n}-{m}.npz") else "json"
+    graph_data_path = f"gen{gen}/visibility_graph-{n}-{m}.{extension}"
+    packages_path = f"gen{gen}/packages-{n}-{m}.{extension}"
+    tsplib_path = f"{output_dir}/custom-{gen}-{m}-{n}.tsp"
+    return graph_data_path, packages_path, tsplib_path
+
+
+def is_up_to_date(scenario: Scenario, output_dir: str) -> bool:
+    """Whether both the TSPLIB file and its binary twin exist and are newer than the scenario's inputs."""
+    graph_data_path, packages_path, tsplib_path = scenario_paths(scenario, output_dir)
+    outputs = [tsplib_path, binary_matrix_path(tsplib_path)]
+    if not all(os.path.exists(output) for output in outputs):
+        return False
+    newest_input = max(os.path.getmtime(graph_data_path), os.path.getmtime(packages_path))
+    return min(os.path.getmtime(output) for output in outputs) > newest_input
+
+
+def build_scenario(scenario: Scenario, output_dir: str) -> tuple[str, dict[str, float]]:
+    """Renders the TSPLIB file of a single scenario and returns its path with per-stage timings in seconds."""
+    gen, n, m = scenario
+    graph_data_path, packages_path, _ = scenario_paths(scenario, output_dir)
     name = f"custom-{gen}-{m}-{n}"
+    timings = {}
 
+    start = time.perf_counter()
     model = GraphModel(
         data_path=graph_data_path,
         sp_alg=a_star_shortest_path,
-        sp_length_alg=a_star_shortest_path_length,
         distance_metric=euclidean_distance
     )
+    nodes = load_points(packages_path)
+    timings["load"] = time.perf_counter() - start
 
-
-    with open(packages_path) as f:
-        nodes = json.load(f)["nodes"]
-
+    start = time.perf_counter()
     for node in nodes:
-        model.insert_node(tuple(node))
+        model.insert_node(node)
+    timings["insert"] = time.perf_counter() - start
 
+    start = time.perf_counter()
     matrix = model.create_distance_matrix()
+    timings["matrix"] = time.perf_counter() - start
 
-    m = convert_distance_matrix_to_string(matrix)
-
+    start = time.perf_counter()
     tsplib_file = render_tsplib_file(
-        name=name, dimension=len(matrix), distance_matrix=m, output_dir="custom_tsplibs"
+        name=name,
+        dimension=len(matrix),
+        distance_matrix=matrix,
+        output_dir=output_dir,
     )
+    timings["render"] = time.perf_counter() - start
+
+    return tsplib_file, timings
+
+
+def build_custom_suite(
+    scenarios: list[Scenario] = scenarios,
+    output_dir: str = "custom_tsplibs",
+    max_workers: int | None = None,
+    force: bool = False,
+) -> dict[str, dict[str, float]]:
+    """Renders every out-of-date scenario in a process pool.
+    Returns per-stage timings keyed by the rendered TSPLIB path; skipped scenarios are not included.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    pending = [s for s in scenarios if force or not is_up_to_date(s, output_dir)]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(build_scenario, s, output_dir) for s in pending]
+        return dict(future.result() for future in futures)
+
+
+def print_timings(timings: dict[str, dict[str, float]]) -> None:
+    for tsplib_file, stages in timings.items():
+        stage_report = ", ".join(f"{stage}: {stages[stage]:.3f}s" for stage in STAGES)
+        print(f"{tsplib_file} ({stage_report})")
+    for stage in STAGES:
+        print(f"total {stage}: {sum(t[stage] for t in timings.values()):.3f}s")
+
 
-    print(tsplib_file)
+if __name__ == "__main__":
+    start = time.perf_counter()
+    timings = build_custom_suite()
+    print_timings(timings)
+    print(f"Rendered {len(timings)} of {len(scenarios)} scenarios in {time.perf_counter() - start:.3f}s.")
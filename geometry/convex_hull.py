@@ -1,12 +1,7 @@
-import sympy as smp
-from typing import List
+import numpy as np
 from enum import Enum, auto
-from operator import attrgetter
 
-
-def sort_lexicographically(points: List[smp.Point2D]) -> List[smp.Point2D]:
-    """Returns points sorted by x and y coordinate."""
-    return sorted(sorted(points, key=attrgetter("y")), key=attrgetter("x"))
+EPS = 1e-9
 
 
 class Colocation(Enum):
@@ -15,35 +10,49 @@ class Colocation(Enum):
     COLINEAR = auto()
 
 
+def orientation(p: np.ndarray, q: np.ndarray, r: np.ndarray) -> np.ndarray:
+    """Twice the signed area of the triangle pqr, positive if r lies left of the directed line through p and q.
+    Broadcasts over leading axes.
+    """
+    return (q[..., 0] - p[..., 0]) * (r[..., 1] - p[..., 1]) - (q[..., 1] - p[..., 1]) * (r[..., 0] - p[..., 0])
+
+
 def determine_point_colocation(
-    p: smp.Point2D, q: smp.Point2D, r: smp.Point2D, eps: float = 0
+    p: np.ndarray, q: np.ndarray, r: np.ndarray, eps: float = EPS
 ) -> Colocation:
     """Determines whether r lies left or right of the directed line through two points p and q."""
-    det = q.x * (r.y - p.y) + p.x * (q.y - r.y) + r.x * (p.y - q.y)
+    det = orientation(np.asarray(p), np.asarray(q), np.asarray(r))
     if det > eps:
         return Colocation.LEFT
-    elif det < eps:
+    elif det < -eps:
         return Colocation.RIGHT
     else:
         return Colocation.COLINEAR
 
 
-def convex_hull(points: List[smp.Point2D]) -> List[smp.Point2D]:
-    p = sort_lexicographically(points)
-    L_upper = [p[0], p[1]]
-    for i in range(2, len(points)):
-        L_upper.append(p[i])
-        while (
-            len(L_upper) > 2
-            and determine_point_colocation(*L_upper[-3:]) != Colocation.RIGHT
-        ):
-            L_upper.remove(L_upper[-2])
-    L_lower = [p[-1], p[-2]]
-    for i in reversed(range(len(points) - 2)):
-        L_lower.append(p[i])
-        while (
-            len(L_lower) > 2
-            and determine_point_colocation(*L_lower[-3:]) != Colocation.RIGHT
-        ):
-            L_lower.remove(L_lower[-2])
-    return L_upper + L_lower
+def _half_hull(points: np.ndarray, eps: float) -> np.ndarray:
+    """Clockwise half hull of points sorted by x and y.
+    Every point that does not make a right turn with its neighbours lies on or below the segment between them,
+    so all of them are dropped at once, pass after pass, until only right turns are left.
+    """
+    hull = points
+    while len(hull) > 2:
+        right_turns = orientation(hull[:-2], hull[1:-1], hull[2:]) < -eps
+        if right_turns.all():
+            break
+        hull = hull[np.concatenate(([True], right_turns, [True]))]
+    return hull
+
+
+def convex_hull(points: np.ndarray, eps: float = EPS) -> np.ndarray:
+    """Andrew's monotone chain on an (n, 2) array.
+    Returns the hull vertices clockwise, starting from the lexicographically smallest point,
+    without repeated or colinear vertices.
+    """
+    # np.unique sorts the points by x and y coordinate
+    p = np.unique(np.asarray(points, dtype=float).reshape(-1, 2), axis=0)
+    if len(p) < 3:
+        return p
+    upper = _half_hull(p, eps)
+    lower = _half_hull(p[::-1], eps)
+    return np.vstack((upper[:-1], lower[:-1]))
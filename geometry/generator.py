@@ -1,28 +1,31 @@
-import random
-import heapq
 import math
+import os
 import json
+import hashlib
 import numpy as np
-import sympy as smp
-import matplotlib.pyplot as plt
-import pyvisgraph as vg
-from copy import deepcopy
-from typing import Callable
-from functools import partial
-from convex_hull import convex_hull
+from typing import Callable, NamedTuple
+from functools import partial, lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from geometry.convex_hull import convex_hull
+from geometry.visibility import ObstacleEdgeIndex, DisconnectedGraphError, nearest_visible, connect_components
 
 
 Coordinate = tuple[int, int]
-Sampler = Callable[[], vg.Point]
-ProximityEstimator = Callable[[vg.Point], int]
-PointMerger = Callable[[list[vg.Point]], list[vg.Point]]
-
-
-def point_to_coord(point: vg.Point | smp.Point2D) -> Coordinate:
+# spacing of the layout vectors and the vertex counts of their polygons
+VECTOR_LENGTH = 8
+MIN_VERTICES = 4
+MAX_VERTICES = 8
+# bump whenever the way layouts are built changes, so cached obstacles are rebuilt
+LAYOUT_CACHE_VERSION = 1
+Sampler = Callable[[int], np.ndarray]
+ProximityEstimator = Callable[[np.ndarray], int]
+PointMerger = Callable[[np.ndarray], np.ndarray]
+
+
+def points_to_coords(points: np.ndarray, map_size: int) -> list[Coordinate]:
     "Coordinates are meant to be in mm, but the generator operates on cm."
-    x = abs(point.x - MAP_SIZE)
-    y = abs(point.y - MAP_SIZE)
-    return int(x * 10), int(y * 10)
+    coords = (np.abs(np.asarray(points, dtype=float) - map_size) * 10).astype(int)
+    return [tuple(c) for c in coords.tolist()]
 
 
 def save_polygons_to_json(
@@ -42,6 +45,23 @@ def save_graph_to_json(
         json.dump(data, f, indent=4)
 
 
+def save_polygons_to_npz(polygons: list[list[Coordinate]], save_file: str = "polygon.npz") -> None:
+    vertices = np.array([v for polygon in polygons for v in polygon], dtype=np.int32).reshape(-1, 2)
+    polygon_ids = np.repeat(np.arange(len(polygons), dtype=np.int32), [len(polygon) for polygon in polygons])
+    np.savez(save_file, vertices=vertices, polygon_ids=polygon_ids)
+
+
+def save_graph_to_npz(
+    nodes: list[Coordinate], edges: np.ndarray, save_file: str = "visibility_graph.npz"
+) -> None:
+    """Saves nodes as an int32 (n, 2) array and edges as an int32 array of node index pairs."""
+    np.savez(
+        save_file,
+        nodes=np.array(nodes, dtype=np.int32).reshape(-1, 2),
+        edges=np.asarray(edges, dtype=np.int32).reshape(-1, 2),
+    )
+
+
 def save_board_dimensions(
     length: int, width: int, save_file: str = "dimensions.json"
 ) -> None:
@@ -54,84 +74,58 @@ def save_board_dimensions(
 
 
 def save_points_of_interest(points_of_interest, save_file: str) -> None:
+    if save_file.endswith(".npz"):
+        np.savez(save_file, nodes=np.array(points_of_interest, dtype=np.int32).reshape(-1, 2))
+        return
     with open(save_file, "w") as f:
         data = {"nodes": points_of_interest}
         json.dump(data, f, indent=4)
 
 
 def create_polygon(
-    n_sides: int, center_x: int, center_y: int, radius: int
-) -> list[smp.Point2D]:
-    vertices = []
-    for i in range(n_sides):
-        angle = 2 * math.pi * i / n_sides
-        x = center_x + radius * math.cos(angle) + random.randint(-1, 1)
-        y = center_y + radius * math.sin(angle) + random.randint(-1, 1)
-        vertices.append(smp.Point2D(x, y))
-    return vertices
-
-
-def plot_polygon(vertices: list[vg.Point | smp.Point2D]) -> None:
-    xh = [p.x for p in vertices]
-    yh = [p.y for p in vertices]
-    plt.plot(xh, yh, "o-")
-
-
-def plot_free_states(points: list[vg.Point | smp.Point2D]) -> None:
-    xh = [p.x for p in points]
-    yh = [p.y for p in points]
-    plt.plot(xh, yh, "ro")
-
-
-def plot_edges(
-    edges: list[tuple[vg.Point | smp.Point2D, vg.Point | smp.Point2D]]
-) -> None:
-    for edge in edges:
-        xs = [edge[0].x, edge[1].x]
-        ys = [edge[0].y, edge[1].y]
-        plt.plot(xs, ys, "b--")
-
-
-def merge_points(points: list[vg.Point], radius: int) -> list[vg.Point]:
+    n_sides: int, center_x: int, center_y: int, radius: int, rng: np.random.Generator
+) -> np.ndarray:
+    angles = 2 * np.pi * np.arange(n_sides) / n_sides
+    jitter = rng.integers(-1, 2, size=(n_sides, 2))
+    circle = radius * np.column_stack((np.cos(angles), np.sin(angles)))
+    return np.array((center_x, center_y), dtype=float) + circle + jitter
+
+
+def merge_points(points: np.ndarray, radius: int) -> np.ndarray:
+    """Keeps points that are farther than radius from every point kept before them.
+    Kept points are hashed into a grid with the cell size equal to the radius,
+    so only the 3x3 neighbourhood of a cell has to be checked.
+    """
+    cell_size = max(radius, 1)
+    grid: dict[tuple[int, int], list[tuple[float, float]]] = {}
     merged_points = []
-    for point in points:
-        close_enough = False
-        for merged_point in merged_points:
-            dx = point.x - merged_point.x
-            dy = point.y - merged_point.y
-            distance = math.sqrt(dx * dx + dy * dy)
-            if distance <= radius:
-                close_enough = True
-                break
+    for x, y in np.asarray(points).tolist():
+        cx = math.floor(x / cell_size)
+        cy = math.floor(y / cell_size)
+        close_enough = any(
+            math.hypot(x - mx, y - my) <= radius
+            for dx in (-1, 0, 1)
+            for dy in (-1, 0, 1)
+            for mx, my in grid.get((cx + dx, cy + dy), ())
+        )
         if not close_enough:
-            merged_points.append(point)
-
-    return merged_points
-
+            merged_points.append((x, y))
+            grid.setdefault((cx, cy), []).append((x, y))
 
-def distance_between_points(p1: vg.Point, p2: vg.Point) -> float:
-    dx = p1.x - p2.x
-    dy = p1.y - p2.y
-    return (dx * dx + dy * dy) ** 0.5
+    return np.array(merged_points, dtype=np.asarray(points).dtype).reshape(-1, 2)
 
 
 def find_k_nearest_visible_points(
-    point: vg.Point, points: list[vg.Point], k: int, graph: vg.VisGraph
-) -> list[vg.Point]:
-    heap = []
-    for p in points:
-        distance = distance_between_points(p, point)
-        # if the distance is equal to the SP then it is a straight path
-        # (nodes are visible from each other's POV)
-        if abs(graph.shortest_path(point, p)[0] - distance) <= 0.1:
-            heap.append((distance, p))
-    return [p for _, p in heapq.nsmallest(k, heap)]
+    point: np.ndarray, points: np.ndarray, k: int, obstacles: ObstacleEdgeIndex
+) -> np.ndarray:
+    coords = np.vstack((point, points))
+    return points[[idx - 1 for idx in nearest_visible(0, coords, k, obstacles)]]
 
 
 def base_proximity_estimator(
-    point: vg.Point, center: vg.Point, sigma: int | float
+    point: np.ndarray, center: np.ndarray, sigma: int | float
 ) -> int:
-    distance = distance_between_points(point, center)
+    distance = math.dist(point, center)
     if distance <= sigma:
         return 5
     elif distance <= 2 * sigma:
@@ -141,119 +135,105 @@ def base_proximity_estimator(
 
 
 def create_edges(
-    points: list[vg.Point],
-    graph: vg.VisGraph,
+    points: np.ndarray,
+    obstacles: ObstacleEdgeIndex,
     proximity_estimator: ProximityEstimator,
-) -> list[tuple[vg.Point, vg.Point]]:
+) -> np.ndarray:
+    """Connects every point with its k nearest visible points and returns the edges as pairs of point indices."""
+    coords = np.asarray(points, dtype=float)
     edges = []
-    for point in points:
-        neighbours = points[::]
-        neighbours.remove(point)
+    seen = set()
+    for i, point in enumerate(coords):
         k = proximity_estimator(point)
-        nearest = find_k_nearest_visible_points(point, neighbours, k=k, graph=graph)
-        for p in nearest:
-            if (point, p) in edges or (p, point) in edges:
+        for j in nearest_visible(i, coords, k, obstacles):
+            if frozenset((i, j)) in seen:
                 continue
-            edges.append((p, point))
-    return edges
+            seen.add(frozenset((i, j)))
+            edges.append((j, i))
+    return np.array(edges, dtype=int).reshape(-1, 2)
 
 
-def create_vectors(width: int, heigth: int, base_length: int = 10) -> list[smp.Point2D]:
+def create_vectors(width: int, heigth: int, base_length: int = 10) -> np.ndarray:
     width += 1
     heigth += 1
     if width <= 2 and heigth <= 2:
-        return [smp.Point2D(0, 0)]
-    vectors = []
-    for i in range(heigth):
-        for j in range(width):
-            if (i + j) % 2 != 0:
-                continue
-            vectors.append(smp.Point(i * base_length, j * base_length))
-    return vectors
-
-
-def calculate_centroid(points) -> smp.Point2D:
-    sum_x = 0
-    sum_y = 0
-    for point in points:
-        sum_x += point.x
-        sum_y += point.y
-    n = len(points)
-    centroid_x = int(sum_x / n)
-    centroid_y = int(sum_y / n)
-    return smp.Point2D(centroid_x, centroid_y)
+        return np.zeros((1, 2), dtype=int)
+    i, j = np.meshgrid(np.arange(heigth), np.arange(width), indexing="ij")
+    on_grid = (i + j) % 2 == 0
+    return np.column_stack((i[on_grid], j[on_grid])) * base_length
 
 
-def smp_points_to_vg(points: list[smp.Point2D]) -> list[vg.Point]:
-    return [vg.Point(p.x, p.y) for p in points]
+def calculate_centroid(points: np.ndarray) -> np.ndarray:
+    return np.trunc(np.asarray(points).mean(axis=0)).astype(int)
 
 
-def create_vg_polys(polygons: list[list[smp.Point2D]]) -> list[list[vg.Point]]:
-    return [smp_points_to_vg(poly) for poly in polygons]
+def sample_normal_points(n: int, center: np.ndarray, sigma: int, rng: np.random.Generator) -> np.ndarray:
+    """Draws n integer points from a normal distribution around the center (truncated towards zero)."""
+    return rng.normal(loc=center, scale=sigma, size=(n, 2)).astype(int)
 
 
 class Layout:
     def __init__(
-        self, vectors: list[smp.Point2D], radius_estimator: ProximityEstimator
+        self,
+        vectors: np.ndarray,
+        radius_estimator: ProximityEstimator,
+        rng: np.random.Generator | None = None,
     ) -> None:
         self.vectors = vectors
-        self.figure_id = hash(self)
-        self._polygons: list[list[smp.Point2D]] = None
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self._polygons: list[np.ndarray] = None
         self.radius_estimator = radius_estimator
 
     @property
-    def polygons(self) -> list[list[smp.Point2D]]:
+    def polygons(self) -> list[np.ndarray]:
         if self._polygons is None:
             raise ValueError("There are no polygons in the layout.")
-        return deepcopy(self._polygons)
+        # the polygon arrays are read-only, so they can be shared without copying
+        return list(self._polygons)
 
     def create_polygons(
         self,
-        min_vertices: int = 4,
-        max_vertices: int = 8,
+        min_vertices: int = MIN_VERTICES,
+        max_vertices: int = MAX_VERTICES,
     ) -> None:
 
-        self._clear_layout()
+        self._polygons = None
 
         polygons = []
         for vector in self.vectors:
             vertices = create_polygon(
-                n_sides=random.randint(min_vertices, max_vertices),
-                center_x=vector.x,
-                center_y=vector.y,
+                n_sides=int(self.rng.integers(min_vertices, max_vertices + 1)),
+                center_x=vector[0],
+                center_y=vector[1],
                 radius=self.radius_estimator(vector),
+                rng=self.rng,
             )
             polygon = convex_hull(vertices)
+            polygon.flags.writeable = False
             polygons.append(polygon)
-
-            self._plot_polygon(polygon)
         self._polygons = polygons
 
-    def _clear_layout(self) -> None:
-        plt.figure(self.figure_id)
-        plt.clf()
-        self._polygons = None
-
-    def _plot_polygon(self, polygon: list[smp.Point2D]) -> None:
-        plt.figure(self.figure_id)
-        plot_polygon(polygon)
-
     def show(self) -> None:
-        plt.figure(self.figure_id)
-        plt.show()
+        from geometry.render import render_graph
+
+        render_graph(self.polygons, show=True)
 
-    def save(self, save_file: str) -> None:
-        polys = [[point_to_coord(v) for v in poly] for poly in self.polygons]
-        save_polygons_to_json(polys, save_file)
+    def save(self, save_file: str, map_size: int) -> None:
+        polys = [points_to_coords(poly, map_size) for poly in self.polygons]
+        if save_file.endswith(".npz"):
+            save_polygons_to_npz(polys, save_file)
+        else:
+            save_polygons_to_json(polys, save_file)
 
 
 class VisibilityGraph:
     def __init__(
         self,
-        polygons: list[list[vg.Point]],
+        polygons: list[np.ndarray],
         sampler: Sampler,
         proximity_estimator: ProximityEstimator,
         point_merger: PointMerger,
+        obstacles: ObstacleEdgeIndex | None = None,
     ) -> None:
         self.polygons = polygons
 
@@ -261,92 +241,211 @@ class VisibilityGraph:
         self.proximity_estimator = proximity_estimator
         self.point_merger = point_merger
 
-        self.vis_graph = vg.VisGraph()
-        self.figure_id = hash(self)
-
-        self.vis_graph.build(deepcopy(self.polygons))
+        self.obstacles = obstacles if obstacles is not None else ObstacleEdgeIndex(self.polygons)
 
         self._nodes = None
         self._edges = None
 
     @property
-    def nodes(self):
+    def nodes(self) -> np.ndarray:
         if self._nodes is None:
             raise ValueError("The visibility graph has no nodes.")
         return self._nodes
 
     @property
-    def edges(self):
+    def edges(self) -> np.ndarray:
         if self._edges is None:
             raise ValueError("The visibility graph has no edges.")
         return self._edges
 
     def create_graph(self, sample_size: int, retries: int = 5) -> None:
+        """Samples nodes and connects them. Disconnected samples are repaired by linking their components;
+        a new sample is drawn only if some component cannot see the rest of the graph.
+        """
+        for _ in range(retries):
+            self._clear_visibility_graph()
+            self._create_nodes(sample_size)
+            try:
+                self._create_edges()
+                return
+            except DisconnectedGraphError:
+                print("Generated visibility graph cannot be connected.")
+                print("Retrying...")
         self._clear_visibility_graph()
-        if retries <= 0:
-            raise ValueError("There are no retries left.")
-
-        self._create_nodes(sample_size)
-        try:
-            self._create_edges()
-        except KeyError:
-            print("Generated visibility graph is disconnected.")
-            print("Retrying...")
-            retries -= 1
-            self.create_graph(sample_size, retries)
-
-        self._plot_edges()
-        self._plot_nodes()
+        raise ValueError("There are no retries left.")
 
     def _create_nodes(self, sample_size: int) -> None:
-        samples = []
-        for _ in range(sample_size):
-            free_state = None
-            p = None
-            while free_state != -1 or p in samples:
-                p = self.sampler()
-                free_state = self.vis_graph.point_in_polygon(p)
-            samples.append(p)
-        self._nodes = self.point_merger(samples)
+        # dict keys keep the sampling order and reject duplicates in O(1)
+        samples: dict[tuple[int, int], None] = {}
+        while len(samples) < sample_size:
+            batch = self.sampler(sample_size - len(samples))
+            for p in map(tuple, batch[~self.obstacles.contains(batch)].tolist()):
+                samples.setdefault(p, None)
+                if len(samples) == sample_size:
+                    break
+        self._nodes = self.point_merger(np.array(list(samples), dtype=int).reshape(-1, 2))
 
     def _create_edges(self) -> None:
-        self._edges = create_edges(self.nodes, self.vis_graph, self.proximity_estimator)
+        edges = create_edges(self.nodes, self.obstacles, self.proximity_estimator)
+        self._edges = connect_components(self.nodes.astype(float), edges, self.obstacles)
 
     def _clear_visibility_graph(self) -> None:
-        plt.figure(self.figure_id)
-        plt.clf()
         self._nodes = None
         self._edges = None
 
-    def _plot_polygons(self) -> None:
-        plt.figure(self.figure_id)
-        for polygon in self.polygons:
-            plot_polygon(polygon)
+    def render(
+        self, points_of_interest: np.ndarray | None = None, save_file: str | None = None, show: bool = False
+    ) -> None:
+        from geometry.render import render_graph
+
+        render_graph(
+            self.polygons,
+            nodes=self.nodes,
+            edges=self.nodes[self.edges],
+            points_of_interest=points_of_interest,
+            save_file=save_file,
+            show=show,
+        )
 
-    def _plot_edges(self) -> None:
-        plt.figure(self.figure_id)
-        plot_edges(self._edges)
+    def show(self) -> None:
+        self.render(show=True)
 
-    def _plot_nodes(self) -> None:
-        plt.figure(self.figure_id)
-        plot_free_states(self._nodes)
+    def save_figure(self, save_file: str, points_of_interest: np.ndarray | None = None) -> None:
+        self.render(points_of_interest, save_file=save_file)
 
-    def show(self) -> None:
-        plt.figure(self.figure_id)
-        self._plot_polygons()
-        plt.show()
-    
-    def save_figure(self, save_file: str) -> None:
-        plt.figure(self.figure_id)
-        self._plot_polygons()
-        plt.savefig(save_file, format='png')
-
-    def save(self, save_file: str) -> None:
-        nodes = [point_to_coord(p) for p in self._nodes]
-        edges = [(point_to_coord(e[0]), point_to_coord(e[1])) for e in self._edges]
+    def save(self, save_file: str, map_size: int) -> None:
+        nodes = points_to_coords(self._nodes, map_size)
+        if save_file.endswith(".npz"):
+            save_graph_to_npz(nodes, self._edges, save_file)
+            return
+        edges = [(nodes[start], nodes[end]) for start, end in self._edges.tolist()]
         save_graph_to_json(nodes, edges, save_file)
 
 
+class GenerationSettings(NamedTuple):
+    sigma: int
+    n_samples: int
+    vector_width: int
+    vector_heigth: int
+    map_size: int
+    save_directory: str
+    save_figures: bool = False
+    file_format: str = "json"
+
+
+def derive_rng(master_seed: int, *key: int) -> np.random.Generator:
+    """Creates an independent generator for a job, so results don't depend on the order or process it runs in."""
+    return np.random.default_rng(np.random.SeedSequence(master_seed, spawn_key=key))
+
+
+def layout_cache_file(settings: GenerationSettings, nth_layout: int, master_seed: int) -> str:
+    """Cache file named by a digest of every parameter the layout's polygons depend on and the cache version."""
+    key = {
+        "version": LAYOUT_CACHE_VERSION,
+        "vector_width": settings.vector_width,
+        "vector_heigth": settings.vector_heigth,
+        "vector_length": VECTOR_LENGTH,
+        "sigma": settings.sigma,
+        "min_vertices": MIN_VERTICES,
+        "max_vertices": MAX_VERTICES,
+        "master_seed": master_seed,
+        "nth_layout": nth_layout,
+    }
+    digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16]
+    return f"{settings.save_directory}/.cache/layout-{digest}.npz"
+
+
+@lru_cache(maxsize=None)
+def load_layout_obstacles(settings: GenerationSettings, nth_layout: int, master_seed: int) -> ObstacleEdgeIndex:
+    """Returns the obstacles of the nth layout, cached per process and on disk.
+    The layout is built from its own seed, so every graph job of a layout sees the same polygons.
+    """
+    cache_file = layout_cache_file(settings, nth_layout, master_seed)
+    if os.path.exists(cache_file):
+        return ObstacleEdgeIndex.load(cache_file)
+
+    vectors = create_vectors(settings.vector_width, settings.vector_heigth, base_length=VECTOR_LENGTH)
+    mu = calculate_centroid(vectors)
+    layout = Layout(
+        vectors,
+        radius_estimator=partial(
+            base_proximity_estimator, center=mu, sigma=settings.sigma
+        ),
+        rng=derive_rng(master_seed, settings.vector_width, settings.vector_heigth, nth_layout, 0),
+    )
+    layout.create_polygons(MIN_VERTICES, MAX_VERTICES)
+    obstacles = ObstacleEdgeIndex(layout.polygons)
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    obstacles.save(cache_file)
+    return obstacles
+
+
+def generate_graph(settings: GenerationSettings, nth_layout: int, mth_graph: int, master_seed: int) -> bool:
+    """Generates and saves the mth graph of the nth layout. Returns False if the graph could not be created."""
+    vectors = create_vectors(settings.vector_width, settings.vector_heigth, base_length=VECTOR_LENGTH)
+    mu = calculate_centroid(vectors)
+    size_key = (settings.vector_width, settings.vector_heigth)
+    save_directory = settings.save_directory
+
+    obstacles = load_layout_obstacles(settings, nth_layout, master_seed)
+    polygons = obstacles.polygons
+
+    graph = VisibilityGraph(
+        polygons=polygons,
+        sampler=partial(
+            sample_normal_points,
+            center=mu,
+            sigma=settings.sigma,
+            rng=derive_rng(master_seed, *size_key, nth_layout, 1, mth_graph),
+        ),
+        proximity_estimator=partial(
+            base_proximity_estimator, center=mu, sigma=settings.sigma
+        ),
+        point_merger=partial(merge_points, radius=math.ceil(math.sqrt(settings.sigma))),
+        obstacles=obstacles,
+    )
+
+    try:
+        graph.create_graph(sample_size=settings.n_samples, retries=10)
+    except ValueError:
+        return False
+
+    points_of_interest = vectors
+    if settings.save_figures:
+        graph.save_figure(f"{save_directory}/fig-{nth_layout}-{mth_graph}.png", points_of_interest)
+
+    ext = settings.file_format
+    polys = [points_to_coords(polygon, settings.map_size) for polygon in polygons]
+    polygon_file = f"{save_directory}/polygon-{nth_layout}-{mth_graph}.{ext}"
+    if ext == "npz":
+        save_polygons_to_npz(polys, polygon_file)
+    else:
+        save_polygons_to_json(polys, polygon_file)
+    graph.save(f"{save_directory}/visibility_graph-{nth_layout}-{mth_graph}.{ext}", settings.map_size)
+    poi = points_to_coords(points_of_interest, settings.map_size)
+    save_points_of_interest(poi, save_file=f"{save_directory}/packages-{nth_layout}-{mth_graph}.{ext}")
+    return True
+
+
+def generation_jobs(
+    settings: GenerationSettings, n_layouts: int, m_graphs: int, master_seed: int
+) -> list[tuple[GenerationSettings, int, int, int]]:
+    return [
+        (settings, nth_layout, mth_graph, master_seed)
+        for nth_layout in range(n_layouts)
+        for mth_graph in range(m_graphs)
+    ]
+
+
+def run_generation_jobs(
+    jobs: list[tuple[GenerationSettings, int, int, int]], max_workers: int | None = None
+) -> list[bool]:
+    for settings, *_ in jobs:
+        os.makedirs(settings.save_directory, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(generate_graph, *zip(*jobs)))
+
+
 def generate_layout_with_graph(
     sigma: int,
     n_samples: int,
@@ -354,70 +453,34 @@ def generate_layout_with_graph(
     vector_heigth: int,
     save_directory: str,
     n_layouts: int,
-    m_graphs: int
-):
-    vectors = create_vectors(vector_width, vector_heigth, base_length=8)
-    mu = calculate_centroid(vectors)
-
-    def sample_point() -> vg.Point:
-        x = int(np.random.normal(loc=mu.x, scale=sigma))
-        y = int(np.random.normal(loc=mu.y, scale=sigma))
-        return vg.Point(x, y)
-    
-    for nth_layout in range(n_layouts):
-        layout = Layout(
-            vectors,
-            radius_estimator=partial(
-                base_proximity_estimator, center=vg.Point(mu.x, mu.y), sigma=sigma
-            ),
-        )
-        layout.create_polygons()
-
-        for mth_graph in range(m_graphs):
-            graph = VisibilityGraph(
-                polygons=create_vg_polys(layout.polygons),
-                sampler=sample_point,
-                proximity_estimator=partial(
-                    base_proximity_estimator, center=vg.Point(mu.x, mu.y), sigma=sigma
-                ),
-                point_merger=partial(merge_points, radius=math.ceil(math.sqrt(sigma))),
-            )
+    m_graphs: int,
+    map_size: int,
+    master_seed: int = 0,
+    max_workers: int | None = None,
+    save_figures: bool = False,
+    file_format: str = "json",
+) -> list[bool]:
+    settings = GenerationSettings(
+        sigma, n_samples, vector_width, vector_heigth, map_size, save_directory, save_figures, file_format
+    )
+    jobs = generation_jobs(settings, n_layouts, m_graphs, master_seed)
+    return run_generation_jobs(jobs, max_workers)
 
-            try:
-                graph.create_graph(sample_size=n_samples, retries=10)
-            except ValueError:
-                continue
-
-            points_of_interest = smp_points_to_vg(vectors)
-            plt.figure(graph.figure_id)
-            plot_free_states(points_of_interest)
-
-            graph.save_figure(f"{save_directory}/fig-{nth_layout}-{mth_graph}.png")
-            plt.close(graph.figure_id)
-
-            layout.save(save_file=f"{save_directory}/polygon-{nth_layout}-{mth_graph}.json")
-            graph.save(save_file=f"{save_directory}/visibility_graph-{nth_layout}-{mth_graph}.json")
-            poi = [point_to_coord(p) for p in points_of_interest]
-            save_points_of_interest(poi, save_file=f"{save_directory}/packages-{nth_layout}-{mth_graph}.json")
-        
-        plt.close(layout.figure_id)
 
 if __name__ == "__main__":
+    MASTER_SEED = 0
     v_sizes = [3, 4, 5, 6]
     map_sizes = [50, 60, 65, 70]
     sigmas = [5, 8, 11, 14]
+    jobs = []
     for v, ms, s in zip(v_sizes, map_sizes, sigmas):
-        MAP_SIZE = ms
-        dir_name = f"gen{v}"
-        import os
-        if not os.path.exists(dir_name):
-            os.mkdir(dir_name)
-        generate_layout_with_graph(
+        settings = GenerationSettings(
             sigma=s,
             n_samples=1000,
-            vector_heigth=v,
             vector_width=v,
-            save_directory=dir_name,
-            n_layouts=5,
-            m_graphs=10
+            vector_heigth=v,
+            map_size=ms,
+            save_directory=f"gen{v}",
         )
+        jobs += generation_jobs(settings, n_layouts=5, m_graphs=10, master_seed=MASTER_SEED)
+    run_generation_jobs(jobs)
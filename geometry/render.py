@@ -0,0 +1,123 @@
+import os
+import json
+import argparse
+import numpy as np
+
+
+def render_graph(
+    polygons: list[np.ndarray],
+    nodes: np.ndarray | None = None,
+    edges: np.ndarray | None = None,
+    points_of_interest: np.ndarray | None = None,
+    save_file: str | None = None,
+    show: bool = False,
+) -> None:
+    """Draws a layout and optionally its graph, with one collection per kind of geometry.
+    Edges are given as an (n, 2, 2) array of segments. Matplotlib is imported only here,
+    so generation itself never touches it.
+    """
+    from matplotlib.collections import LineCollection, PolyCollection
+
+    if show:
+        import matplotlib.pyplot as plt
+
+        fig = plt.figure()
+    else:
+        # a bare Figure keeps no global pyplot state and is freed with the last reference
+        from matplotlib.figure import Figure
+
+        fig = Figure()
+    ax = fig.add_subplot()
+
+    if len(polygons):
+        ax.add_collection(PolyCollection(polygons, facecolors="none", edgecolors="C0"))
+        vertices = np.vstack(polygons)
+        ax.plot(vertices[:, 0], vertices[:, 1], "o", color="C0")
+    if edges is not None and len(edges):
+        ax.add_collection(LineCollection(edges, colors="b", linestyles="dashed"))
+    for points in (nodes, points_of_interest):
+        if points is not None and len(points):
+            ax.plot(points[:, 0], points[:, 1], "ro")
+    ax.autoscale_view()
+
+    if save_file is not None:
+        fig.savefig(save_file, format="png")
+    if show:
+        plt.show()
+
+
+def load_polygon_arrays(polygon_file: str) -> list[np.ndarray]:
+    if polygon_file.endswith(".npz"):
+        with np.load(polygon_file) as data:
+            vertices = data["vertices"]
+            boundaries = np.flatnonzero(np.diff(data["polygon_ids"])) + 1
+        return np.split(vertices, boundaries) if len(vertices) else []
+    with open(polygon_file) as f:
+        return [np.array(polygon) for polygon in json.load(f)]
+
+
+def load_graph_arrays(graph_file: str) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the nodes as an (n, 2) array and the edges as an (m, 2, 2) array of segments."""
+    if graph_file.endswith(".npz"):
+        with np.load(graph_file) as data:
+            nodes = data["nodes"].reshape(-1, 2)
+            return nodes, nodes[data["edges"].reshape(-1, 2)]
+    with open(graph_file) as f:
+        graph_data = json.load(f)
+    return np.array(graph_data["nodes"]).reshape(-1, 2), np.array(graph_data["edges"]).reshape(-1, 2, 2)
+
+
+def load_point_array(points_file: str) -> np.ndarray:
+    if points_file.endswith(".npz"):
+        with np.load(points_file) as data:
+            return data["nodes"].reshape(-1, 2)
+    with open(points_file) as f:
+        return np.array(json.load(f)["nodes"]).reshape(-1, 2)
+
+
+def saved_layout_files(directory: str, suffix: str) -> tuple[str, str, str]:
+    """Returns the polygon, graph and packages files of a generated layout, preferring the binary format."""
+    extension = "npz" if os.path.exists(f"{directory}/polygon-{suffix}.npz") else "json"
+    return (
+        f"{directory}/polygon-{suffix}.{extension}",
+        f"{directory}/visibility_graph-{suffix}.{extension}",
+        f"{directory}/packages-{suffix}.{extension}",
+    )
+
+
+def render_saved_graph(
+    polygon_file: str,
+    graph_file: str,
+    packages_file: str | None = None,
+    save_file: str | None = None,
+    show: bool = False,
+) -> None:
+    """Draws a layout, its graph and packages from the .json or .npz files written by the generator."""
+    nodes, edges = load_graph_arrays(graph_file)
+    render_graph(
+        load_polygon_arrays(polygon_file),
+        nodes=nodes,
+        edges=edges,
+        points_of_interest=load_point_array(packages_file) if packages_file is not None else None,
+        save_file=save_file,
+        show=show,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render a generated layout with its visibility graph.")
+    parser.add_argument("directory")
+    parser.add_argument("nth_layout", type=int)
+    parser.add_argument("mth_graph", type=int)
+    parser.add_argument("--save", action="store_true", help="save fig-<n>-<m>.png instead of showing it")
+    args = parser.parse_args()
+
+    suffix = f"{args.nth_layout}-{args.mth_graph}"
+    polygon_file, graph_file, packages_file = saved_layout_files(args.directory, suffix)
+    render_saved_graph(
+        polygon_file=polygon_file,
+        graph_file=graph_file,
+        packages_file=packages_file,
+        save_file=f"{args.directory}/fig-{suffix}.png" if args.save else None,
+        show=not args.save,
+    )
@@ -0,0 +1,234 @@
+import os
+import numpy as np
+
+
+class DisconnectedGraphError(Exception):
+    pass
+
+
+def cross(u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """z component of the cross product of (broadcast) 2D vectors."""
+    return u[..., 0] * v[..., 1] - u[..., 1] * v[..., 0]
+
+
+def point_segment_distances(points: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Distances from (broadcast) points to segments ab."""
+    ab = b - a
+    squared_length = np.einsum("...i,...i->...", ab, ab)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.einsum("...i,...i->...", points - a, ab) / squared_length
+    t = np.clip(np.nan_to_num(t), 0, 1)
+    return np.hypot(*np.moveaxis(points - a - t[..., None] * ab, -1, 0))
+
+
+def segment_distances(p: np.ndarray, q: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Distances between (broadcast) segments pq and ab that do not cross each other."""
+    return np.minimum(
+        np.minimum(point_segment_distances(p, a, b), point_segment_distances(q, a, b)),
+        np.minimum(point_segment_distances(a, p, q), point_segment_distances(b, p, q)),
+    )
+
+
+class ObstacleEdgeIndex:
+    """Obstacle edges with their bounding boxes for vectorized segment visibility tests."""
+
+    def __init__(self, polygons: list[np.ndarray]) -> None:
+        starts = [np.asarray(polygon, dtype=float) for polygon in polygons if len(polygon)]
+        ends = [np.roll(polygon, -1, axis=0) for polygon in starts]
+        self.starts = np.vstack(starts) if starts else np.empty((0, 2))
+        self.ends = np.vstack(ends) if ends else np.empty((0, 2))
+        self.polygon_ids = np.repeat(np.arange(len(starts)), [len(polygon) for polygon in starts])
+        self.lower = np.minimum(self.starts, self.ends)
+        self.upper = np.maximum(self.starts, self.ends)
+        # the edges of polygon i are starts[polygon_offsets[i] : polygon_offsets[i + 1]]
+        self.polygon_offsets = np.concatenate(([0], np.cumsum([len(polygon) for polygon in starts], dtype=int)))
+        if starts:
+            self.polygon_lower = np.minimum.reduceat(self.starts, self.polygon_offsets[:-1])
+            self.polygon_upper = np.maximum.reduceat(self.starts, self.polygon_offsets[:-1])
+        else:
+            self.polygon_lower = self.polygon_upper = np.empty((0, 2))
+
+    @property
+    def polygons(self) -> list[np.ndarray]:
+        boundaries = np.flatnonzero(np.diff(self.polygon_ids)) + 1
+        return np.split(self.starts, boundaries) if len(self.starts) else []
+
+    def save(self, save_file: str) -> None:
+        """Saves the polygons as a flat vertex array with polygon ids.
+        The file is written under a temporary name and then renamed, so concurrent readers never see a partial file.
+        """
+        tmp_file = f"{save_file}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_file, vertices=self.starts, polygon_ids=self.polygon_ids)
+        os.replace(tmp_file, save_file)
+
+    @classmethod
+    def load(cls, save_file: str) -> "ObstacleEdgeIndex":
+        with np.load(save_file) as data:
+            vertices = data["vertices"]
+            polygon_ids = data["polygon_ids"]
+        boundaries = np.flatnonzero(np.diff(polygon_ids)) + 1
+        return cls(np.split(vertices, boundaries) if len(vertices) else [])
+
+    def edges_within(self, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+        """Returns indices of edges whose bounding box overlaps the given box."""
+        overlap = np.all((self.upper >= lower) & (self.lower <= upper), axis=1)
+        return np.flatnonzero(overlap)
+
+    def visible_from(self, origin: np.ndarray, targets: np.ndarray, clearance: float = 0.0) -> np.ndarray:
+        """Returns a mask of targets whose segment from the origin does not pass through any obstacle.
+        Segments that only touch an edge or a vertex from outside are visible, unless a clearance is required:
+        then every obstacle edge must be at least that far from the segment.
+        """
+        targets = np.asarray(targets, dtype=float).reshape(-1, 2)
+        origin = np.asarray(origin, dtype=float)
+        edges = self.edges_within(
+            np.minimum(origin, targets.min(axis=0)) - clearance, np.maximum(origin, targets.max(axis=0)) + clearance
+        )
+        if not len(edges):
+            return np.ones(len(targets), dtype=bool)
+        a = self.starts[edges]
+        b = self.ends[edges]
+        direction = (targets - origin)[:, None, :]
+        side_a = cross(direction, a - origin)
+        side_b = cross(direction, b - origin)
+        edge = b - a
+        side_origin = cross(edge, origin - a)
+        side_target = cross(edge, targets[:, None, :] - a)
+        crossing = (side_a * side_b < 0) & (side_origin * side_target < 0)
+        blocked = crossing.any(axis=1) | self._passes_inside(origin, targets, a, side_a)
+        if clearance > 0:
+            distances = segment_distances(origin, targets[:, None, :], a, b)
+            blocked |= (distances < clearance).any(axis=1)
+        return ~blocked
+
+    def _passes_inside(self, origin: np.ndarray, targets: np.ndarray, a: np.ndarray, side_a: np.ndarray) -> np.ndarray:
+        """Returns a mask of segments that run through an obstacle without properly crossing any edge.
+        Such segments only touch the boundary at vertices, so they are split at the vertices lying on them
+        and the midpoint of every piece is tested.
+        """
+        direction = targets - origin
+        squared_length = np.maximum(np.einsum("ij,ij->i", direction, direction), 1e-12)
+        t = direction @ (a - origin).T / squared_length[:, None]
+        on_segment = (side_a == 0) & (t > 0) & (t < 1)
+        cuts = np.sort(np.where(on_segment, t, np.nan), axis=1)
+        bounds = np.hstack((np.zeros((len(targets), 1)), cuts, np.ones((len(targets), 1))))
+        # cuts are sorted before the nans, so the last cut is followed by the target
+        n_cuts = on_segment.sum(axis=1)
+        bounds[np.arange(len(targets)), n_cuts + 1] = 1
+        middles = (bounds[:, :-1] + bounds[:, 1:]) / 2
+        pieces = np.arange(middles.shape[1]) <= n_cuts[:, None]
+        segment_of_piece, piece = np.nonzero(pieces)
+        points = origin + middles[segment_of_piece, piece, None] * direction[segment_of_piece]
+        inside = self.contains(points, include_boundary=False)
+        return np.bincount(segment_of_piece[inside], minlength=len(targets)) > 0
+
+    def contains(self, points: np.ndarray, include_boundary: bool = True, chunk_size: int = 2048) -> np.ndarray:
+        """Returns a mask of points that lie inside any obstacle (even-odd rule).
+        A point is only tested against the edges of the polygons whose bounding box holds it.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        inside = np.zeros(len(points), dtype=bool)
+        for start in range(0, len(points), chunk_size):
+            chunk = points[start : start + chunk_size]
+            overlap = np.all((self.polygon_upper >= chunk.min(axis=0)) & (self.polygon_lower <= chunk.max(axis=0)), axis=1)
+            polygons = np.flatnonzero(overlap)
+            if len(polygons):
+                inside[start : start + chunk_size] = self._contains(chunk, polygons, include_boundary)
+        return inside
+
+    def _contains(self, points: np.ndarray, polygons: np.ndarray, include_boundary: bool) -> np.ndarray:
+        within_box = np.all(
+            (points[:, None, :] >= self.polygon_lower[polygons]) & (points[:, None, :] <= self.polygon_upper[polygons]),
+            axis=2,
+        )
+        pair_points, pair_polygons = np.nonzero(within_box)
+        pair_polygons = polygons[pair_polygons]
+        # every (point, polygon) pair is expanded to the polygon's edges, which are stored contiguously
+        counts = self.polygon_offsets[pair_polygons + 1] - self.polygon_offsets[pair_polygons]
+        pair_of_edge = np.repeat(np.arange(len(pair_points)), counts)
+        first_edges = self.polygon_offsets[pair_polygons] - (np.cumsum(counts) - counts)
+        edges = np.arange(counts.sum()) + np.repeat(first_edges, counts)
+
+        p = points[pair_points[pair_of_edge]]
+        a = self.starts[edges]
+        b = self.ends[edges]
+        straddling = (a[:, 1] > p[:, 1]) != (b[:, 1] > p[:, 1])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_intersection = a[:, 0] + (p[:, 1] - a[:, 1]) * (b[:, 0] - a[:, 0]) / (b[:, 1] - a[:, 1])
+        crossings = straddling & (p[:, 0] < x_intersection)
+        on_edge = np.all((p >= self.lower[edges]) & (p <= self.upper[edges]), axis=1) & (cross(b - a, p - a) == 0)
+
+        odd_crossings = np.zeros(len(points), dtype=bool)
+        on_boundary = np.zeros(len(points), dtype=bool)
+        odd_crossings[pair_points[np.bincount(pair_of_edge, crossings, len(pair_points)) % 2 == 1]] = True
+        on_boundary[pair_points[np.bincount(pair_of_edge, on_edge, len(pair_points)) > 0]] = True
+        if include_boundary:
+            return odd_crossings | on_boundary
+        return odd_crossings & ~on_boundary
+
+
+def nearest_visible(
+    origin_idx: int, coords: np.ndarray, k: int, obstacles: ObstacleEdgeIndex, batch_size: int | None = None
+) -> list[int]:
+    """Returns indices of up to k points nearest to coords[origin_idx] that are visible from it.
+    Candidates are tested in order of distance, one batch at a time, until k visible points are found.
+    """
+    origin = coords[origin_idx]
+    distances = np.hypot(*(coords - origin).T)
+    distances[origin_idx] = np.inf
+    order = np.argsort(distances, kind="stable")[: len(coords) - 1]
+    batch_size = batch_size or 2 * k
+    nearest = []
+    for start in range(0, len(order), batch_size):
+        batch = order[start : start + batch_size]
+        visible = batch[obstacles.visible_from(origin, coords[batch])]
+        nearest.extend(visible[: k - len(nearest)].tolist())
+        if len(nearest) >= k:
+            break
+    return nearest
+
+
+def component_labels(n_points: int, edges: np.ndarray) -> np.ndarray:
+    """Labels connected components with a union-find over the edges (pairs of point indices)."""
+    parent = list(range(n_points))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in np.asarray(edges).reshape(-1, 2).tolist():
+        parent[find(a)] = find(b)
+    _, labels = np.unique([find(i) for i in range(n_points)], return_inverse=True)
+    return labels.reshape(-1)
+
+
+def connect_components(
+    coords: np.ndarray, edges: np.ndarray, obstacles: ObstacleEdgeIndex, batch_size: int = 64
+) -> np.ndarray:
+    """Repeatedly joins the smallest component to the rest of the graph with the shortest visible edge between them.
+    Raises DisconnectedGraphError if some component cannot see any point outside of it.
+    """
+    edges = np.asarray(edges, dtype=int).reshape(-1, 2)
+    while True:
+        labels = component_labels(len(coords), edges)
+        sizes = np.bincount(labels)
+        if len(sizes) <= 1:
+            return edges
+        component = np.flatnonzero(labels == np.argmin(sizes))
+        rest = np.flatnonzero(labels != np.argmin(sizes))
+        distances = np.hypot(*(coords[component][:, None, :] - coords[rest][None, :, :]).transpose(2, 0, 1))
+        order = np.argsort(distances, axis=None, kind="stable")
+        new_edge = None
+        for start in range(0, len(order), batch_size):
+            inner, outer = np.unravel_index(order[start : start + batch_size], distances.shape)
+            for i, j in zip(component[inner].tolist(), rest[outer].tolist()):
+                if obstacles.visible_from(coords[i], coords[j][None])[0]:
+                    new_edge = (j, i)
+                    break
+            if new_edge is not None:
+                break
+        if new_edge is None:
+            raise DisconnectedGraphError(f"{len(component)} points cannot see the rest of the graph.")
+        edges = np.vstack((edges, new_edge))
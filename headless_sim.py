@@ -0,0 +1,333 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+from typing import Iterable, Iterator, List, NamedTuple
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from geometry.visibility import ObstacleEdgeIndex
+from sim.control import RobotController
+from sim.entities import Robot
+from sim.experiments import ROBOT_START, ROBOT_SIZE, STEP_SIZE, a_star_shortest_path, find_cases, summarize
+from sim.fleet import plan_fleet
+from sim.graph_model import GraphModel
+from sim.motion import MotionProfile
+from sim.planner import plan_route
+from sim.shortcut import route_length
+from sim.types import Node
+from sim.utils import load_points, load_polygons
+
+MOTION = MotionProfile(max_speed=120, acceleration=240)
+TIME_STEP = 1 / 60
+
+
+class MissionStats(NamedTuple):
+    size_class: str
+    graph_path: str
+    mission: int
+    picks: int
+    planning_time: float
+    mission_time: float
+    distance: float
+    wall_time: float
+
+
+def polygon_path_of(graph_path: str) -> str | None:
+    """Returns the layout file written next to a generated graph, if there is one."""
+    directory, name = os.path.split(graph_path)
+    if not name.startswith("visibility_graph-"):
+        return None
+    polygon_path = os.path.join(directory, name.replace("visibility_graph-", "polygon-", 1))
+    return polygon_path if os.path.exists(polygon_path) else None
+
+
+def load_pick_lists(path: str) -> Iterator[List[Node]]:
+    """Reads pick lists lazily, one JSON list of [x, y] points per line; "-" reads them from stdin."""
+    lines = sys.stdin if path == "-" else open(path)
+    try:
+        for line in lines:
+            if line.strip():
+                yield [tuple(point) for point in json.loads(line)]
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+
+
+def random_pick_lists(
+    packages: List[Node], n_missions: int, picks_per_mission: int, rng: np.random.Generator
+) -> Iterator[List[Node]]:
+    """Draws distinct packages for every mission."""
+    for _ in range(n_missions):
+        picks = rng.choice(len(packages), size=min(picks_per_mission, len(packages)), replace=False)
+        yield [packages[idx] for idx in picks.tolist()]
+
+
+def simulate_missions(
+    size_class: str,
+    graph_path: str,
+    pick_lists: Iterable[List[Node]],
+    dt: float = TIME_STEP,
+    motion: MotionProfile = MOTION,
+) -> list[MissionStats]:
+    """Runs a stream of pick lists on one layout, one mission after the other, without a display.
+    Every mission starts where the previous one ended. Time is simulated in steps of dt seconds.
+    """
+    model = GraphModel(
+        data_path=graph_path,
+        sp_alg=a_star_shortest_path,
+    )
+    polygon_path = polygon_path_of(graph_path)
+    obstacles = ObstacleEdgeIndex(load_polygons(polygon_path)) if polygon_path else None
+    robot = Robot(*ROBOT_START, width=ROBOT_SIZE, length=ROBOT_SIZE)
+    controller = RobotController(robot, STEP_SIZE, motion)
+
+    stats = []
+    for mission, pick_list in enumerate(pick_lists):
+        wall_start = time.perf_counter()
+        start = (robot.x, robot.y)
+        picks = list(dict.fromkeys(pick_list))
+        model.reset()
+        model.insert_node(start)
+        for pick in picks:
+            model.insert_node(pick)
+
+        planning_start = time.perf_counter()
+        plan = plan_route(model, obstacles, clearance=ROBOT_SIZE, start=start)
+        planning_time = time.perf_counter() - planning_start
+
+        controller.push_new_instructions(plan.shortcut)
+        mission_time = 0.0
+        while not controller.idle:
+            controller.update(dt)
+            mission_time += dt
+        stats.append(
+            MissionStats(
+                size_class,
+                graph_path,
+                mission,
+                len(picks),
+                planning_time,
+                mission_time,
+                route_length([start] + plan.shortcut),
+                time.perf_counter() - wall_start,
+            )
+        )
+    return stats
+
+
+def run_missions(
+    size_class: str,
+    graph_path: str,
+    packages_path: str,
+    n_missions: int,
+    picks_per_mission: int,
+    seed: np.random.SeedSequence,
+    dt: float = TIME_STEP,
+    motion: MotionProfile = MOTION,
+) -> list[MissionStats]:
+    """Runs missions with pick lists drawn at random from the packages of a layout."""
+    pick_lists = random_pick_lists(load_points(packages_path), n_missions, picks_per_mission, np.random.default_rng(seed))
+    return simulate_missions(size_class, graph_path, pick_lists, dt, motion)
+
+
+def run_simulations(
+    generations: list[int],
+    n_missions: int,
+    picks_per_mission: int,
+    master_seed: int = 0,
+    dt: float = TIME_STEP,
+    max_workers: int | None = None,
+) -> list[MissionStats]:
+    """Runs the missions of every generated case in a process pool; results do not depend on the number of workers."""
+    cases = find_cases(generations)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                run_missions,
+                size_class,
+                graph_path,
+                packages_path,
+                n_missions,
+                picks_per_mission,
+                np.random.SeedSequence(master_seed, spawn_key=(i,)),
+                dt,
+            )
+            for i, (size_class, graph_path, packages_path) in enumerate(cases)
+        ]
+        return [mission for future in futures for mission in future.result()]
+
+
+class FleetStats(NamedTuple):
+    size_class: str
+    graph_path: str
+    fleet_size: int
+    picks: int
+    makespan: float
+    wait_time: float
+    reroutes: int
+    conflicts: int
+    distance: float
+
+
+def run_fleet(
+    size_class: str,
+    graph_path: str,
+    packages_path: str,
+    fleet_size: int,
+    picks_per_robot: int,
+    seed: np.random.SeedSequence,
+    motion: MotionProfile = MOTION,
+) -> FleetStats:
+    """Plans one mission for a fleet sharing a layout. Robots start on distinct graph nodes and pick from the
+    packages and the graph nodes, so small package files still give every robot a full pick list.
+    """
+    rng = np.random.default_rng(seed)
+    model = GraphModel(
+        data_path=graph_path,
+        sp_alg=a_star_shortest_path,
+    )
+    graph_nodes = list(model.graph.nodes)
+    starts = [graph_nodes[i] for i in rng.choice(len(graph_nodes), size=fleet_size, replace=False).tolist()]
+    candidates = [p for p in dict.fromkeys(load_points(packages_path) + graph_nodes) if p not in starts]
+    n_picks = fleet_size * picks_per_robot
+    picks = [candidates[i] for i in rng.choice(len(candidates), size=n_picks, replace=n_picks > len(candidates))]
+    pick_lists = [list(dict.fromkeys(picks[i::fleet_size])) for i in range(fleet_size)]
+
+    hold = 2 * ROBOT_SIZE / motion.max_speed
+    plan = plan_fleet(model, starts, pick_lists, motion.max_speed, hold, max_wait=5 * hold)
+    return FleetStats(
+        size_class,
+        graph_path,
+        fleet_size,
+        sum(len(pick_list) for pick_list in pick_lists),
+        plan.makespan,
+        plan.wait_time,
+        sum(r.reroutes for r in plan.robots),
+        plan.conflicts,
+        sum(route_length(r.route) for r in plan.robots),
+    )
+
+
+def run_fleet_sweep(
+    generations: list[int],
+    fleet_sizes: list[int],
+    picks_per_robot: int,
+    master_seed: int = 0,
+    max_workers: int | None = None,
+) -> list[FleetStats]:
+    """Plans a fleet of every size on every generated case in a process pool."""
+    cases = find_cases(generations)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                run_fleet,
+                size_class,
+                graph_path,
+                packages_path,
+                fleet_size,
+                picks_per_robot,
+                np.random.SeedSequence(master_seed, spawn_key=(i, fleet_size)),
+            )
+            for i, (size_class, graph_path, packages_path) in enumerate(cases)
+            for fleet_size in fleet_sizes
+        ]
+        return [future.result() for future in futures]
+
+
+def summarize_fleets(stats: list[FleetStats]) -> dict[int, dict[str, float]]:
+    """Aggregates fleets per size: throughput over the makespan, and the share of robot time lost to waiting."""
+    groups = defaultdict(list)
+    for fleet in stats:
+        groups[fleet.fleet_size].append(fleet)
+    summary = {}
+    for fleet_size, fleets in sorted(groups.items()):
+        makespan = sum(f.makespan for f in fleets)
+        picks = sum(f.picks for f in fleets)
+        summary[fleet_size] = {
+            "picks": picks,
+            "makespan": makespan,
+            "picks_per_hour": picks / makespan * 3600 if makespan else 0.0,
+            "picks_per_robot_hour": picks / makespan * 3600 / fleet_size if makespan else 0.0,
+            "wait_share": sum(f.wait_time for f in fleets) / (makespan * fleet_size) if makespan else 0.0,
+            "reroutes": sum(f.reroutes for f in fleets),
+            "conflicts": sum(f.conflicts for f in fleets),
+        }
+    return summary
+
+
+def summarize_missions(stats: list[MissionStats]) -> dict[str, dict[str, float]]:
+    """Aggregates missions per size class: totals, planning latency and picks per hour of simulated time."""
+    groups = defaultdict(list)
+    for mission in stats:
+        groups[mission.size_class].append(mission)
+        groups["all"].append(mission)
+    summary = {}
+    for size_class, missions in groups.items():
+        mission_time = sum(m.mission_time for m in missions)
+        wall_time = sum(m.wall_time for m in missions)
+        picks = sum(m.picks for m in missions)
+        latency = summarize([m.planning_time for m in missions])
+        summary[size_class] = {
+            "missions": len(missions),
+            "picks": picks,
+            "mission_time": mission_time,
+            "distance": sum(m.distance for m in missions),
+            "planning_p50": latency["p50"],
+            "planning_p90": latency["p90"],
+            "picks_per_hour": picks / mission_time * 3600 if mission_time else 0.0,
+            "speedup": mission_time / wall_time if wall_time else 0.0,
+        }
+    return summary
+
+
+def print_summary(summary: dict[str, dict[str, float]]) -> None:
+    for size_class, s in summary.items():
+        print(
+            f"{size_class:<6} missions {s['missions']:5d}  picks {s['picks']:6d}  "
+            f"time {s['mission_time']:9.1f}s  distance {s['distance']:11.1f}px  "
+            f"planning p50 {s['planning_p50'] * 1000:8.2f}ms p90 {s['planning_p90'] * 1000:8.2f}ms  "
+            f"picks/h {s['picks_per_hour']:8.1f}  x{s['speedup']:.0f} real time"
+        )
+
+
+def print_fleet_summary(summary: dict[int, dict[str, float]]) -> None:
+    for fleet_size, s in summary.items():
+        print(
+            f"{fleet_size:3d} robots  picks {s['picks']:6d}  picks/h {s['picks_per_hour']:9.1f}  "
+            f"per robot {s['picks_per_robot_hour']:8.1f}  waiting {s['wait_share'] * 100:5.1f}%  "
+            f"reroutes {s['reroutes']:4d}  conflicts {s['conflicts']:4d}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless, accelerated mission simulation.")
+    parser.add_argument("--generations", type=int, nargs="+", default=[3, 4, 5, 6])
+    parser.add_argument("--missions", type=int, default=10, help="missions per generated graph")
+    parser.add_argument("--picks", type=int, default=5, help="picks per mission")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dt", type=float, default=TIME_STEP, help="simulated seconds per step")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--fleet-sizes", type=int, nargs="+", help="plan fleets of these sizes instead of missions")
+    parser.add_argument(
+        "--pick-lists", help='file with one JSON list of [x, y] picks per line, or "-" for stdin; run on --graph'
+    )
+    parser.add_argument("--graph", help="graph to run the pick lists on")
+    args = parser.parse_args()
+    if args.pick_lists and not args.graph:
+        parser.error("--pick-lists needs --graph")
+
+    start = time.perf_counter()
+    if args.pick_lists:
+        stats = simulate_missions("custom", args.graph, load_pick_lists(args.pick_lists), args.dt)
+        print_summary(summarize_missions(stats))
+        print(f"Simulated {len(stats)} missions in {time.perf_counter() - start:.1f}s.")
+    elif args.fleet_sizes:
+        fleets = run_fleet_sweep(args.generations, args.fleet_sizes, args.picks, args.seed, args.workers)
+        print_fleet_summary(summarize_fleets(fleets))
+        print(f"Planned {len(fleets)} fleets in {time.perf_counter() - start:.1f}s.")
+    else:
+        stats = run_simulations(args.generations, args.missions, args.picks, args.seed, args.dt, args.workers)
+        print_summary(summarize_missions(stats))
+        print(f"Simulated {len(stats)} missions in {time.perf_counter() - start:.1f}s.")
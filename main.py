@@ -1,30 +1,47 @@
 import json
+import math
+import time
+import argparse
 import networkx as nx
 from typing import List
 from functools import partial
 
 import pygame.freetype
 
-import sim.constants as constants
 from sim.entities import (
     Graph,
     Warehouse,
     Viewable,
     Robot,
     FPSCounter,
+    MetricsOverlay,
+    PlanningIndicator,
     VisibilityController,
 )
 from sim.control import RobotController
+from sim.motion import MotionProfile
+from sim.planner import BackgroundPlanner, replan_remaining
+from sim.online import OnlineInserter
+from sim.fleet import FleetPlan, plan_fleet_for_model
+from sim.metrics import Metrics
+from geometry.visibility import ObstacleEdgeIndex
 from sim.graph_model import GraphModel, manhattan_distance
+from sim.utils import load_polygons
 
 pygame.init()
 
 SCALE = 2
 BASE_NODE_RADIUS = 5
 BASE_STEP_SIZE = 1
+# pixels per second and pixels per second squared, before scaling
+BASE_MAX_SPEED = 60
+BASE_ACCELERATION = 120
+# more robots are planned as a fleet, driven at constant speed without the shortcut
+ROBOT_COUNT = 1
 DIMENSIONS_SETTINGS_PATH = "gen/dimensions.json"
 LAYOUT_DATA_PATH = "gen/polygon.json"
 GRAPH_DATA_PATH = "gen/visibility_graph.json"
+TRACE_PATH = "trace.json"
 
 
 def load_json(filename: str) -> dict:
@@ -33,30 +50,43 @@ def load_json(filename: str) -> dict:
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Interactive warehouse robot simulation.")
+    parser.add_argument(
+        "--robots",
+        type=int,
+        default=ROBOT_COUNT,
+        help="robots to simulate; a fleet follows reserved schedules at constant speed, "
+        "without route shortcutting or acceleration",
+    )
+    args = parser.parse_args()
+    if args.robots > 1:
+        print("Planning a fleet: routes are not shortcut and robots drive at constant speed.")
+
     settings = load_json(DIMENSIONS_SETTINGS_PATH)
 
     map_length = settings["warehouse"]["length"] * SCALE
     map_width = settings["warehouse"]["width"] * SCALE
     screen = pygame.display.set_mode([map_width, map_length])
 
-    polygons = load_json(LAYOUT_DATA_PATH)
+    polygons = load_polygons(LAYOUT_DATA_PATH)
     warehouse = Warehouse(polygons)
+    obstacles = ObstacleEdgeIndex(polygons)
 
     robot_length = settings["robot"]["length"] * SCALE
     robot_width = settings["robot"]["width"] * SCALE
-    robot = Robot(x=5 * SCALE, y=5 * SCALE, width=robot_width, length=robot_length)
+    robots = [
+        Robot(x=5 * SCALE + 3 * i * robot_width, y=5 * SCALE, width=robot_width, length=robot_length)
+        for i in range(args.robots)
+    ]
 
     a_star_shortest_path = partial(nx.astar_path, heuristic=manhattan_distance)
-    a_star_shortest_path_length = partial(
-        nx.astar_path_length, heuristic=manhattan_distance
-    )
 
     model = GraphModel(
         data_path=GRAPH_DATA_PATH,
         sp_alg=a_star_shortest_path,
-        sp_length_alg=a_star_shortest_path_length,
     )
-    model.insert_node(node=(robot.x, robot.y))
+    for robot in robots:
+        model.insert_node(node=(robot.x, robot.y))
 
     node_radius = BASE_NODE_RADIUS * SCALE
     visibility_graph = Graph(model=model, radius=node_radius)
@@ -65,31 +95,115 @@ if __name__ == "__main__":
     fps_counter = FPSCounter(x=int(map_width * 0.8), y=10, clock=clock)
 
     step_size = BASE_STEP_SIZE * SCALE
-    robot_controller = RobotController(robot, step_size)
+    motion = MotionProfile(max_speed=BASE_MAX_SPEED * SCALE, acceleration=BASE_ACCELERATION * SCALE)
+    robot_controllers = [RobotController(robot, step_size, motion) for robot in robots]
+    # seconds a robot keeps a graph node reserved after reaching it
+    node_hold = 2 * max(robot_width, robot_length) / motion.max_speed
 
-    visible_objects: List[Viewable] = [warehouse, visibility_graph, robot, fps_counter]
+    planner = BackgroundPlanner()
+    # the fleet plan being driven, kept to splice new stops into its schedules
+    fleet_plan: FleetPlan | None = None
+    planning_indicator = PlanningIndicator(x=10, y=10, planner=planner)
+
+    metrics = Metrics()
+    metrics_overlay = MetricsOverlay(
+        x=10,
+        y=40,
+        metrics=metrics,
+        sections=[
+            "frame", "events", "update", "draw", "draw Warehouse", "draw Graph", "draw Robot", "display",
+            "insert", "matrix", "tsp", "route", "shortcut", "schedule", "instructions",
+        ],
+    )
+
+    visible_objects: List[Viewable] = [warehouse, visibility_graph, *robots, fps_counter, planning_indicator]
     visibility_controller = VisibilityController(visible_objects)
+    visibility_controller.metrics = metrics
 
     running = True
     while running:
+        dt = clock.tick(60) / 1000
+        # frames are timed without the sleep in clock.tick
+        frame_start = time.perf_counter()
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
             if event.type == pygame.KEYDOWN:
-                # f - run robot controller
-                # n - add new point that the robot should visit
+                # f - plan routes for the robots in the background
+                # n - add new point that the robot should visit, merged into the route of the nearest moving robot
+                #     or superseding a plan in progress
+                # c - cancel the plan in progress
                 # r - clears all points
-                if event.key == ord("f") and not robot_controller.instructions:
-                    robot_controller.push_new_instructions(model.solve_tsp())
+                # p - export recorded timings as a Chrome trace
+                # b / shift+b - block the edge nearest to the mouse / unblock the nearest blocked edge
+                # v / shift+v - block the node nearest to the mouse / unblock the nearest blocked node
+                if len(robots) == 1:
+                    planning_args = dict(
+                        obstacles=obstacles, clearance=robot_width, start=(robots[0].x, robots[0].y), metrics=metrics
+                    )
+                else:
+                    planning_args = dict(
+                        job=plan_fleet_for_model,
+                        starts=[(robot.x, robot.y) for robot in robots],
+                        speed=motion.max_speed,
+                        hold=node_hold,
+                        metrics=metrics,
+                    )
+                idle = all(controller.idle for controller in robot_controllers)
+                if event.key == ord("f") and idle and not planner.busy:
+                    planner.submit(model, **planning_args)
                 if event.key == ord("n"):
                     user_node = pygame.mouse.get_pos()
-                    model.insert_node(node=user_node)
+                    moving = [c for c in robot_controllers if not c.idle]
+                    if moving and not planner.busy:
+                        nearest = min(moving, key=lambda c: math.dist((c.robot.x, c.robot.y), user_node))
+                        # robots on a fleet schedule re-reserve the changed part of their route
+                        splice = None
+                        if fleet_plan is not None:
+                            splice = partial(fleet_plan.splice, robot_controllers.index(nearest), nearest, model)
+                        with metrics.section("insert", "planning"):
+                            latency = OnlineInserter(model, nearest, splice=splice).insert(user_node)
+                        if latency is None:
+                            print("The new stop cannot be reached and was rejected.")
+                        else:
+                            print(f"Merged the new stop into a running route in {latency * 1000:.2f} ms.")
+                    else:
+                        with metrics.section("insert", "planning"):
+                            model.insert_node(node=user_node)
+                    if planner.busy:
+                        planner.submit(model, **planning_args)
+                if event.key == ord("c"):
+                    planner.cancel()
                 if event.key == ord("r"):
+                    planner.cancel()
                     model.reset()
-                    model.insert_node(node=(robot.x, robot.y))
+                    for robot in robots:
+                        model.insert_node(node=(robot.x, robot.y))
+                if event.key == ord("p"):
+                    metrics.export_chrome_trace(TRACE_PATH)
+                    print(f"Trace saved to {TRACE_PATH}.")
                 # Visibility Settings' keybinds
                 mods = pygame.key.get_mods()
+                if event.key in (ord("b"), ord("v")):
+                    mouse = pygame.mouse.get_pos()
+                    if event.key == ord("b") and not mods & pygame.KMOD_LSHIFT:
+                        repaired = model.block_edge(*model.nearest_edge(mouse))
+                    elif event.key == ord("b") and model.blocked_edges:
+                        repaired = model.unblock_edge(*model.nearest_edge(mouse, model.blocked_edges))
+                    elif event.key == ord("v") and not mods & pygame.KMOD_LSHIFT:
+                        repaired = model.block_node(min(model.graph.nodes, key=lambda n: math.dist(n, mouse)))
+                    elif event.key == ord("v") and model.blocked_nodes:
+                        repaired = model.unblock_node(min(model.blocked_nodes, key=lambda n: math.dist(n, mouse)))
+                    else:
+                        repaired = 0
+                    print(f"Repaired {repaired} cached paths.")
+                    # a plan in flight may run over edges that are gone now
+                    if planner.busy:
+                        planner.submit(model, **planning_args)
+                    for controller in robot_controllers:
+                        if not controller.idle and not replan_remaining(model, controller):
+                            print("A stop became unreachable, the robot stops after its current leg.")
                 if event.key == ord("q"):
                     if mods & pygame.KMOD_LSHIFT:
                         visibility_controller.show_object(fps_counter)
@@ -106,15 +220,42 @@ if __name__ == "__main__":
                     else:
                         visibility_controller.hide_object(warehouse)
                 if event.key == ord("t"):
+                    for robot in robots:
+                        if mods & pygame.KMOD_LSHIFT:
+                            visibility_controller.show_object(robot)
+                        else:
+                            visibility_controller.hide_object(robot)
+                if event.key == ord("y"):
                     if mods & pygame.KMOD_LSHIFT:
-                        visibility_controller.show_object(robot)
+                        visibility_controller.show_object(metrics_overlay)
                     else:
-                        visibility_controller.hide_object(robot)
+                        visibility_controller.hide_object(metrics_overlay)
+
+        plan = planner.poll()
+        if isinstance(plan, FleetPlan):
+            fleet_plan = plan
+            print(
+                f"Fleet makespan {plan.makespan:.1f}s, {plan.wait_time:.1f}s spent waiting, "
+                f"{sum(r.reroutes for r in plan.robots)} reroutes, {plan.conflicts} unresolved conflicts."
+            )
+            for controller, robot_schedule in zip(robot_controllers, plan.robots):
+                model.highlight_route(robot_schedule.route)
+                controller.follow(robot_schedule.schedule)
+        elif plan is not None:
+            print(f"Shortcutting saved {plan.saved:.1f} px.")
+            model.highlight_route(plan.route)
+            with metrics.section("instructions", "planning"):
+                robot_controllers[0].push_new_instructions(plan.shortcut)
+        metrics.record("events", frame_start, time.perf_counter() - frame_start)
 
-        clock.tick(60)
-        robot_controller.move_robot()
-        screen.fill(constants.WHITE)
-        visibility_controller.draw(screen)
-        pygame.display.flip()
+        with metrics.section("update"):
+            for controller in robot_controllers:
+                controller.update(dt)
+        with metrics.section("draw"):
+            dirty_rects = visibility_controller.draw(screen)
+        with metrics.section("display"):
+            pygame.display.update(dirty_rects)
+        metrics.record("frame", frame_start, time.perf_counter() - frame_start)
 
+    planner.shutdown()
     pygame.quit()
@@ -0,0 +1,142 @@
+import os
+import json
+import time
+import argparse
+import tracemalloc
+import numpy as np
+from collections import defaultdict
+from sim.experiments import ROBOT_START, STEP_SIZE, a_star_shortest_path, find_cases, summarize
+from sim.graph_model import GraphModel
+from sim.geometry import create_route_moves
+from sim.utils import load_points
+
+STAGES = ("load", "insert", "matrix", "tsp", "route", "instructions")
+BASELINE_PATH = "pipeline_baseline.json"
+
+
+class StageRecorder:
+    def __init__(self, trace_memory: bool):
+        self.trace_memory = trace_memory
+        self.times: dict[str, float] = {}
+        self.peaks: dict[str, int] = {}
+        self._stage = None
+        self._start = 0.0
+
+    def start(self, stage: str) -> None:
+        self._stage = stage
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+
+    def stop(self) -> None:
+        self.times[self._stage] = time.perf_counter() - self._start
+        if self.trace_memory:
+            self.peaks[self._stage] = tracemalloc.get_traced_memory()[1]
+
+
+def run_pipeline(graph_path: str, packages_path: str, recorder: StageRecorder) -> None:
+    recorder.start("load")
+    model = GraphModel(
+        data_path=graph_path,
+        sp_alg=a_star_shortest_path,
+    )
+    packages = load_points(packages_path)
+    recorder.stop()
+
+    recorder.start("insert")
+    model.insert_node(ROBOT_START)
+    for package in packages:
+        model.insert_node(package)
+    recorder.stop()
+
+    recorder.start("matrix")
+    matrix = model.create_distance_matrix()
+    recorder.stop()
+
+    recorder.start("tsp")
+    path = model.tsp_solver(matrix)
+    recorder.stop()
+
+    recorder.start("route")
+    route = model.expand_route(path)
+    recorder.stop()
+
+    recorder.start("instructions")
+    create_route_moves(np.array([ROBOT_START, *route]), STEP_SIZE)
+    recorder.stop()
+
+
+def run_suite(generations: list[int], repeat: int) -> dict[str, dict]:
+    """Runs every case `repeat` times for latency and once more under tracemalloc for peak memory per stage."""
+    latencies = defaultdict(lambda: defaultdict(list))
+    peaks = defaultdict(lambda: defaultdict(int))
+    for size_class, graph_path, packages_path in find_cases(generations):
+        for _ in range(repeat):
+            recorder = StageRecorder(trace_memory=False)
+            run_pipeline(graph_path, packages_path, recorder)
+            for stage, t in recorder.times.items():
+                latencies[size_class][stage].append(t)
+        tracemalloc.start()
+        recorder = StageRecorder(trace_memory=True)
+        run_pipeline(graph_path, packages_path, recorder)
+        tracemalloc.stop()
+        for stage, peak in recorder.peaks.items():
+            peaks[size_class][stage] = max(peaks[size_class][stage], peak)
+
+    return {
+        size_class: {
+            stage: {**summarize(latencies[size_class][stage]), "peak_bytes": peaks[size_class][stage]}
+            for stage in STAGES
+        }
+        for size_class in latencies
+    }
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for size_class, stages in results.items():
+        for stage, stats in stages.items():
+            reference = baseline.get(size_class, {}).get(stage)
+            if reference is None:
+                continue
+            for metric in ("p50", "peak_bytes"):
+                if stats[metric] > reference[metric] * (1 + tolerance):
+                    regressions.append(
+                        f"{size_class}/{stage} {metric}: {stats[metric]:.6g} > baseline {reference[metric]:.6g}"
+                    )
+    return regressions
+
+
+def print_results(results: dict) -> None:
+    for size_class, stages in results.items():
+        print(size_class)
+        for stage, stats in stages.items():
+            print(
+                f"  {stage:<13} p50 {stats['p50'] * 1000:9.3f}ms  p90 {stats['p90'] * 1000:9.3f}ms  "
+                f"max {stats['max'] * 1000:9.3f}ms  peak {stats['peak_bytes'] / 1024:9.1f}KiB"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end planning pipeline benchmark.")
+    parser.add_argument("--generations", type=int, nargs="+", default=[3, 4, 5, 6])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = run_suite(args.generations, args.repeat)
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"Baseline saved to {args.baseline}.")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            raise SystemExit(1)
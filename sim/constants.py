@@ -16,6 +16,7 @@ class Origin(str, Enum):
     SOLUTION_EDGE = "solution_edge"
     SOLUTION_START_NODE = "solution_start_node"
     SOLUTION_END_NODE = "solution_end_node"
+    BLOCKED_EDGE = "blocked_edge"
 
 
 COLOR_MAP: Dict[Origin, Color] = {
@@ -25,4 +26,5 @@ COLOR_MAP: Dict[Origin, Color] = {
     Origin.SOLUTION_EDGE: (235, 195, 52),
     Origin.SOLUTION_START_NODE: (30, 140, 18),
     Origin.SOLUTION_END_NODE: (143, 14, 194),
+    Origin.BLOCKED_EDGE: (170, 170, 170),
 }
@@ -1,6 +1,9 @@
+from collections import deque
 from dataclasses import dataclass
+import numpy as np
 from sim.entities import Robot
-from sim.geometry import create_robot_moves
+from sim.geometry import create_route_moves
+from sim.motion import MotionProfile, Trajectory
 
 @dataclass
 class InstructionSet:
@@ -16,20 +19,123 @@ def create_instruction_sets(moves: list[tuple[float, float]], reference_point: t
     return instruction_sets
 
 
+def leg_instructions(start: tuple[int, int], end: tuple[int, int], step_size: int) -> list[InstructionSet]:
+    """Returns the instruction sets of a single leg, aligned to its end point."""
+    moves, _ = create_route_moves(np.array([start, end]), step_size)
+    # zero-length legs produce no moves
+    if not len(moves):
+        return []
+    return create_instruction_sets([tuple(move) for move in moves.tolist()], end)
+
+
+class InstructionQueue:
+    """Streams instruction sets leg by leg from a queue of route points.
+    Only the leg being executed is materialized, so memory and per-step cost do not grow with the route length.
+    """
+
+    def __init__(self, step_size: int):
+        self.step_size: int = step_size
+        self.pending_points: deque[tuple[int, int]] = deque()
+        self.current_leg: deque[InstructionSet] = deque()
+        self.leg_end: tuple[int, int] | None = None
+
+    def __bool__(self) -> bool:
+        return bool(self.current_leg) or bool(self.pending_points)
+
+    def extend(self, start: tuple[int, int], points: list[tuple[int, int]]) -> None:
+        """Queues a route; it continues from the end of the queued route or, if the queue is empty, from start."""
+        if not self:
+            self.leg_end = tuple(start)
+        self.pending_points.extend(tuple(point) for point in points)
+
+    def clear(self, finish_leg: bool = False) -> None:
+        """Drops the queued route, optionally keeping the rest of the leg being executed."""
+        self.pending_points.clear()
+        if not finish_leg:
+            self.current_leg.clear()
+
+    def splice(self, keep: int, points: list[tuple[int, int]]) -> None:
+        """Keeps the first queued points and replaces the rest, leaving the leg being executed untouched."""
+        while len(self.pending_points) > keep:
+            self.pending_points.pop()
+        self.pending_points.extend(tuple(point) for point in points)
+
+    def popleft(self) -> InstructionSet:
+        """Returns the next instruction set, raising IndexError when the queue is exhausted."""
+        while not self.current_leg:
+            if not self.pending_points:
+                raise IndexError("pop from an empty instruction queue")
+            start, self.leg_end = self.leg_end, self.pending_points.popleft()
+            self.current_leg.extend(leg_instructions(start, self.leg_end, self.step_size))
+        return self.current_leg.popleft()
+
+
 class RobotController:
-    def __init__(self, robot: Robot, step_size: int):
+    """Moves the robot one step_size per frame or, given a motion profile, along a timed trajectory."""
+
+    def __init__(self, robot: Robot, step_size: int, motion: MotionProfile | None = None):
         self.robot: Robot = robot
         self.step_size: int = step_size
-        self.instructions: list[InstructionSet] = []
+        self.instructions: InstructionQueue = InstructionQueue(step_size)
+        self.motion: MotionProfile | None = motion
+        self.trajectory: Trajectory | None = None
+        self.elapsed: float = 0.0
+
+    @property
+    def idle(self) -> bool:
+        return self.trajectory is None and not self.instructions
 
     def push_new_instructions(self, new_points):
-        points: list[tuple[int, int]] = [(self.robot.x, self.robot.y)] + new_points
-        for p1, p2 in zip(points[:-1], points[1:]):
-            x_start, y_start = p1
-            x_end, y_end = p2
-            moves = create_robot_moves(x_start, y_start, x_end, y_end, self.step_size)
-            self.instructions.extend(create_instruction_sets(moves, p2))
-    
+        if self.motion is None:
+            self.instructions.extend((self.robot.x, self.robot.y), new_points)
+        elif self.trajectory is None:
+            self._follow(list(new_points))
+        else:
+            self._follow(self.trajectory.remaining_points(self.elapsed) + list(new_points))
+
+    def remaining_route(self) -> list[tuple[int, int]]:
+        """Points still to be visited, starting with the end of the leg being driven."""
+        if self.trajectory is not None:
+            return self.trajectory.remaining_points(self.elapsed)
+        leg_end = [self.instructions.leg_end] if self.instructions.current_leg else []
+        return leg_end + list(self.instructions.pending_points)
+
+    def splice_route(self, keep: int, new_points: list[tuple[int, int]]) -> None:
+        """Keeps the first points of remaining_route() and replaces everything after them."""
+        if self.idle:
+            self.push_new_instructions(new_points)
+        elif self.trajectory is not None:
+            self._follow(self.remaining_route()[:keep] + list(new_points))
+        else:
+            offset = 1 if self.instructions.current_leg else 0
+            self.instructions.splice(max(keep - offset, 0), new_points)
+
+    def replace_route(self, new_points) -> None:
+        """Swaps the queued route for a new one that starts where the current leg ends."""
+        self.cancel(finish_leg=True)
+        self.push_new_instructions(new_points)
+
+    def cancel(self, finish_leg: bool = True) -> None:
+        """Stops after the current leg, or immediately if finish_leg is False."""
+        self.instructions.clear(finish_leg)
+        if self.trajectory is not None:
+            if finish_leg:
+                self._follow(self.trajectory.remaining_points(self.elapsed)[:1])
+            else:
+                self.trajectory = None
+
+    def follow(self, trajectory, elapsed: float = 0.0) -> None:
+        """Follows a precomputed timed path, e.g. a fleet schedule, from elapsed seconds into it."""
+        self.instructions.clear()
+        self.trajectory = trajectory
+        self.elapsed = elapsed
+
+    def _follow(self, points: list[tuple[int, int]]) -> None:
+        """Starts a trajectory from the robot's position, keeping its current speed."""
+        speed = float(self.trajectory.speed_at(self.elapsed)) if self.trajectory is not None else 0.0
+        self.trajectory = Trajectory(np.array([(self.robot.x, self.robot.y)] + points), self.motion, speed)
+        self.elapsed = 0.0
+
     def correct_position(self, reference_point: tuple[int, int]) -> None:
         x, y = reference_point
         x -= self.robot.x
@@ -38,10 +144,26 @@ class RobotController:
 
     def move_robot(self) -> None:
         try:
-            instruction_set = self.instructions.pop(0)
+            instruction_set = self.instructions.popleft()
             self.robot.move(*instruction_set.move)
             if instruction_set.allignment_reference is not None:
                 self.correct_position(instruction_set.allignment_reference)
         except IndexError:
             pass
 
+    def advance(self, dt: float) -> None:
+        """Moves the robot to where its trajectory is dt seconds later."""
+        if self.trajectory is None:
+            return
+        self.elapsed += dt
+        x, y = np.rint(self.trajectory.position_at(self.elapsed)).astype(int).tolist()
+        self.correct_position((x, y))
+        if self.elapsed >= self.trajectory.duration:
+            self.trajectory = None
+
+    def update(self, dt: float) -> None:
+        """Advances the robot by one frame that took dt seconds."""
+        if self.trajectory is not None:
+            self.advance(dt)
+        else:
+            self.move_robot()
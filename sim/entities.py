@@ -1,11 +1,21 @@
 import pygame
 import sim.constants
+from sim.constants import COLOR_MAP, Origin
 from sim.graph_model import GraphModel
+from sim.metrics import Metrics
 from typing import Protocol, List
 
 
 class Viewable(Protocol):
-    def draw(self, surface: pygame.Surface) -> None:
+    def draw(self, surface: pygame.Surface) -> pygame.Rect | None:
+        ...
+
+
+class StaticViewable(Viewable, Protocol):
+    """A viewable that only changes when its version does, so it can be drawn once onto a cached layer."""
+
+    @property
+    def version(self) -> int:
         ...
 
 
@@ -13,6 +23,7 @@ class Warehouse:
     def __init__(self, polygons):
         self.polygons = polygons
         self.color = sim.constants.BLACK
+        self.version = 0
 
     def draw(self, surface: pygame.Surface) -> None:
         for polygon in self.polygons:
@@ -24,7 +35,13 @@ class Graph:
         self.model = model
         self.radius = radius
 
+    @property
+    def version(self) -> int:
+        return self.model.version
+
     def draw(self, surface: pygame.Surface) -> None:
+        for start, end in self.model.blocked_edges:
+            pygame.draw.line(surface, COLOR_MAP[Origin.BLOCKED_EDGE], start, end, width=1)
         for start, end, data in self.model.graph.edges(data=True):
             pygame.draw.line(surface, data["color"], start, end, width=4)
         for node, data in self.model.graph.nodes(data=True):
@@ -42,8 +59,8 @@ class FPSCounter:
     def fps(self) -> int:
         return int(self.clock.get_fps())
 
-    def draw(self, surface: pygame.Surface) -> None:
-        self.font.render_to(
+    def draw(self, surface: pygame.Surface) -> pygame.Rect:
+        return self.font.render_to(
             surf=surface,
             dest=(self.x, self.y),
             text=f"FPS: {self.fps}",
@@ -51,9 +68,65 @@ class FPSCounter:
         )
 
 
+class PlanningIndicator:
+    """Shows a label while the planner is working."""
+
+    def __init__(self, x: int, y: int, planner):
+        self.x = x
+        self.y = y
+        self.planner = planner
+        self.font = pygame.freetype.SysFont("Arial", 20)
+
+    def draw(self, surface: pygame.Surface) -> pygame.Rect | None:
+        if not self.planner.busy:
+            return None
+        return self.font.render_to(
+            surf=surface,
+            dest=(self.x, self.y),
+            text="Planning...",
+            bgcolor=sim.constants.GREEN_POINTER,
+        )
+
+
+class MetricsOverlay:
+    """Rolling p50/p90/p99 of the given metrics sections, in milliseconds."""
+
+    def __init__(self, x: int, y: int, metrics: Metrics, sections: List[str]):
+        self.x = x
+        self.y = y
+        self.metrics = metrics
+        self.sections = sections
+        self.font = pygame.freetype.SysFont("Arial", 14)
+        self.line_height = 18
+
+    def draw(self, surface: pygame.Surface) -> pygame.Rect | None:
+        rects = []
+        for i, name in enumerate(self.sections):
+            percentiles = self.metrics.percentiles(name)
+            if not percentiles:
+                continue
+            text = f"{name}: " + " ".join(f"p{q:g} {t * 1000:.2f}" for q, t in percentiles.items()) + " ms"
+            rects.append(
+                self.font.render_to(
+                    surf=surface,
+                    dest=(self.x, self.y + i * self.line_height),
+                    text=text,
+                    bgcolor=sim.constants.GREEN_POINTER,
+                )
+            )
+        return rects[0].unionall(rects[1:]) if rects else None
+
+
 class VisibilityController:
-    def __init__(self, objects: List[Viewable]):
+    """Draws static objects onto a cached background and composites the moving ones on top every frame."""
+
+    def __init__(self, objects: List[Viewable], background_color: tuple[int, int, int] = sim.constants.WHITE):
         self.visible_objects = objects
+        self.background_color = background_color
+        self.background: pygame.Surface | None = None
+        self._background_key: tuple | None = None
+        self._previous_rects: List[pygame.Rect] = []
+        self.metrics: Metrics | None = None
 
     def show_object(self, x: Viewable) -> None:
         if x not in self.visible_objects:
@@ -63,9 +136,47 @@ class VisibilityController:
         if x in self.visible_objects:
             self.visible_objects.remove(x)
 
-    def draw(self, screen: pygame.Surface):
+    @staticmethod
+    def is_static(obj: Viewable) -> bool:
+        return hasattr(obj, "version")
+
+    def _draw_object(self, obj: Viewable, surface: pygame.Surface) -> pygame.Rect | None:
+        if self.metrics is None:
+            return obj.draw(surface)
+        with self.metrics.section(f"draw {type(obj).__name__}", "draw"):
+            return obj.draw(surface)
+
+    def _update_background(self, screen: pygame.Surface) -> bool:
+        """Redraws the cached background if a static object changed, was shown or hidden. Returns whether it did."""
+        static_objects = [obj for obj in self.visible_objects if self.is_static(obj)]
+        key = (screen.get_size(), tuple((id(obj), obj.version) for obj in static_objects))
+        if key == self._background_key:
+            return False
+        self.background = pygame.Surface(screen.get_size())
+        self.background.fill(self.background_color)
+        for obj in static_objects:
+            self._draw_object(obj, self.background)
+        self._background_key = key
+        return True
+
+    def draw(self, screen: pygame.Surface) -> List[pygame.Rect]:
+        """Draws a frame and returns the rects of the screen that changed."""
+        full_redraw = self._update_background(screen)
+        if full_redraw:
+            screen.blit(self.background, (0, 0))
+        else:
+            # erase the moving objects where they were drawn last frame
+            for rect in self._previous_rects:
+                screen.blit(self.background, rect, rect)
+        rects = []
         for obj in self.visible_objects:
-            obj.draw(screen)
+            if not self.is_static(obj):
+                rect = self._draw_object(obj, screen)
+                if rect is not None:
+                    rects.append(pygame.Rect(rect))
+        dirty = [screen.get_rect()] if full_redraw else self._previous_rects + rects
+        self._previous_rects = rects
+        return dirty
 
 
 class Robot:
@@ -84,5 +195,5 @@ class Robot:
     def move(self, x: int, y: int) -> None:
         self.rect.move_ip(x, y)
 
-    def draw(self, screen: pygame.Surface) -> None:
-        pygame.draw.rect(screen, self.color, self.rect)
+    def draw(self, screen: pygame.Surface) -> pygame.Rect:
+        return pygame.draw.rect(screen, self.color, self.rect)
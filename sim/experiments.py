@@ -0,0 +1,43 @@
+import os
+import glob
+import statistics
+import networkx as nx
+from functools import partial
+from sim.distance_metrics import manhattan_distance
+
+# robot set up on generated layouts by the benchmark and the headless simulation
+ROBOT_START = (10, 10)
+ROBOT_SIZE = 10
+STEP_SIZE = 2
+
+a_star_shortest_path = partial(nx.astar_path, heuristic=manhattan_distance)
+
+
+def find_cases(generations: list[int]) -> list[tuple[str, str, str]]:
+    """Returns (size class, graph path, packages path) for every generated graph with a package set.
+    A graph saved both as .npz and as .json is a single case, read from the .npz files.
+    """
+    cases = []
+    for gen in generations:
+        graphs = {}
+        for extension in ("json", "npz"):
+            for graph_path in glob.glob(f"gen{gen}/visibility_graph-*.{extension}"):
+                suffix = graph_path.removeprefix(f"gen{gen}/visibility_graph-")
+                packages_path = f"gen{gen}/packages-{suffix}"
+                if os.path.exists(packages_path):
+                    # npz files are globbed last and replace their json twins
+                    graphs[os.path.splitext(suffix)[0]] = (graph_path, packages_path)
+        cases.extend((f"gen{gen}", *graphs[name]) for name in sorted(graphs))
+    return cases
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    if len(samples) == 1:
+        return {"p50": samples[0], "p90": samples[0], "max": samples[0], "mean": samples[0]}
+    deciles = statistics.quantiles(samples, n=10, method="inclusive")
+    return {
+        "p50": statistics.median(samples),
+        "p90": deciles[-1],
+        "max": max(samples),
+        "mean": statistics.fmean(samples),
+    }
@@ -0,0 +1,262 @@
+import math
+import networkx as nx
+import numpy as np
+from collections import defaultdict
+from typing import Hashable, NamedTuple
+from sim.constants import Origin
+from sim.control import RobotController
+from sim.graph_model import GraphModel
+from sim.metrics import Metrics, untimed
+from sim.planner import is_stop
+from sim.types import Node
+
+
+class ReservationTable:
+    """Time intervals during which robots hold graph nodes and edges.
+    Edges are undirected, so two robots can neither swap along nor follow each other on the same edge.
+    """
+
+    def __init__(self):
+        self.intervals: dict[Hashable, list[tuple[float, float, int]]] = defaultdict(list)
+
+    @staticmethod
+    def node(node: Node) -> Hashable:
+        return ("node", node)
+
+    @staticmethod
+    def edge(n1: Node, n2: Node) -> Hashable:
+        return ("edge",) + tuple(sorted((n1, n2)))
+
+    def conflicts(self, resource: Hashable, start: float, end: float, robot: int) -> list[tuple[float, float, int]]:
+        return [(s, e, r) for s, e, r in self.intervals.get(resource, ()) if r != robot and s < end and start < e]
+
+    def earliest_free(self, resource: Hashable, start: float, duration: float, robot: int) -> float:
+        """Earliest time from start at which the robot can hold the resource for duration seconds."""
+        t = start
+        while conflicts := self.conflicts(resource, t, t + duration, robot):
+            t = max(e for _, e, _ in conflicts)
+        return t
+
+    def reserve(self, resource: Hashable, start: float, end: float, robot: int) -> None:
+        self.intervals[resource].append((start, end, robot))
+
+    def release(self, robot: int, start: float) -> None:
+        """Drops the robot's reservations that begin at or after start."""
+        for intervals in self.intervals.values():
+            intervals[:] = [(s, e, r) for s, e, r in intervals if r != robot or s < start]
+
+
+class Schedule:
+    """Timed waypoints driven at constant speed, with waits where consecutive waypoints coincide.
+    Acceleration and slowing down for turns are ignored, unlike in a MotionProfile trajectory.
+    Exposes the same interface as a Trajectory so a RobotController can follow it.
+    """
+
+    def __init__(self, points: list[Node], times: list[float]):
+        self.points = np.asarray(points, dtype=float).reshape(-1, 2)
+        self.times = np.asarray(times, dtype=float)
+
+    @property
+    def duration(self) -> float:
+        return float(self.times[-1]) if len(self.times) else 0.0
+
+    def position_at(self, t: float) -> np.ndarray:
+        return np.array([np.interp(t, self.times, self.points[:, 0]), np.interp(t, self.times, self.points[:, 1])])
+
+    def speed_at(self, t: float) -> float:
+        i = int(np.searchsorted(self.times, t, side="right"))
+        if i == 0 or i >= len(self.times):
+            return 0.0
+        return math.dist(self.points[i - 1], self.points[i]) / (self.times[i] - self.times[i - 1])
+
+    def remaining_points(self, t: float) -> list[Node]:
+        return [tuple(point) for point in np.rint(self.points[self.times > t]).astype(int).tolist()]
+
+
+class RobotSchedule(NamedTuple):
+    route: list[Node]
+    schedule: Schedule
+    wait_time: float
+    reroutes: int
+    conflicts: int
+
+
+def schedule_route(
+    robot: int,
+    route: list[Node],
+    graph: nx.Graph,
+    stops: set[Node],
+    reservations: ReservationTable,
+    speed: float,
+    hold: float,
+    max_wait: float,
+    start_time: float = 0.0,
+) -> RobotSchedule:
+    """Times a route over the graph against the reservations of robots planned earlier and reserves it.
+    A leg is delayed until its edge and end node are free. If the delay exceeds max_wait, or an earlier robot needs
+    the node the robot would wait at, the way to the next stop is replanned once without the blocked edge and taken
+    if it arrives sooner. Nodes where earlier robots park after their last stop are avoided altogether.
+    Waits that still collide with an earlier robot, and drives through a parked robot, are counted as conflicts.
+    The robot keeps its own final node reserved for good. The route is driven from start_time on.
+    """
+    route = list(route)
+    points, times = [route[0]], [start_time]
+    t, wait_time, reroutes, conflicts, i = start_time, 0.0, 0, 0, 0
+    blocked: set[Hashable] = set()
+    while i < len(route) - 1:
+        a, b = route[i], route[i + 1]
+        duration = math.dist(a, b) / speed
+        departure = departure_time(robot, a, b, t, duration, reservations, hold)
+        edge = ReservationTable.edge(a, b)
+        parked = math.isinf(departure)
+        can_wait = not parked and not reservations.conflicts(ReservationTable.node(a), t, departure + hold, robot)
+        if (parked or departure - t > max_wait or not can_wait) and edge not in blocked:
+            blocked.add(edge)
+            j = next((j for j in range(i + 1, len(route)) if route[j] in stops), len(route) - 1)
+            avoid = [b] if parked and b != route[j] else []
+            detour = reroute(graph, route[i], route[j], edge, avoid)
+            if detour is not None and path_time(detour, speed) < departure - t + path_time(route[i : j + 1], speed):
+                route[i : j + 1] = detour
+                reroutes += 1
+                continue
+        if parked:
+            # there is no way around the parked robot
+            departure = t
+        conflicts += not can_wait
+        reservations.reserve(ReservationTable.node(a), t, departure + hold, robot)
+        reservations.reserve(edge, departure, departure + duration, robot)
+        if departure > t:
+            points.append(a)
+            times.append(departure)
+            wait_time += departure - t
+        t = departure + duration
+        points.append(b)
+        times.append(t)
+        i += 1
+    reservations.reserve(ReservationTable.node(route[-1]), t, math.inf, robot)
+    return RobotSchedule(route, Schedule(points, times), wait_time, reroutes, conflicts)
+
+
+def departure_time(
+    robot: int, a: Node, b: Node, t: float, duration: float, reservations: ReservationTable, hold: float
+) -> float:
+    """Earliest departure from a, no earlier than t, with the edge free while driving and b free on arrival."""
+    departure = t
+    while True:
+        departure = reservations.earliest_free(ReservationTable.edge(a, b), departure, duration, robot)
+        arrival = reservations.earliest_free(ReservationTable.node(b), departure + duration, hold, robot)
+        if arrival == departure + duration:
+            return departure
+        departure = arrival - duration
+
+
+def path_time(path: list[Node], speed: float) -> float:
+    return sum(math.dist(p1, p2) for p1, p2 in zip(path[:-1], path[1:])) / speed
+
+
+def reroute(
+    graph: nx.Graph, source: Node, target: Node, edge: Hashable, nodes: list[Node] = ()
+) -> list[Node] | None:
+    """Shortest path between two nodes that avoids the given edge and nodes, or None if there is none."""
+    _, n1, n2 = edge
+    view = nx.restricted_view(graph, nodes=list(nodes), edges=[(n1, n2)])
+    try:
+        return nx.shortest_path(view, source, target, weight=lambda u, v, _: math.dist(u, v))
+    except nx.NetworkXNoPath:
+        return None
+
+
+class FleetPlan(NamedTuple):
+    robots: list[RobotSchedule]
+    reservations: ReservationTable
+    speed: float
+    hold: float
+    max_wait: float = math.inf
+
+    @property
+    def makespan(self) -> float:
+        return max((r.schedule.duration for r in self.robots), default=0.0)
+
+    @property
+    def wait_time(self) -> float:
+        return sum(r.wait_time for r in self.robots)
+
+    @property
+    def conflicts(self) -> int:
+        return sum(r.conflicts for r in self.robots)
+
+    def splice(self, robot: int, controller: RobotController, model: GraphModel, keep: int, tail: list[Node]) -> None:
+        """Keeps the first points of the robot's remaining route and reschedules the tail after them.
+        The robot's reservations from the last kept point on are released and made again for the new tail,
+        and the controller keeps its place in the schedule.
+        """
+        schedule = controller.trajectory
+        if not isinstance(schedule, Schedule):
+            controller.splice_route(keep, tail)
+            return
+        anchor = int(np.searchsorted(schedule.times, controller.elapsed, side="right")) + keep - 1
+        start_time = float(schedule.times[anchor])
+        self.reservations.release(robot, start_time)
+        route = [controller.remaining_route()[keep - 1]] + list(tail)
+        stops = {node for node in tail if is_stop(model, node)}
+        robot_schedule = schedule_route(
+            robot, route, model.graph, stops, self.reservations, self.speed, self.hold, self.max_wait, start_time
+        )
+        spliced = Schedule(
+            np.vstack((schedule.points[:anchor], robot_schedule.schedule.points)),
+            np.concatenate((schedule.times[:anchor], robot_schedule.schedule.times)),
+        )
+        controller.follow(spliced, elapsed=controller.elapsed)
+        self.robots[robot] = robot_schedule._replace(schedule=spliced)
+
+
+def plan_fleet(
+    model: GraphModel,
+    starts: list[Node],
+    pick_lists: list[list[Node]],
+    speed: float,
+    hold: float,
+    max_wait: float = math.inf,
+    metrics: Metrics | None = None,
+) -> FleetPlan:
+    """Solves each robot's pick list on its own snapshot of the model, then schedules the routes one robot after
+    the other against a shared reservation table, so earlier robots have priority.
+    Given metrics, every stage of every robot is recorded as a planning section.
+    """
+    section = metrics.section if metrics is not None else untimed
+    reservations = ReservationTable()
+    robots = []
+    for robot, (start, picks) in enumerate(zip(starts, pick_lists)):
+        snapshot = model.snapshot()
+        snapshot.reset()
+        nodes = list(dict.fromkeys([start] + list(picks)))
+        for node in nodes:
+            snapshot.insert_node(node)
+        # the start is index 0 of the matrix, which the solver's tour begins with
+        with section("matrix", "planning"):
+            matrix = [[snapshot.path_length(snapshot.path_between(n1, n2)) for n2 in nodes] for n1 in nodes]
+        with section("tsp", "planning"):
+            tour = snapshot.tsp_solver(matrix) if len(nodes) > 1 else [0]
+        with section("route", "planning"):
+            route = [start] + snapshot.route_through(start, [nodes[i] for i in tour[1:]])
+        stops = set(nodes[1:])
+        with section("schedule", "planning"):
+            robots.append(schedule_route(robot, route, snapshot.graph, stops, reservations, speed, hold, max_wait))
+    return FleetPlan(robots, reservations, speed, hold, max_wait)
+
+
+def plan_fleet_for_model(
+    model: GraphModel,
+    starts: list[Node],
+    speed: float,
+    hold: float,
+    max_wait: float = math.inf,
+    metrics: Metrics | None = None,
+) -> FleetPlan:
+    """Splits the model's user nodes between the robots by nearest start and plans the fleet."""
+    pick_lists: list[list[Node]] = [[] for _ in starts]
+    for node in model.list_nodes_from(origin=Origin.USER_NODE):
+        if node not in starts:
+            nearest = min(range(len(starts)), key=lambda r: math.dist(node, starts[r]))
+            pick_lists[nearest].append(node)
+    return plan_fleet(model, starts, pick_lists, speed, hold, max_wait, metrics)
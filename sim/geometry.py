@@ -1,32 +1,37 @@
-import math
-from sympy import Segment2D, Point2D
+import numpy as np
 
 
-def split_segment(segment: Segment2D, step_size: int) -> list[Point2D]:
-    """Splits the segment into equal parts and returns a list of points that match each part's starting point."""
-    n = math.ceil(segment.length / step_size)
-    move_vector = segment.direction / n
-    movement = [segment.p1 + move_vector]
-    for _ in range(n - 2):
-        next_move = movement[-1] + move_vector
-        movement.append(next_move)
-    movement.append(segment.p2)
-    return movement
+def steps_per_leg(points: np.ndarray, step_size: int) -> np.ndarray:
+    """Number of equal parts each leg between consecutive points is split into, 0 for zero-length legs."""
+    lengths = np.hypot(*np.diff(points, axis=0).T)
+    return np.ceil(lengths / step_size).astype(int)
 
 
-def create_robot_instructions(points: list[Point2D], robot_starting_point: Point2D) -> list:
-    """Transforms points into tuples of integer roundings of the given 2D coordinates."""
-    points = [robot_starting_point] + points[::]  # list copy trick to avoid side effects
-    instructions = []
-    for p1, p2 in zip(points[:-1], points[1:]):
-        difference = (p2 - p1).coordinates
-        instructions.append((round(difference[0]), round(difference[1])))
-    return instructions
+def split_route(points: np.ndarray, step_size: int) -> tuple[np.ndarray, np.ndarray]:
+    """Splits every leg of the route into equal parts in one pass.
+    Returns the end point of each part and the number of parts per leg; the last part of a leg ends exactly on its end point.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    n_steps = steps_per_leg(points, step_size)
+    leg = np.repeat(np.arange(len(n_steps)), n_steps)
+    # 1..n within each leg
+    k = np.arange(len(leg)) - np.repeat(np.cumsum(n_steps) - n_steps, n_steps) + 1
+    fraction = (k / n_steps[leg])[:, None]
+    positions = points[leg] + (points[leg + 1] - points[leg]) * fraction
+    return positions, n_steps
+
+
+def create_route_moves(points: np.ndarray, step_size: int) -> tuple[np.ndarray, np.ndarray]:
+    """Returns integer (dx, dy) moves along the whole route and the number of moves per leg.
+    Moves are differences of rounded positions, so the moves of a leg add up to exactly its end point.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    positions, n_steps = split_route(points, step_size)
+    rounded = np.vstack((np.rint(points[:1]), np.rint(positions)))
+    return np.diff(rounded, axis=0).astype(int), n_steps
 
 
 def create_robot_moves(x_start: int, y_start: int, x_end: int, y_end: int, step_size: int) -> list:
     """Interface for external use of this module."""
-    start = Point2D(x_start, y_start)
-    end = Point2D(x_end, y_end)
-    path = Segment2D(start, end)
-    return create_robot_instructions(points=split_segment(path, step_size), robot_starting_point=start)
+    moves, _ = create_route_moves(np.array([(x_start, y_start), (x_end, y_end)]), step_size)
+    return [tuple(move) for move in moves.tolist()]
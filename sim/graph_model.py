@@ -1,11 +1,14 @@
+import copy
+import math
 import networkx as nx
-from typing import List
+import numpy as np
+from typing import Iterable, List
 from sim.constants import Origin, COLOR_MAP
 from sim.tsp import TSP_Solver, ortools_solver
 from sim.types import Node
-from sim.utils import load_graph_data_from_json
+from sim.utils import load_graph_data
 from sim.distance_metrics import DistanceMetric, manhattan_distance
-from sim.shortest_path import ShortestPathAlgorithm, ShortestPathLengthAlgorithm
+from sim.shortest_path import ShortestPathAlgorithm
 
 
 class GraphModel:
@@ -13,12 +16,11 @@ class GraphModel:
         self,
         data_path: str,
         sp_alg: ShortestPathAlgorithm = nx.shortest_path,
-        sp_length_alg: ShortestPathLengthAlgorithm = nx.shortest_path_length,
         tsp_solver: TSP_Solver = ortools_solver,
         distance_metric: DistanceMetric = manhattan_distance,
     ):
         self.graph = nx.Graph()
-        graph_data = load_graph_data_from_json(data_path)
+        graph_data = load_graph_data(data_path)
         self.graph.add_nodes_from(
             graph_data["nodes"], color=COLOR_MAP[Origin.BASE_NODE]
         )
@@ -27,9 +29,14 @@ class GraphModel:
         )
 
         self.shortest_path = sp_alg
-        self.shortest_path_length = sp_length_alg
         self.tsp_solver = tsp_solver
         self.distance_metric = distance_metric
+        # bumped on every change that affects how the graph is drawn
+        self.version = 0
+        # shortest paths between user nodes, repaired in place when edges are blocked or unblocked
+        self.path_cache: dict[tuple[Node, Node], List[Node]] = {}
+        self.blocked_edges: dict[tuple[Node, Node], dict] = {}
+        self.blocked_nodes: dict[Node, List[tuple[Node, Node]]] = {}
 
     def insert_node(self, node: Node) -> None:
         nodes = [
@@ -44,8 +51,18 @@ class GraphModel:
             if best_dist > distance:
                 nearest = neighbour
                 best_dist = distance
+        if node in self.graph:
+            # only new nodes are leaves that cannot shorten cached paths
+            self.path_cache.clear()
         self.graph.add_node(node, color=COLOR_MAP[Origin.USER_NODE])
         self.graph.add_edge(node, nearest, color=COLOR_MAP[Origin.SOLUTION_EDGE])
+        self.version += 1
+
+    def remove_node(self, node: Node) -> None:
+        """Removes an inserted user node with the cached paths to and from it."""
+        self.graph.remove_node(node)
+        self.path_cache = {pair: path for pair, path in self.path_cache.items() if node not in pair}
+        self.version += 1
 
     def list_nodes_from(self, origin: Origin) -> List[Node]:
         nodes = []
@@ -66,6 +83,20 @@ class GraphModel:
         nx.set_edge_attributes(
             self.graph, values=COLOR_MAP[Origin.BASE_EDGE], name="color"
         )
+        self.path_cache.clear()
+        self.version += 1
+
+    def path_between(self, n1: Node, n2: Node) -> List[Node]:
+        """Shortest path between two nodes, cached for both directions."""
+        path = self.path_cache.get((n1, n2))
+        if path is None:
+            path = self.shortest_path(self.graph, source=n1, target=n2, weight=self.distance_metric)
+            self.path_cache[(n1, n2)] = path
+            self.path_cache[(n2, n1)] = path[::-1]
+        return path
+
+    def path_length(self, path: List[Node]) -> int | float:
+        return sum(self.distance_metric(p1, p2) for p1, p2 in zip(path[:-1], path[1:]))
 
     def create_distance_matrix(self) -> List[List[int]]:
         matrix = []
@@ -73,33 +104,154 @@ class GraphModel:
         for n1 in nodes:
             row = []
             for n2 in nodes:
-                length = self.shortest_path_length(
-                    self.graph, source=n1, target=n2, weight=self.distance_metric
-                )
-                row.append(length)
+                row.append(self.path_length(self.path_between(n1, n2)))
             matrix.append(row)
         return matrix
 
+    def block_edge(self, n1: Node, n2: Node) -> int:
+        """Disables an edge and repairs the cached paths that used it. Returns the number of repaired paths."""
+        return self._block_edges([(n1, n2)])
+
+    def unblock_edge(self, n1: Node, n2: Node) -> int:
+        """Restores a blocked edge and repairs the cached paths it may shorten. Returns the number of repaired paths."""
+        return self._unblock_edges([(n1, n2)])
+
+    def block_node(self, node: Node) -> int:
+        """Disables every edge of a node; blocking a blocked node does nothing. Returns the number of repaired paths."""
+        if node in self.blocked_nodes:
+            return 0
+        edges = [(node, neighbour) for neighbour in self.graph.neighbors(node)]
+        self.blocked_nodes[node] = edges
+        return self._block_edges(edges)
+
+    def unblock_node(self, node: Node) -> int:
+        return self._unblock_edges(self.blocked_nodes.pop(node, []))
+
+    def _block_edges(self, edges: List[tuple[Node, Node]]) -> int:
+        blocked = set()
+        for n1, n2 in edges:
+            if self.graph.has_edge(n1, n2):
+                self.blocked_edges[(n1, n2)] = self.graph.edges[n1, n2]
+                self.graph.remove_edge(n1, n2)
+                blocked |= {(n1, n2), (n2, n1)}
+        # only paths that ran over a blocked edge can get longer
+        affected = [
+            pair for pair, path in self.path_cache.items() if any(step in blocked for step in zip(path[:-1], path[1:]))
+        ]
+        self.version += 1
+        return self._repair_paths(affected)
+
+    def _unblock_edges(self, edges: List[tuple[Node, Node]]) -> int:
+        """Restores edges and repairs the cached paths that a restored edge makes shorter.
+        A path can only get shorter by running over a restored edge. Each cached path is first checked against
+        the metric distances to the edge's ends. Only if some path passes that check are the graph distances from
+        both ends searched, up to the length of the longest such path. Every cached path's length is summed once.
+        """
+        restored = []
+        for n1, n2 in edges:
+            key = (n1, n2) if (n1, n2) in self.blocked_edges else (n2, n1)
+            if key not in self.blocked_edges:
+                continue
+            still_blocked = next((node for node in key if node in self.blocked_nodes), None)
+            if still_blocked is not None:
+                # the edge comes back with the node that is still blocked
+                if key not in self.blocked_nodes[still_blocked] and key[::-1] not in self.blocked_nodes[still_blocked]:
+                    self.blocked_nodes[still_blocked].append(key)
+                continue
+            self.graph.add_edge(*key, **self.blocked_edges.pop(key))
+            restored.append(key)
+        lengths = {pair: self.path_length(path) for pair, path in self.path_cache.items()}
+        affected = set()
+        for u, v in restored:
+            weight = self.distance_metric(u, v)
+            # the metric never exceeds the graph distance, so it rules out most paths without a search
+            candidates = [
+                pair
+                for pair, length in lengths.items()
+                if self._via_edge(pair, u, v, weight, self.distance_metric) < length - 1e-9
+            ]
+            if not candidates:
+                continue
+            cutoff = max(lengths[pair] for pair in candidates)
+            from_end = {
+                end: nx.single_source_dijkstra_path_length(self.graph, end, cutoff=cutoff, weight=self.distance_metric)
+                for end in (u, v)
+            }
+            affected.update(
+                pair
+                for pair in candidates
+                if self._via_edge(pair, u, v, weight, lambda end, node: from_end[end].get(node, math.inf))
+                < lengths[pair] - 1e-9
+            )
+        self.version += 1
+        return self._repair_paths(affected)
+
+    @staticmethod
+    def _via_edge(pair: tuple[Node, Node], u: Node, v: Node, weight: float, distance) -> float:
+        """Length of the shortest walk between a pair of nodes over the edge uv, given distances from its ends."""
+        a, b = pair
+        return min(distance(u, a) + weight + distance(v, b), distance(v, a) + weight + distance(u, b))
+
+    def _repair_paths(self, pairs: Iterable[tuple[Node, Node]]) -> int:
+        """Recomputes the given cached paths; pairs that became unreachable are dropped from the cache."""
+        pairs = list(pairs)
+        for pair in pairs:
+            self.path_cache.pop(pair, None)
+        for n1, n2 in pairs:
+            if (n1, n2) not in self.path_cache:
+                try:
+                    self.path_between(n1, n2)
+                except nx.NetworkXNoPath:
+                    pass
+        return len(pairs)
+
+    def nearest_edge(self, point: Node, edges: Iterable[tuple[Node, Node]] | None = None) -> tuple[Node, Node]:
+        """The edge closest to a point, among the graph's edges unless others are given."""
+        edges = list(self.graph.edges if edges is None else edges)
+        segments = np.array(edges, dtype=float)
+        a, b = segments[:, 0], segments[:, 1]
+        ab = b - a
+        squared_length = np.maximum(np.einsum("ij,ij->i", ab, ab), 1e-12)
+        t = np.clip(np.einsum("ij,ij->i", np.asarray(point, dtype=float) - a, ab) / squared_length, 0, 1)
+        distances = np.hypot(*(a + t[:, None] * ab - point).T)
+        return edges[int(np.argmin(distances))]
+
+    def route_through(self, start: Node, stops: List[Node]) -> List[Node]:
+        """Route from a graph node through the stops in the given order, without the start itself."""
+        route = []
+        for n1, n2 in zip([start] + stops[:-1], stops):
+            route.extend(self.path_between(n1, n2)[1:])
+        return route
+
     def solve_tsp(self) -> list:
-        nodes_to_visit = self.list_nodes_from(origin=Origin.USER_NODE)
         path = self.tsp_solver(self.create_distance_matrix())
+        return self.expand_route(path)
+
+    def expand_route(self, path: List[int]) -> list:
+        """Expands an order of user nodes (distance matrix indices) into the full route over the graph."""
+        nodes_to_visit = self.list_nodes_from(origin=Origin.USER_NODE)
         nodes_on_path = [nodes_to_visit[idx] for idx in path]
 
-        optimal_route = []
-        for n1, n2 in zip(nodes_on_path[:-1], nodes_on_path[1:]):
-            optimal_route.extend(
-                self.shortest_path(
-                    self.graph, source=n1, target=n2, weight=self.distance_metric
-                )[1:]
-            )
+        optimal_route = self.route_through(nodes_on_path[0], nodes_on_path[1:])
 
-        # color map significant nodes and edges in the optimal route
-        for n1, n2 in zip(optimal_route[:-1], optimal_route[1:]):
-            self.graph[n1][n2]["color"] = COLOR_MAP[Origin.SOLUTION_EDGE]
-        self.graph.nodes[optimal_route[0]]["color"] = COLOR_MAP[
-            Origin.SOLUTION_START_NODE
-        ]
-        self.graph.nodes[optimal_route[-1]]["color"] = COLOR_MAP[
-            Origin.SOLUTION_END_NODE
-        ]
+        self.highlight_route(optimal_route)
         return optimal_route
+
+    def highlight_route(self, route: List[Node]) -> None:
+        """Color maps significant nodes and edges of a route over the graph."""
+        if not route:
+            return
+        for n1, n2 in zip(route[:-1], route[1:]):
+            self.graph[n1][n2]["color"] = COLOR_MAP[Origin.SOLUTION_EDGE]
+        self.graph.nodes[route[0]]["color"] = COLOR_MAP[Origin.SOLUTION_START_NODE]
+        self.graph.nodes[route[-1]]["color"] = COLOR_MAP[Origin.SOLUTION_END_NODE]
+        self.version += 1
+
+    def snapshot(self) -> "GraphModel":
+        """Returns a copy that can be planned on while this model keeps changing."""
+        model = copy.copy(self)
+        model.graph = self.graph.copy()
+        model.path_cache = dict(self.path_cache)
+        model.blocked_edges = dict(self.blocked_edges)
+        model.blocked_nodes = dict(self.blocked_nodes)
+        return model
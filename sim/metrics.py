@@ -0,0 +1,64 @@
+import os
+import json
+import time
+import threading
+import numpy as np
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class Metrics:
+    """Records timed sections as rolling windows for live percentiles and as Chrome trace events.
+    Sections can be recorded from any thread, e.g. the planning worker.
+    """
+
+    def __init__(self, window: int = 300, max_events: int = 100_000):
+        self.window = window
+        self.samples: dict[str, deque[float]] = defaultdict(lambda: deque(maxlen=self.window))
+        self.events: deque[dict] = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def record(self, name: str, start: float, duration: float, category: str = "frame") -> None:
+        """Records a section that started at perf_counter time start and took duration seconds."""
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self._origin) * 1e6,
+            "dur": duration * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        with self._lock:
+            self.samples[name].append(duration)
+            self.events.append(event)
+
+    @contextmanager
+    def section(self, name: str, category: str = "frame") -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter() - start, category)
+
+    def percentiles(self, name: str, q: tuple[float, ...] = (50, 90, 99)) -> dict[float, float]:
+        """Percentiles in seconds over the rolling window of a section, empty if it was never recorded."""
+        with self._lock:
+            samples = list(self.samples.get(name, ()))
+        if not samples:
+            return {}
+        return dict(zip(q, np.percentile(samples, q).tolist()))
+
+    def export_chrome_trace(self, path: str) -> None:
+        """Writes the recorded events in the Chrome trace event format (chrome://tracing, Perfetto)."""
+        with self._lock:
+            events = list(self.events)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+@contextmanager
+def untimed(name: str, category: str = "frame") -> Iterator[None]:
+    yield
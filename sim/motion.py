@@ -0,0 +1,126 @@
+import math
+from dataclasses import dataclass
+import numpy as np
+
+
+@dataclass(frozen=True)
+class MotionProfile:
+    """Robot dynamics in pixels and seconds.
+    turn_slowdown is the fraction of max_speed lost at a junction per pi radians of turning.
+    """
+
+    max_speed: float
+    acceleration: float
+    turn_slowdown: float = 1.0
+
+
+def remove_repeated_points(points: np.ndarray) -> np.ndarray:
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if not len(points):
+        return points
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:] = np.any(np.diff(points, axis=0) != 0, axis=1)
+    return points[keep]
+
+
+def turn_angles(directions: np.ndarray) -> np.ndarray:
+    """Angles between consecutive unit direction vectors, in [0, pi]."""
+    dots = np.einsum("ij,ij->i", directions[:-1], directions[1:])
+    return np.arccos(np.clip(dots, -1.0, 1.0))
+
+
+def junction_speeds(
+    lengths: np.ndarray, directions: np.ndarray, profile: MotionProfile, initial_speed: float = 0.0
+) -> np.ndarray:
+    """Speeds at the route's points: limited by the turn angle, reachable by accelerating forward
+    and low enough to brake for every later point. The route ends at rest.
+    """
+    speeds = np.empty(len(lengths) + 1)
+    speeds[0] = min(initial_speed, profile.max_speed)
+    speeds[1:-1] = profile.max_speed * np.clip(1 - profile.turn_slowdown * turn_angles(directions) / math.pi, 0, 1)
+    speeds[-1] = 0.0
+    two_a = 2 * profile.acceleration
+    for i, length in enumerate(lengths.tolist()):
+        speeds[i + 1] = min(speeds[i + 1], math.sqrt(speeds[i] ** 2 + two_a * length))
+    for i in range(len(lengths) - 1, -1, -1):
+        speeds[i] = min(speeds[i], math.sqrt(speeds[i + 1] ** 2 + two_a * lengths[i]))
+    return speeds
+
+
+class Trajectory:
+    """A route followed with a trapezoidal velocity profile on every leg."""
+
+    def __init__(self, points: np.ndarray, profile: MotionProfile, initial_speed: float = 0.0):
+        self.points = remove_repeated_points(points)
+        self.profile = profile
+        legs = np.diff(self.points, axis=0)
+        self.lengths = np.hypot(*legs.T) if len(legs) else np.empty(0)
+        self.directions = legs / self.lengths[:, None] if len(legs) else np.empty((0, 2))
+        speeds = junction_speeds(self.lengths, self.directions, profile, initial_speed)
+        self.entry_speeds = speeds[:-1]
+        self.exit_speeds = speeds[1:]
+
+        a = profile.acceleration
+        v0, v1 = self.entry_speeds, self.exit_speeds
+        self.peak_speeds = np.minimum(profile.max_speed, np.sqrt((2 * a * self.lengths + v0**2 + v1**2) / 2))
+        self.accelerating_time = (self.peak_speeds - v0) / a
+        self.braking_time = (self.peak_speeds - v1) / a
+        self.accelerating_distance = (self.peak_speeds**2 - v0**2) / (2 * a)
+        braking_distance = (self.peak_speeds**2 - v1**2) / (2 * a)
+        cruising_distance = np.maximum(self.lengths - self.accelerating_distance - braking_distance, 0)
+        self.cruising_time = cruising_distance / self.peak_speeds
+        self.leg_durations = self.accelerating_time + self.cruising_time + self.braking_time
+        self.leg_start_times = np.concatenate(([0.0], np.cumsum(self.leg_durations)))
+
+    @property
+    def duration(self) -> float:
+        return float(self.leg_start_times[-1])
+
+    def leg_at(self, t: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the leg index and the time elapsed on that leg for times along the trajectory."""
+        t = np.clip(t, 0, self.duration)
+        leg = np.clip(np.searchsorted(self.leg_start_times, t, side="right") - 1, 0, len(self.lengths) - 1)
+        return leg, t - self.leg_start_times[leg]
+
+    def _phases(self, leg: np.ndarray, tau: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        accelerating = np.minimum(tau, self.accelerating_time[leg])
+        cruising = np.clip(tau - self.accelerating_time[leg], 0, self.cruising_time[leg])
+        braking = np.clip(tau - self.accelerating_time[leg] - self.cruising_time[leg], 0, self.braking_time[leg])
+        return accelerating, cruising, braking
+
+    def position_at(self, t: np.ndarray | float) -> np.ndarray:
+        if not len(self.lengths):
+            return np.broadcast_to(self.points[-1], np.shape(t) + (2,)).copy()
+        leg, tau = self.leg_at(t)
+        accelerating, cruising, braking = self._phases(leg, tau)
+        a = self.profile.acceleration
+        v0, vp = self.entry_speeds[leg], self.peak_speeds[leg]
+        distance = (
+            v0 * accelerating
+            + a * accelerating**2 / 2
+            + vp * cruising
+            + vp * braking
+            - a * braking**2 / 2
+        )
+        distance = np.minimum(distance, self.lengths[leg])
+        return self.points[leg] + self.directions[leg] * distance[..., None]
+
+    def speed_at(self, t: np.ndarray | float) -> np.ndarray:
+        if not len(self.lengths):
+            return np.zeros(np.shape(t))
+        leg, tau = self.leg_at(t)
+        accelerating, _, braking = self._phases(leg, tau)
+        a = self.profile.acceleration
+        return self.entry_speeds[leg] + a * accelerating - a * braking
+
+    def remaining_points(self, t: float) -> list[tuple[int, int]]:
+        """Points still ahead of the trajectory at time t, starting with the end of the current leg."""
+        if t >= self.duration:
+            return []
+        leg, _ = self.leg_at(t)
+        return [tuple(point) for point in np.rint(self.points[int(leg) + 1 :]).astype(int).tolist()]
+
+
+def route_duration(points: np.ndarray, profile: MotionProfile) -> float:
+    """Travel time of a route that starts and ends at rest."""
+    return Trajectory(points, profile).duration
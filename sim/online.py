@@ -0,0 +1,118 @@
+import math
+import time
+import networkx as nx
+from typing import Callable
+from sim.control import RobotController
+from sim.graph_model import GraphModel
+from sim.planner import is_stop
+from sim.types import Node
+
+Cost = Callable[[Node, Node], float]
+
+
+def cheapest_insertion(start: Node, stops: list[Node], node: Node, cost: Cost) -> int:
+    """Position in the open tour start -> stops at which inserting the node adds the least cost."""
+    best_position, best_increase = len(stops), cost(stops[-1] if stops else start, node)
+    for i, next_stop in enumerate(stops):
+        previous = stops[i - 1] if i else start
+        increase = cost(previous, node) + cost(node, next_stop) - cost(previous, next_stop)
+        if increase < best_increase:
+            best_position, best_increase = i, increase
+    return best_position
+
+
+def two_opt(start: Node, stops: list[Node], cost: Cost, max_evaluations: int = 2000) -> list[Node]:
+    """First-improvement 2-opt on an open tour with a fixed start, stopped after max_evaluations moves were tried."""
+    stops = list(stops)
+    evaluations = 0
+    improved = True
+    while improved and evaluations < max_evaluations:
+        improved = False
+        for i in range(len(stops) - 1):
+            previous = stops[i - 1] if i else start
+            for j in range(i + 1, len(stops)):
+                evaluations += 1
+                after = cost(stops[j], stops[j + 1]) if j + 1 < len(stops) else 0
+                reversed_after = cost(stops[i], stops[j + 1]) if j + 1 < len(stops) else 0
+                delta = cost(previous, stops[j]) + reversed_after - cost(previous, stops[i]) - after
+                if delta < -1e-9:
+                    stops[i : j + 1] = stops[i : j + 1][::-1]
+                    improved = True
+                    break
+                if evaluations >= max_evaluations:
+                    break
+            if improved or evaluations >= max_evaluations:
+                break
+    return stops
+
+
+class OnlineInserter:
+    """Merges stops that arrive during execution into the robot's remaining tour and splices the new tail
+    into its controller, keeping the part of the route before the first changed stop.
+    Robots that follow a fleet schedule pass the plan's splice, so the new tail is reserved as well.
+    """
+
+    def __init__(
+        self,
+        model: GraphModel,
+        controller: RobotController,
+        max_evaluations: int = 2000,
+        splice: Callable[[int, list[Node]], None] | None = None,
+    ):
+        self.model = model
+        self.controller = controller
+        self.max_evaluations = max_evaluations
+        self.splice = splice or controller.splice_route
+
+    def cost(self, n1: Node, n2: Node) -> float:
+        """Shortest path length, infinite between nodes that are not connected."""
+        try:
+            return self.model.path_length(self.model.path_between(n1, n2))
+        except nx.NetworkXNoPath:
+            return math.inf
+
+    def insert(self, node: Node) -> float | None:
+        """Adds a stop and returns the re-planning latency in seconds.
+        A stop the robot cannot reach is rejected and removed from the model again, returning None.
+        """
+        start_time = time.perf_counter()
+        inserted = node not in self.model.graph
+        if inserted:
+            self.model.insert_node(node)
+        remaining = self.controller.remaining_route()
+        start = remaining[0] if remaining else (self.controller.robot.x, self.controller.robot.y)
+        # a robot off the graph is attached only for costing, so it never becomes a stop of later tours
+        attached = start not in self.model.graph
+        if attached:
+            self.model.insert_node(start)
+        try:
+            # the graph is undirected, so the stop fits anywhere in the tour if the robot can reach it at all
+            if math.isinf(self.cost(start, node)):
+                if inserted:
+                    self.model.remove_node(node)
+                return None
+            if not remaining:
+                self.controller.push_new_instructions(self.model.route_through(start, [node]))
+                return time.perf_counter() - start_time
+            self._merge(start, remaining, node)
+        finally:
+            if attached:
+                self.model.remove_node(start)
+        return time.perf_counter() - start_time
+
+    def _merge(self, start: Node, remaining: list[Node], node: Node) -> None:
+        """Inserts the stop into the remaining tour, improves it and splices the changed tail in."""
+        # schedules repeat the points robots wait at
+        stop_positions = [
+            i for i, point in enumerate(remaining) if i and point != remaining[i - 1] and is_stop(self.model, point)
+        ]
+        stops = [remaining[i] for i in stop_positions]
+        new_stops = list(stops)
+        new_stops.insert(cheapest_insertion(start, stops, node, self.cost), node)
+        new_stops = two_opt(start, new_stops, self.cost, self.max_evaluations)
+
+        # the route up to the last stop that keeps its place is spliced in unchanged
+        unchanged = next((i for i, (old, new) in enumerate(zip(stops, new_stops)) if old != new), len(stops))
+        anchor_position = stop_positions[unchanged - 1] if unchanged else 0
+        tail = self.model.route_through(remaining[anchor_position], new_stops[unchanged:])
+        self.splice(anchor_position + 1, tail)
@@ -0,0 +1,104 @@
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, Callable, NamedTuple
+from geometry.visibility import ObstacleEdgeIndex
+import networkx as nx
+from sim.constants import COLOR_MAP, Origin
+from sim.control import RobotController
+from sim.graph_model import GraphModel
+from sim.metrics import Metrics, untimed
+from sim.shortcut import shortcut_route
+from sim.types import Node
+
+
+class Plan(NamedTuple):
+    route: list[Node]
+    shortcut: list[Node]
+    saved: float
+
+
+def plan_route(
+    model: GraphModel,
+    obstacles: ObstacleEdgeIndex | None = None,
+    clearance: float = 0.0,
+    start: Node | None = None,
+    metrics: Metrics | None = None,
+) -> Plan:
+    """Solves the TSP over the model and, given obstacles, shortcuts the resulting route.
+    Given metrics, every stage is recorded as a planning section.
+    """
+    section = metrics.section if metrics is not None else untimed
+    with section("matrix", "planning"):
+        matrix = model.create_distance_matrix()
+    with section("tsp", "planning"):
+        path = model.tsp_solver(matrix)
+    with section("route", "planning"):
+        route = model.expand_route(path)
+    if obstacles is None:
+        return Plan(route, route, 0.0)
+    with section("shortcut", "planning"):
+        shortcut, saved = shortcut_route(
+            route, obstacles, clearance, stops=model.list_nodes_from(origin=Origin.USER_NODE), start=start
+        )
+    return Plan(route, shortcut, saved)
+
+
+def is_stop(model: GraphModel, node: Node) -> bool:
+    """Whether a route point is a user node the robot has to visit, also once highlighted as a route's end."""
+    color = model.graph.nodes.get(node, {}).get("color")
+    return color in (COLOR_MAP[Origin.USER_NODE], COLOR_MAP[Origin.SOLUTION_END_NODE])
+
+
+def replan_remaining(model: GraphModel, controller: RobotController) -> bool:
+    """Re-routes the robot's remaining stops over the current graph, in the same order, after the leg being driven.
+    If a stop became unreachable, the robot stops after that leg instead. Returns whether the route was kept.
+    """
+    remaining = controller.remaining_route()
+    if not remaining:
+        return True
+    stops = [p for p in remaining[1:] if is_stop(model, p)]
+    if not stops or stops[-1] != remaining[-1]:
+        stops.append(remaining[-1])
+    try:
+        route = model.route_through(remaining[0], stops)
+    except (nx.NetworkXNoPath, nx.NodeNotFound):
+        controller.cancel(finish_leg=True)
+        return False
+    controller.replace_route(route)
+    return True
+
+
+class BackgroundPlanner:
+    """Runs planning jobs on a snapshot of the model in a worker, keeping only the latest one.
+    A thread pool is used by default; a process pool works too, as snapshots are picklable,
+    but then planning stages cannot be recorded into the caller's metrics.
+    """
+
+    def __init__(self, executor: Executor | None = None):
+        self.executor = executor or ThreadPoolExecutor(max_workers=1)
+        self._future: Future | None = None
+
+    @property
+    def busy(self) -> bool:
+        return self._future is not None
+
+    def submit(self, model: GraphModel, job: Callable[..., Any] = plan_route, **kwargs) -> None:
+        """Starts planning on the model's current state, superseding any plan still in progress."""
+        self.cancel()
+        self._future = self.executor.submit(job, model.snapshot(), **kwargs)
+
+    def cancel(self) -> None:
+        """Drops the plan in progress; a running worker finishes but its result is discarded."""
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    def poll(self) -> Any:
+        """Returns the latest plan once it is ready, exactly once. Errors from the worker are raised here."""
+        if self._future is None or not self._future.done():
+            return None
+        future, self._future = self._future, None
+        return future.result()
+
+    def shutdown(self) -> None:
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
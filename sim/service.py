@@ -0,0 +1,175 @@
+import os
+import json
+import stat
+import socket
+import asyncio
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List
+from sim.graph_model import GraphModel
+from sim.tsp import ortools_solver
+from sim.types import Node
+from sim.waves import BaseDistances, WavePlan, solve_wave
+
+SOCKET_PATH = "/tmp/warehouse-planner.sock"
+# layouts every worker keeps the base distances of, least recently used ones are dropped first
+MAX_WARM_LAYOUTS = 8
+
+
+@lru_cache(maxsize=MAX_WARM_LAYOUTS)
+def layout_distances(layout: str, mtime: float) -> BaseDistances:
+    """Base distances of a layout, loaded once per worker and again when the file changes."""
+    return BaseDistances.from_model(GraphModel(data_path=layout))
+
+
+def solve_on_layout(layout: str, mtime: float, wave: List[Node]) -> WavePlan:
+    return solve_wave(layout_distances(layout, mtime), wave)
+
+
+def is_listening(path: str) -> bool:
+    """Whether a server accepts connections on the Unix socket at path."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            return False
+    return True
+
+
+class PlanningServer:
+    """Answers plan requests over a Unix socket, one JSON object per line in both directions.
+    Requests either carry a distance matrix, answered with a tour like a TSP_Solver, or a layout path and a wave,
+    answered with a WavePlan. All requests share one bounded process pool whose workers keep the base distances of
+    recently used layouts warm; identical requests that arrive while one is being solved share its result.
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        self.executor = ProcessPoolExecutor(max_workers=max_workers)
+        self.in_flight: dict[str, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def solve(self, request: dict) -> dict:
+        if "matrix" in request:
+            tour = await asyncio.wrap_future(self.executor.submit(ortools_solver, request["matrix"]))
+            return {"tour": tour}
+        layout = request["layout"]
+        wave = [tuple(point) for point in request["wave"]]
+        plan = await asyncio.wrap_future(
+            self.executor.submit(solve_on_layout, layout, os.path.getmtime(layout), wave)
+        )
+        return plan._asdict()
+
+    async def handle(self, request: dict) -> dict:
+        key = json.dumps(request, sort_keys=True)
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.solve(request))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                try:
+                    response = await self.handle(json.loads(line))
+                except Exception as e:
+                    response = {"error": f"{type(e).__name__}: {e}"}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, path: str = SOCKET_PATH) -> None:
+        """Listens on path. A socket left behind by a server that is gone is replaced;
+        anything else at path, including the socket of a running server, is left alone and raises FileExistsError.
+        """
+        if os.path.lexists(path):
+            if not stat.S_ISSOCK(os.lstat(path).st_mode):
+                raise FileExistsError(f"{path} exists and is not a socket.")
+            if is_listening(path):
+                raise FileExistsError(f"Another server is listening on {path}.")
+            os.remove(path)
+        server = await asyncio.start_unix_server(self.serve_client, path=path)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            os.remove(path)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(cancel_futures=True)
+
+
+class PlanningClient:
+    """Blocking client of a PlanningServer, connected on first use.
+    Called with a distance matrix it is a TSP_Solver, so a GraphModel can solve on the server.
+    """
+
+    def __init__(self, path: str = SOCKET_PATH):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def request(self, request: dict) -> dict:
+        with self._lock:
+            if self._file is None:
+                connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                connection.connect(self.path)
+                self._file = connection.makefile("rwb")
+                connection.close()
+            self._file.write(json.dumps(request).encode() + b"\n")
+            self._file.flush()
+            line = self._file.readline()
+        if not line:
+            self.close()
+            raise ConnectionError(f"Planning server at {self.path} closed the connection.")
+        response = json.loads(line)
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return response
+
+    def __call__(self, matrix: List[List[int]]) -> List[int]:
+        return self.request({"matrix": matrix})["tour"]
+
+    def plan(self, layout: str, wave: List[Node]) -> WavePlan:
+        """Plans a wave on a layout the server keeps loaded; the layout is named by its path."""
+        response = self.request({"layout": os.path.abspath(layout), "wave": [list(point) for point in wave]})
+        return WavePlan(
+            [tuple(point) for point in response["order"]],
+            [tuple(point) for point in response["route"]],
+            response["length"],
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # model snapshots may be sent to other processes, which open their own connection
+    def __getstate__(self) -> dict:
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["path"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm route planning server on a Unix socket.")
+    parser.add_argument("--socket", default=SOCKET_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="solver processes shared by all layouts")
+    args = parser.parse_args()
+
+    server = PlanningServer(args.workers)
+    print(f"Planning on {args.socket}.")
+    try:
+        asyncio.run(server.serve(args.socket))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
@@ -0,0 +1,43 @@
+import math
+from typing import Collection
+import numpy as np
+from geometry.visibility import ObstacleEdgeIndex
+from sim.types import Node
+
+
+def route_length(route: list[Node]) -> float:
+    return sum(math.dist(p1, p2) for p1, p2 in zip(route[:-1], route[1:]))
+
+
+def shortcut_route(
+    route: list[Node],
+    obstacles: ObstacleEdgeIndex,
+    clearance: float,
+    stops: Collection[Node] = (),
+    start: Node | None = None,
+) -> tuple[list[Node], float]:
+    """Drops intermediate waypoints wherever a direct segment keeps the clearance from every obstacle.
+    Stops are never dropped and the route is never shortcut past one. Returns the new route and the length saved.
+    """
+    points = ([start] if start is not None else []) + list(route)
+    if len(points) < 3:
+        return list(route), 0.0
+    stops = set(stops)
+    coords = np.array(points, dtype=float)
+    kept = [0]
+    anchor = 0
+    while anchor < len(points) - 1:
+        # candidates run up to the next stop, the direct edge to the next waypoint is always taken
+        end = anchor + 1
+        while end < len(points) - 1 and points[end] not in stops:
+            end += 1
+        candidates = np.arange(anchor + 2, end + 1)
+        anchor += 1
+        if len(candidates):
+            clear = obstacles.visible_from(coords[kept[-1]], coords[candidates], clearance)
+            if clear.any():
+                anchor = int(candidates[clear][-1])
+        kept.append(anchor)
+    shortcut = [points[i] for i in kept]
+    saved = route_length(points) - route_length(shortcut)
+    return shortcut[1:] if start is not None else shortcut, saved
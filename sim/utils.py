@@ -1,4 +1,6 @@
 import json
+import numpy as np
+from sim.types import Node
 
 
 def make_tuples_out_of_child_elements(items: list) -> list:
@@ -22,3 +24,43 @@ def load_graph_data_from_json(filename: str) -> dict:
         for key, list_of_lists in json.load(f).items():
             converted_data[key] = make_tuples_out_of_child_elements(list_of_lists)
     return converted_data
+
+
+def load_graph_data_from_npz(filename: str) -> dict:
+    """Reads a graph stored as an int32 node array and an array of edges given as node index pairs.
+    This is a compact format, not a zero-copy load: networkx needs hashable nodes, so the arrays are
+    copied into tuples once. It still skips the per-element parsing of the JSON format.
+    """
+    with np.load(filename) as data:
+        nodes = [tuple(node) for node in data["nodes"].tolist()]
+        edges = [[nodes[start], nodes[end]] for start, end in data["edges"].tolist()]
+    return {"nodes": nodes, "edges": edges}
+
+
+def load_graph_data(filename: str) -> dict:
+    """Loads graph data from a .npz or a .json file, depending on the extension."""
+    if filename.endswith(".npz"):
+        return load_graph_data_from_npz(filename)
+    return load_graph_data_from_json(filename)
+
+
+def load_points(filename: str) -> list[Node]:
+    """Loads points (e.g. packages) from a .npz or a .json file, depending on the extension."""
+    if filename.endswith(".npz"):
+        with np.load(filename) as data:
+            return [tuple(node) for node in data["nodes"].tolist()]
+    with open(filename) as f:
+        return [tuple(node) for node in json.load(f)["nodes"]]
+
+
+def load_polygons(filename: str) -> list[list[Node]]:
+    """Loads layout polygons from a .npz or a .json file, depending on the extension."""
+    if filename.endswith(".npz"):
+        with np.load(filename) as data:
+            vertices = data["vertices"]
+            boundaries = np.flatnonzero(np.diff(data["polygon_ids"])) + 1
+        if not len(vertices):
+            return []
+        return [[tuple(v) for v in polygon.tolist()] for polygon in np.split(vertices, boundaries)]
+    with open(filename) as f:
+        return make_tuples_out_of_child_elements(json.load(f))
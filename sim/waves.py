@@ -0,0 +1,136 @@
+import networkx as nx
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List, NamedTuple
+from sim.constants import Origin
+from sim.distance_metrics import DistanceMetric
+from sim.graph_model import GraphModel
+from sim.tsp import TSP_Solver, ortools_solver
+from sim.types import Node
+
+
+class BaseDistances:
+    """All-pairs shortest path lengths and predecessors over a layout's graph, computed once and only read after.
+    Points off the graph are attached to their nearest graph node, as GraphModel.insert_node does.
+    """
+
+    def __init__(self, graph: nx.Graph, distance_metric: DistanceMetric):
+        self.nodes: List[Node] = list(graph.nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.distance_metric = distance_metric
+        self.distances = np.full((len(self.nodes), len(self.nodes)), np.inf)
+        self.predecessors = np.full((len(self.nodes), len(self.nodes)), -1, dtype=np.int32)
+        for i, source in enumerate(self.nodes):
+            predecessors, distances = nx.dijkstra_predecessor_and_distance(graph, source, weight=distance_metric)
+            for node, distance in distances.items():
+                j = self.index[node]
+                self.distances[i, j] = distance
+                if predecessors[node]:
+                    self.predecessors[i, j] = self.index[predecessors[node][0]]
+
+    @classmethod
+    def from_model(cls, model: GraphModel) -> "BaseDistances":
+        """Distances over the model's current graph without its user nodes, so blocked edges stay blocked."""
+        user_nodes = set(model.list_nodes_from(origin=Origin.USER_NODE))
+        graph = model.graph.subgraph(node for node in model.graph if node not in user_nodes)
+        return cls(graph, model.distance_metric)
+
+    def anchor(self, node: Node) -> int:
+        """Index of the graph node a point is attached to."""
+        if node in self.index:
+            return self.index[node]
+        return min(range(len(self.nodes)), key=lambda i: self.distance_metric(node, self.nodes[i]))
+
+    def distance_matrix(self, nodes: List[Node]) -> np.ndarray:
+        """Shortest path lengths between distinct points, with np.inf between points that are not connected."""
+        anchors = [self.anchor(node) for node in nodes]
+        offsets = np.array([self.distance_metric(node, self.nodes[a]) for node, a in zip(nodes, anchors)], dtype=float)
+        matrix = offsets[:, None] + self.distances[np.ix_(anchors, anchors)] + offsets[None, :]
+        np.fill_diagonal(matrix, 0)
+        return matrix
+
+    def path_between(self, n1: Node, n2: Node) -> List[Node]:
+        if n1 == n2:
+            return [n1]
+        a, b = self.anchor(n1), self.anchor(n2)
+        if np.isinf(self.distances[a, b]):
+            raise nx.NetworkXNoPath(f"No path between {n1} and {n2}.")
+        indices = [b]
+        while indices[-1] != a:
+            indices.append(int(self.predecessors[a, indices[-1]]))
+        path = [self.nodes[i] for i in reversed(indices)]
+        return ([n1] if n1 != path[0] else []) + path + ([n2] if n2 != path[-1] else [])
+
+    def route_through(self, start: Node, stops: List[Node]) -> List[Node]:
+        """Route from a point through the stops in the given order, without the start itself."""
+        route = []
+        for n1, n2 in zip([start] + stops[:-1], stops):
+            route.extend(self.path_between(n1, n2)[1:])
+        return route
+
+
+class WavePlan(NamedTuple):
+    # the wave's points in visiting order, starting with its first point
+    order: List[Node]
+    route: List[Node]
+    length: float
+
+
+def solve_wave(base: BaseDistances, wave: List[Node], tsp_solver: TSP_Solver = ortools_solver) -> WavePlan:
+    """Solves the TSP over the distinct points of a wave. Its first point is where the tour starts,
+    like the robot's position inserted first into a GraphModel.
+    """
+    nodes = list(dict.fromkeys(wave))
+    if len(nodes) < 2:
+        return WavePlan(nodes, [], 0.0)
+    matrix = base.distance_matrix(nodes)
+    if np.isinf(matrix).any():
+        raise nx.NetworkXNoPath("Some points of the wave are not connected.")
+    order = [nodes[i] for i in tsp_solver(np.rint(matrix).astype(int).tolist())]
+    route = base.route_through(order[0], order[1:])
+    length = sum(base.distance_metric(p1, p2) for p1, p2 in zip(order[:1] + route[:-1], route))
+    return WavePlan(order, route, float(length))
+
+
+# the base distances of the pool this worker process belongs to
+_worker_base: BaseDistances | None = None
+
+
+def _init_worker(base: BaseDistances) -> None:
+    global _worker_base
+    _worker_base = base
+
+
+def _solve_in_worker(wave: List[Node], tsp_solver: TSP_Solver) -> WavePlan:
+    return solve_wave(_worker_base, wave, tsp_solver)
+
+
+class WavePlanner:
+    """Solves independent waves on one layout concurrently in a process pool.
+    The base distances are sent to every worker once, when it starts; afterwards waves only carry their points.
+    """
+
+    def __init__(self, base: BaseDistances, max_workers: int | None = None, tsp_solver: TSP_Solver = ortools_solver):
+        self.base = base
+        self.tsp_solver = tsp_solver
+        self.executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(base,))
+
+    def plan(self, waves: List[List[Node]], chunksize: int = 1) -> List[WavePlan]:
+        """One plan per wave, in the order of the waves."""
+        return list(self.executor.map(_solve_in_worker, waves, repeat(self.tsp_solver), chunksize=chunksize))
+
+    def shutdown(self) -> None:
+        self.executor.shutdown()
+
+    def __enter__(self) -> "WavePlanner":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+
+
+def plan_waves(model: GraphModel, waves: List[List[Node]], max_workers: int | None = None) -> List[WavePlan]:
+    """Plans every wave against the model's layout without changing the model."""
+    with WavePlanner(BaseDistances.from_model(model), max_workers, model.tsp_solver) as planner:
+        return planner.plan(waves)
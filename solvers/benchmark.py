@@ -6,6 +6,9 @@ import pandas as pd
 import ortools_utils
 import ga_utils
 import concorde_utils
+import convert
+import bounds
+import dataset_setup
 from typing import NamedTuple
 
 
@@ -14,19 +17,61 @@ class ExperimentResult(NamedTuple):
     score: int
     solver: str
     problem: str
+    reference: float | None = None
+    reference_is_optimal: bool | None = None
+    gap: float | None = None
 
 
 def setup_test_case_for_lkh(problem_path: str):
+    if os.path.exists(convert.binary_matrix_path(problem_path)):
+        matrix = convert.load_distance_matrix(problem_path)
+        return lkh.LKHProblem(
+            name=os.path.basename(problem_path).split(".")[0],
+            type="TSP",
+            dimension=len(matrix),
+            edge_weight_type="EXPLICIT",
+            edge_weight_format="FULL_MATRIX",
+            edge_weights=matrix,
+        )
     with open(problem_path) as f:
         data = f.read()
     return lkh.LKHProblem.parse(data)
 
 
+def load_reference(problem_path: str) -> tuple[float, bool]:
+    """Returns the known optimum of the problem or, when there is none, its 1-tree lower bound.
+    The second element tells whether the reference is the optimum.
+    """
+    directory, file = os.path.split(problem_path)
+    name = file.split(".")[0]
+    manifest = dataset_setup.load_manifest(directory)
+    if name in manifest:
+        return manifest[name]["optimum"], True
+    tour_path = f"{directory}/{name}.opt.tour"
+    if os.path.exists(tour_path):
+        return dataset_setup.describe_instance(problem_path, tour_path)["optimum"], True
+    return bounds.one_tree_lower_bound(setup_test_case_for_ortools(problem_path)), False
+
+
+def with_gap(results: list[ExperimentResult], reference: float, is_optimal: bool) -> list[ExperimentResult]:
+    """Attaches the percentage gap between each score and the reference value."""
+    return [
+        r._replace(
+            reference=reference,
+            reference_is_optimal=is_optimal,
+            gap=100 * (r.score - reference) / reference if reference else 0.0,
+        )
+        for r in results
+    ]
+
+
 def lkh_test(problem):
     return lkh.solve(solver="LKH-3.0.7/LKH", problem=problem, max_trials=10000, runs=1)
 
 
 def setup_test_case_for_ortools(problem_path: str):
+    if os.path.exists(convert.binary_matrix_path(problem_path)):
+        return convert.load_distance_matrix(problem_path)
     problem = tsplib95.load(problem_path)
     G = problem.get_graph()
     return ortools_utils.create_distance_matrix_from_graph(G)
@@ -132,15 +177,16 @@ def run_test_suite(dir_with_test_cases: str, output_file: str) -> None:
         except:
             ga_skipped += 1
             skip_ga = True
-        data += test_ortools(path, niter)
-        data += test_lkh(path, niter)
+        reference, is_optimal = load_reference(path)
+        data += with_gap(test_ortools(path, niter), reference, is_optimal)
+        data += with_gap(test_lkh(path, niter), reference, is_optimal)
         if not skip_ga:
-            data += test_ga(path, niter)
-        data += test_concorde(path, niter)
+            data += with_gap(test_ga(path, niter), reference, is_optimal)
+        data += with_gap(test_concorde(path, niter), reference, is_optimal)
     experiments_end_time = time.perf_counter()
     print(f"Experiments took: {experiments_end_time-experiments_start_time}s.")
     print(f"GA skipped: {ga_skipped} problems out of: {len(problem_paths)}.")
-    df = pd.DataFrame(data, columns=["time", "score", "solver", "problem"])
+    df = pd.DataFrame(data, columns=list(ExperimentResult._fields))
     df.to_csv(output_file)
 if __name__ == "__main__":
     run_test_suite("custom_tsplibs", output_file="long_custom_benchmark_results.csv")
\ No newline at end of file
@@ -0,0 +1,78 @@
+import numpy as np
+
+
+def nearest_neighbour_tour_length(matrix: np.ndarray) -> float:
+    n = len(matrix)
+    visited = np.zeros(n, dtype=bool)
+    visited[0] = True
+    current = 0
+    length = 0.0
+    for _ in range(n - 1):
+        distances = np.where(visited, np.inf, matrix[current])
+        nxt = int(np.argmin(distances))
+        length += matrix[current, nxt]
+        visited[nxt] = True
+        current = nxt
+    return length + matrix[current, 0]
+
+
+def minimum_one_tree(weights: np.ndarray) -> tuple[float, np.ndarray]:
+    """Builds a minimum 1-tree: an MST over nodes 1..n-1 (Prim, O(n^2)) plus the two cheapest edges of node 0.
+    Returns the 1-tree cost and the degree of every node.
+    """
+    n = len(weights)
+    degrees = np.zeros(n, dtype=int)
+    sub = weights[1:, 1:]
+    in_tree = np.zeros(n - 1, dtype=bool)
+    in_tree[0] = True
+    key = sub[0].copy()
+    parent = np.zeros(n - 1, dtype=int)
+    cost = 0.0
+    for _ in range(n - 2):
+        j = int(np.argmin(np.where(in_tree, np.inf, key)))
+        cost += key[j]
+        degrees[j + 1] += 1
+        degrees[parent[j] + 1] += 1
+        in_tree[j] = True
+        closer = sub[j] < key
+        key[closer] = sub[j][closer]
+        parent[closer] = j
+    first, second = np.argsort(weights[0, 1:])[:2] + 1
+    cost += weights[0, first] + weights[0, second]
+    degrees[[0, first, second]] += [2, 1, 1]
+    return cost, degrees
+
+
+def one_tree_lower_bound(matrix, n_iter: int = 200) -> float:
+    """Held-Karp lower bound on the optimal tour length, found by subgradient optimization
+    of node penalties over minimum 1-trees.
+    Asymmetric matrices are bounded through their elementwise minimum with the transpose.
+    """
+    d = np.asarray(matrix, dtype=float)
+    d = np.minimum(d, d.T)
+    n = len(d)
+    if n < 3:
+        return float(d.sum())
+    upper_bound = nearest_neighbour_tour_length(d)
+    penalties = np.zeros(n)
+    best = -np.inf
+    step_scale = 2.0
+    stalled = 0
+    for _ in range(n_iter):
+        cost, degrees = minimum_one_tree(d + penalties[:, None] + penalties[None, :])
+        bound = cost - 2 * penalties.sum()
+        if bound > best + 1e-9:
+            best = bound
+            stalled = 0
+        else:
+            stalled += 1
+            if stalled >= 10:
+                step_scale /= 2
+                stalled = 0
+        subgradient = degrees - 2
+        norm = (subgradient**2).sum()
+        if norm == 0:
+            # the 1-tree is a tour, so the bound is tight
+            break
+        penalties += step_scale * (upper_bound - bound) / norm * subgradient
+    return float(best)
@@ -1,18 +1,40 @@
+import io
+import os
 import jinja2
+import numpy as np
 
 
-def convert_distance_matrix_to_string(distance_matrix: list[list[int]]) -> str:
-    s = " "
-    for row in distance_matrix:
-        s += " ".join([str(int(w)) for w in row])
-        s += "\n "
-    s = s[:-1]
-    return s
+def convert_distance_matrix_to_string(distance_matrix) -> str:
+    """Formats a matrix as an EDGE_WEIGHT_SECTION, one row per line, truncating weights to integers."""
+    buffer = io.StringIO()
+    np.savetxt(buffer, np.asarray(distance_matrix).astype(np.int64), fmt="%d", delimiter=" ", newline="\n ")
+    return " " + buffer.getvalue()[:-1]
+
+
+def binary_matrix_path(problem_path: str) -> str:
+    """Returns the path of the binary matrix stored next to a TSPLIB file."""
+    root, _ = os.path.splitext(problem_path)
+    return f"{root}.npy"
+
+
+def save_distance_matrix(distance_matrix, output_file: str) -> str:
+    """Saves the distance matrix as an int32 .npy file (the .npy header holds the shape and dtype)."""
+    np.save(output_file, np.asarray(distance_matrix, dtype=np.int32))
+    return output_file
+
+
+def load_distance_matrix(problem_path: str) -> np.ndarray:
+    """Opens the binary matrix that belongs to a TSPLIB file as a read-only memory map.
+    Accepts either the .tsp path or the .npy path itself.
+    """
+    return np.load(binary_matrix_path(problem_path), mmap_mode="r")
 
 
 def render_tsplib_file(
-    name: str, dimension: int, distance_matrix: str, output_dir: str
+    name: str, dimension: int, distance_matrix, output_dir: str
 ) -> str:
+    """Writes a FULL_MATRIX TSPLIB file and its binary twin from a matrix (nested lists or an array)."""
+    matrix = np.asarray(distance_matrix).astype(np.int32).reshape(dimension, dimension)
     file_loader = jinja2.FileSystemLoader("templates")
     jinja_env = jinja2.Environment(loader=file_loader)
 
@@ -22,7 +44,7 @@ def render_tsplib_file(
         name=name,
         comment=f"Custom {dimension}-dimension TSP problem.",
         dimension=dimension,
-        distance_matrix=distance_matrix,
+        distance_matrix=convert_distance_matrix_to_string(matrix),
     )
 
     output_file = f"{output_dir}/{name}.tsp"
@@ -30,4 +52,7 @@ def render_tsplib_file(
     with open(output_file, "w") as f:
         f.write(output)
 
+    # binary twin of the EDGE_WEIGHT_SECTION for in-process solvers
+    save_distance_matrix(matrix, binary_matrix_path(output_file))
+
     return output_file
@@ -1,19 +1,93 @@
 import os
 import gzip
+import json
 import shutil
+import struct
+import tsplib95
+from concurrent.futures import ProcessPoolExecutor
 
+MANIFEST_FILE = "manifest.json"
 
-def unzip_and_save(source: str, target: str) -> None:
+
+def uncompressed_size(source: str) -> int:
+    """Reads the ISIZE trailer of a gzip file (the uncompressed size modulo 2^32)."""
+    with open(source, "rb") as f:
+        f.seek(-4, os.SEEK_END)
+        return struct.unpack("<I", f.read(4))[0]
+
+
+def is_up_to_date(source: str, target: str) -> bool:
+    """Checks whether the target is a complete decompression of the source that is not older than it."""
+    if not os.path.exists(target):
+        return False
+    target_stat = os.stat(target)
+    if target_stat.st_mtime < os.stat(source).st_mtime:
+        return False
+    return target_stat.st_size % 2**32 == uncompressed_size(source)
+
+
+def unzip_and_save(source: str, target: str) -> bool:
+    """Decompresses the source into the target unless the target is already up to date.
+    Returns True if the target was (re)written.
+    """
+    if is_up_to_date(source, target):
+        return False
     with gzip.open(source, "rb") as f_in:
         with open(target, "wb") as f_out:
             shutil.copyfileobj(f_in, f_out)
+    return True
+
+
+def describe_instance(problem_path: str, tour_path: str) -> dict:
+    problem = tsplib95.load(problem_path)
+    tour = tsplib95.load(tour_path)
+    # tours are 1-based while tsplib95 numbers explicit-only problems from 0
+    offset = min(problem.get_nodes()) - 1
+    tours = [[node + offset for node in t] for t in tour.tours]
+    return {
+        "dimension": problem.dimension,
+        "edge_weight_type": problem.edge_weight_type,
+        "optimum": int(problem.trace_tours(tours)[0]),
+    }
+
+
+def prepare_instance(source_dir: str, target_dir: str, name: str, entry: dict | None) -> tuple[str, dict]:
+    problem_path = f"{target_dir}/{name}.tsp"
+    tour_path = f"{target_dir}/{name}.opt.tour"
+    problem_changed = unzip_and_save(f"{source_dir}/{name}.tsp.gz", problem_path)
+    tour_changed = unzip_and_save(f"{source_dir}/{name}.opt.tour.gz", tour_path)
+    if entry is None or problem_changed or tour_changed:
+        entry = describe_instance(problem_path, tour_path)
+    return name, entry
+
+
+def load_manifest(target_dir: str = "tsp_instances") -> dict[str, dict]:
+    """Returns the instance descriptions (dimension, edge weight type, known optimum) keyed by instance name."""
+    manifest_path = f"{target_dir}/{MANIFEST_FILE}"
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as f:
+        return json.load(f)
+
 
-def prepare_dataset(source_dir: str = "ALL_tsp", target_dir: str = "tsp_instances") -> None:
+def prepare_dataset(
+    source_dir: str = "ALL_tsp", target_dir: str = "tsp_instances", max_workers: int | None = None
+) -> dict[str, dict]:
     if not os.path.exists(target_dir):
         os.mkdir(target_dir)
-    files = os.listdir(source_dir)
-    for file in files:
-        name, *_ = file.split(".")
-        if f"{name}.opt.tour.gz" in files:
-            unzip_and_save(f"{source_dir}/{name}.tsp.gz", f"{target_dir}/{name}.tsp")
-            unzip_and_save(f"{source_dir}/{name}.opt.tour.gz", f"{target_dir}/{name}.opt.tour")
+    files = set(os.listdir(source_dir))
+    names = sorted(
+        file.removesuffix(".tsp.gz")
+        for file in files
+        if file.endswith(".tsp.gz") and f"{file.removesuffix('.tsp.gz')}.opt.tour.gz" in files
+    )
+    manifest = load_manifest(target_dir)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(prepare_instance, source_dir, target_dir, name, manifest.get(name))
+            for name in names
+        ]
+        manifest = dict(future.result() for future in futures)
+    with open(f"{target_dir}/{MANIFEST_FILE}", "w") as f:
+        json.dump(manifest, f, indent=4)
+    return manifest
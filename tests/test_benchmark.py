@@ -0,0 +1,20 @@
+import os
+from benchmark import is_up_to_date, scenario_paths
+
+SCENARIO = (3, 0, 0)
+
+
+def test_missing_binary_twin_is_stale(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("gen3")
+    os.makedirs("custom_tsplibs")
+    graph_data_path, packages_path, tsplib_path = scenario_paths(SCENARIO, "custom_tsplibs")
+    for path in (graph_data_path, packages_path):
+        open(path, "w").close()
+        os.utime(path, (0, 0))
+    open(tsplib_path, "w").close()
+    open(tsplib_path.replace(".tsp", ".npy"), "w").close()
+    assert is_up_to_date(SCENARIO, "custom_tsplibs")
+
+    os.remove(tsplib_path.replace(".tsp", ".npy"))
+    assert not is_up_to_date(SCENARIO, "custom_tsplibs")
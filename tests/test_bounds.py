@@ -0,0 +1,25 @@
+import itertools
+import pytest
+import numpy as np
+from solvers.bounds import one_tree_lower_bound
+
+
+def brute_force_tour_length(matrix: np.ndarray) -> float:
+    n = len(matrix)
+    return min(
+        sum(matrix[a, b] for a, b in zip((0,) + p, p + (0,)))
+        for p in itertools.permutations(range(1, n))
+    )
+
+
+# the Held-Karp bound of small euclidean instances is usually tight, a loose bound points at a broken subgradient
+MAX_GAP = 0.02
+
+
+@pytest.mark.parametrize("n, seed", [(5, 0), (7, 1), (8, 2), (9, 3)])
+def test_one_tree_lower_bound_is_close_below_optimum(n, seed):
+    points = np.random.default_rng(seed).random((n, 2)) * 100
+    matrix = np.rint(np.linalg.norm(points[:, None] - points[None], axis=2))
+    optimum = brute_force_tour_length(matrix)
+    bound = one_tree_lower_bound(matrix)
+    assert (1 - MAX_GAP) * optimum <= bound <= optimum + 1e-6
@@ -0,0 +1,43 @@
+from sim.control import RobotController
+from sim.entities import Robot
+
+ROUTE = [(7, 3), (7, 3), (20, 11), (0, 0)]
+
+
+def drive(controller: RobotController) -> int:
+    steps = 0
+    while controller.instructions:
+        controller.move_robot()
+        steps += 1
+    return steps
+
+
+def test_controller_streams_route_to_its_end():
+    robot = Robot(0, 0, 5, 5)
+    controller = RobotController(robot, step_size=2)
+    controller.push_new_instructions(ROUTE)
+    controller.move_robot()
+    # only the leg being executed is materialized
+    assert len(controller.instructions.current_leg) == 3
+    drive(controller)
+    assert (robot.x, robot.y) == (0, 0)
+
+
+def test_replace_route_finishes_current_leg():
+    robot = Robot(0, 0, 5, 5)
+    controller = RobotController(robot, step_size=2)
+    controller.push_new_instructions(ROUTE)
+    controller.move_robot()
+    controller.replace_route([(7, 10)])
+    drive(controller)
+    assert (robot.x, robot.y) == (7, 10)
+
+
+def test_cancel_stops_immediately():
+    robot = Robot(0, 0, 5, 5)
+    controller = RobotController(robot, step_size=2)
+    controller.push_new_instructions(ROUTE)
+    controller.move_robot()
+    controller.cancel(finish_leg=False)
+    assert not controller.instructions
+    assert drive(controller) == 0 and (robot.x, robot.y) == (2, 1)
@@ -0,0 +1,48 @@
+import pytest
+import numpy as np
+from geometry.convex_hull import convex_hull, determine_point_colocation, Colocation
+
+convex_hull_test_sets = [
+    ([(0, 0), (2, 0), (2, 2), (0, 2), (1, 1)], [(0, 0), (0, 2), (2, 2), (2, 0)]),
+    ([(0, 0), (1, 0), (2, 0), (1, 2), (1, 2)], [(0, 0), (1, 2), (2, 0)]),
+    ([(3, 1), (0, 0)], [(0, 0), (3, 1)]),
+]
+
+
+@pytest.mark.parametrize("points, expected_hull", convex_hull_test_sets)
+def test_convex_hull(points, expected_hull):
+    assert convex_hull(np.array(points)).tolist() == np.array(expected_hull, dtype=float).tolist()
+
+
+determine_point_colocation_test_sets = [
+    ((0, 0), (1, 0), (0, 1), Colocation.LEFT),
+    ((0, 0), (1, 0), (0, -1), Colocation.RIGHT),
+    ((0, 0), (1, 0), (2, 1e-12), Colocation.COLINEAR),
+]
+
+
+@pytest.mark.parametrize("p, q, r, expected_colocation", determine_point_colocation_test_sets)
+def test_determine_point_colocation(p, q, r, expected_colocation):
+    assert determine_point_colocation(p, q, r) == expected_colocation
+
+
+def monotone_chain(points: np.ndarray) -> list[list[float]]:
+    """Reference hull with the classic stack-based monotone chain."""
+    p = np.unique(points, axis=0).tolist()
+
+    def half(points):
+        hull = []
+        for r in points:
+            while len(hull) >= 2 and determine_point_colocation(hull[-2], hull[-1], r) != Colocation.RIGHT:
+                hull.pop()
+            hull.append(r)
+        return hull
+
+    return half(p)[:-1] + half(p[::-1])[:-1]
+
+
+@pytest.mark.parametrize("n, seed", [(10, 0), (100, 1), (2000, 2)])
+def test_convex_hull_matches_monotone_chain(n, seed):
+    # integer points give many colinear and repeated ones
+    points = np.random.default_rng(seed).integers(0, 20, (n, 2)).astype(float)
+    assert convex_hull(points).tolist() == monotone_chain(points)
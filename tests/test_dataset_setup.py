@@ -0,0 +1,53 @@
+import os
+import gzip
+from solvers.dataset_setup import prepare_dataset, unzip_and_save
+
+PROBLEM = """NAME: tiny
+TYPE: TSP
+DIMENSION: 3
+EDGE_WEIGHT_TYPE: EXPLICIT
+EDGE_WEIGHT_FORMAT: FULL_MATRIX
+EDGE_WEIGHT_SECTION
+ 0 3 4
+ 3 0 5
+ 4 5 0
+EOF
+"""
+
+TOUR = """NAME: tiny.opt.tour
+TYPE: TOUR
+DIMENSION: 3
+TOUR_SECTION
+1
+2
+3
+-1
+EOF
+"""
+
+
+def write_gzip(path, content: str) -> None:
+    with gzip.open(path, "wb") as f:
+        f.write(content.encode("ascii"))
+
+
+def test_unzip_and_save_skips_up_to_date_target(tmp_path):
+    source = tmp_path / "tiny.tsp.gz"
+    target = tmp_path / "tiny.tsp"
+    write_gzip(source, PROBLEM)
+    assert unzip_and_save(source, target) is True
+    assert unzip_and_save(source, target) is False
+    target.write_text("truncated")
+    os.utime(target, (os.stat(source).st_mtime + 1,) * 2)
+    assert unzip_and_save(source, target) is True
+    assert target.read_text() == PROBLEM
+
+
+def test_prepare_dataset_writes_manifest(tmp_path):
+    source_dir = tmp_path / "ALL_tsp"
+    source_dir.mkdir()
+    write_gzip(source_dir / "tiny.tsp.gz", PROBLEM)
+    write_gzip(source_dir / "tiny.opt.tour.gz", TOUR)
+    write_gzip(source_dir / "notour.tsp.gz", PROBLEM)
+    manifest = prepare_dataset(str(source_dir), str(tmp_path / "tsp_instances"), max_workers=1)
+    assert manifest == {"tiny": {"dimension": 3, "edge_weight_type": "EXPLICIT", "optimum": 12}}
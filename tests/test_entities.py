@@ -0,0 +1,40 @@
+import pygame
+from sim.entities import Robot, VisibilityController, Warehouse
+
+
+class CountingWarehouse(Warehouse):
+    def __init__(self, polygons):
+        super().__init__(polygons)
+        self.draws = 0
+
+    def draw(self, surface: pygame.Surface) -> None:
+        self.draws += 1
+        super().draw(surface)
+
+
+def test_static_layer_is_cached_and_only_robot_is_redrawn():
+    screen = pygame.Surface((100, 100))
+    warehouse = CountingWarehouse([[(50, 50), (50, 60), (60, 60)]])
+    robot = Robot(0, 0, 10, 10)
+    controller = VisibilityController([warehouse, robot])
+
+    assert controller.draw(screen) == [screen.get_rect()]
+    robot.move(5, 0)
+    assert controller.draw(screen) == [pygame.Rect(0, 0, 10, 10), pygame.Rect(5, 0, 10, 10)]
+    assert warehouse.draws == 1
+    # the robot's old position is restored from the background
+    assert screen.get_at((2, 2)) == pygame.Color(255, 255, 255)
+
+    warehouse.version += 1
+    assert controller.draw(screen) == [screen.get_rect()]
+    assert warehouse.draws == 2
+
+
+def test_hidden_robot_is_erased():
+    screen = pygame.Surface((100, 100))
+    robot = Robot(0, 0, 10, 10)
+    controller = VisibilityController([Warehouse([]), robot])
+    controller.draw(screen)
+    controller.hide_object(robot)
+    assert controller.draw(screen) == [pygame.Rect(0, 0, 10, 10)]
+    assert screen.get_at((2, 2)) == pygame.Color(255, 255, 255)
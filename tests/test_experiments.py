@@ -0,0 +1,33 @@
+import pytest
+from sim.experiments import find_cases, summarize
+
+
+def write_case(directory, name: str, extension: str) -> None:
+    directory.mkdir(exist_ok=True)
+    (directory / f"visibility_graph-{name}.{extension}").write_text("")
+    (directory / f"packages-{name}.{extension}").write_text("")
+
+
+def test_find_cases_keeps_one_entry_per_graph_preferring_npz(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_case(tmp_path / "gen3", "0-0", "json")
+    write_case(tmp_path / "gen3", "0-0", "npz")
+    write_case(tmp_path / "gen3", "0-1", "json")
+    write_case(tmp_path / "gen4", "1-0", "npz")
+    (tmp_path / "gen4" / "visibility_graph-1-1.json").write_text("")
+    assert find_cases([3, 4]) == [
+        ("gen3", "gen3/visibility_graph-0-0.npz", "gen3/packages-0-0.npz"),
+        ("gen3", "gen3/visibility_graph-0-1.json", "gen3/packages-0-1.json"),
+        ("gen4", "gen4/visibility_graph-1-0.npz", "gen4/packages-1-0.npz"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "samples, expected",
+    [
+        ([2.0], {"p50": 2.0, "p90": 2.0, "max": 2.0, "mean": 2.0}),
+        ([float(i) for i in range(1, 12)], {"p50": 6.0, "p90": 10.0, "max": 11.0, "mean": 6.0}),
+    ],
+)
+def test_summarize(samples, expected):
+    assert summarize(samples) == pytest.approx(expected)
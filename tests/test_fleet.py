@@ -0,0 +1,94 @@
+import math
+import networkx as nx
+import pytest
+from sim.control import RobotController
+from sim.entities import Robot
+from sim.fleet import ReservationTable, plan_fleet, schedule_route
+from sim.graph_model import GraphModel
+from sim.metrics import Metrics
+
+# a corridor along y = 0 with a siding through (20, 10)
+CORRIDOR = [(x, 0) for x in range(0, 50, 10)]
+
+
+def corridor_graph(siding: bool) -> nx.Graph:
+    graph = nx.Graph()
+    nx.add_path(graph, CORRIDOR)
+    if siding:
+        nx.add_path(graph, [(10, 0), (20, 10), (30, 0)])
+    return graph
+
+
+def test_reservation_table_finds_earliest_free_time():
+    reservations = ReservationTable()
+    reservations.reserve("a", 1.0, 2.0, robot=0)
+    reservations.reserve("a", 2.5, 3.0, robot=0)
+    assert reservations.earliest_free("a", 0.0, 1.0, robot=1) == 0.0
+    assert reservations.earliest_free("a", 0.5, 1.0, robot=1) == 3.0
+    assert reservations.earliest_free("a", 0.5, 1.0, robot=0) == 0.5
+
+
+@pytest.mark.parametrize("siding, expected_reroutes, expected_conflicts", [(True, 1, 0), (False, 0, 1)])
+def test_head_on_robots_reroute_through_siding(siding, expected_reroutes, expected_conflicts):
+    graph = corridor_graph(siding)
+    reservations = ReservationTable()
+    first = schedule_route(0, CORRIDOR, graph, {CORRIDOR[-1]}, reservations, speed=10, hold=0.5, max_wait=math.inf)
+    second = schedule_route(1, CORRIDOR[::-1], graph, {CORRIDOR[0]}, reservations, speed=10, hold=0.5, max_wait=math.inf)
+    assert first.wait_time == 0 and first.schedule.duration == pytest.approx(4)
+    assert (second.reroutes, second.conflicts) == (expected_reroutes, expected_conflicts)
+    if siding:
+        assert (20, 10) in second.route
+
+
+def test_robot_waits_for_crossing_robot():
+    graph = corridor_graph(siding=False)
+    graph.add_edges_from([((20, -10), (20, 0)), ((20, 0), (20, 10))])
+    reservations = ReservationTable()
+    schedule_route(0, [(20, -10), (20, 0), (20, 10)], graph, {(20, 10)}, reservations, 10, 0.5, math.inf)
+    second = schedule_route(1, CORRIDOR[1:3], graph, {(20, 0)}, reservations, 10, 0.5, math.inf)
+    # the crossing robot holds (20, 0) from 1.0 to 1.5
+    assert second.wait_time == pytest.approx(0.5) and second.schedule.duration == pytest.approx(1.5)
+
+
+def test_controller_follows_schedule():
+    graph = corridor_graph(siding=False)
+    robot_schedule = schedule_route(0, CORRIDOR, graph, set(), ReservationTable(), 10, 0.5, math.inf)
+    robot = Robot(0, 0, 5, 5)
+    controller = RobotController(robot, step_size=2)
+    controller.follow(robot_schedule.schedule)
+    controller.update(1.5)
+    assert (robot.x, robot.y) == (15, 0)
+    while not controller.idle:
+        controller.update(0.1)
+    assert (robot.x, robot.y) == (40, 0)
+
+
+@pytest.mark.parametrize("picks", [[(2, 1)], [(3, 6), (2, 1)], [(3, 6), (5, 4), (2, 1)]])
+def test_fleet_robot_starting_on_a_graph_node_visits_every_pick(picks):
+    model = GraphModel(data_path="tests/data/graph.json")
+    plan = plan_fleet(model, [(7, 2)], [picks], speed=1, hold=0.5)
+    route = plan.robots[0].route
+    assert route[0] == (7, 2) and set(picks) <= set(route[1:])
+    # repeated nodes would make highlight_route look up self-loops
+    assert all(n1 != n2 for n1, n2 in zip(route[:-1], route[1:]))
+
+
+# without the siding the robot drives into and out of the parked one
+@pytest.mark.parametrize("siding, expected_reroutes, expected_conflicts", [(True, 1, 0), (False, 0, 2)])
+def test_robot_parked_on_its_goal_is_avoided_after_the_hold(siding, expected_reroutes, expected_conflicts):
+    graph = corridor_graph(siding)
+    reservations = ReservationTable()
+    schedule_route(0, [(10, 0), (20, 0)], graph, {(20, 0)}, reservations, speed=10, hold=0.5, max_wait=math.inf)
+    # the second robot reaches (20, 0) at 2.0, after the first one's hold ended at 1.5
+    second = schedule_route(1, CORRIDOR, graph, {CORRIDOR[-1]}, reservations, speed=10, hold=0.5, max_wait=math.inf)
+    assert (second.reroutes, second.conflicts) == (expected_reroutes, expected_conflicts)
+    assert ((20, 0) in second.route) != siding
+    assert math.isfinite(second.schedule.duration)
+
+
+def test_fleet_planning_records_metrics():
+    metrics = Metrics()
+    model = GraphModel(data_path="tests/data/graph.json")
+    plan_fleet(model, [(7, 2), (1, 4)], [[(3, 6)], [(6, 5)]], speed=1, hold=0.5, metrics=metrics)
+    for name in ("matrix", "tsp", "route", "schedule"):
+        assert len(metrics.samples[name]) == 2
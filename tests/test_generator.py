@@ -0,0 +1,125 @@
+import os
+import math
+import pytest
+import numpy as np
+from functools import partial
+from geometry import generator
+from geometry.generator import (
+    GenerationSettings,
+    VisibilityGraph,
+    generate_layout_with_graph,
+    layout_cache_file,
+    merge_points,
+    sample_normal_points,
+)
+
+
+def generated_files(directory: str) -> dict[str, bytes]:
+    files = {}
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                files[name] = f.read()
+    return files
+
+
+@pytest.mark.parametrize("file_format", ["json", "npz"])
+def test_seeded_output_does_not_depend_on_worker_count(tmp_path, file_format):
+    outputs = []
+    for max_workers in (1, 3):
+        save_directory = str(tmp_path / f"workers-{max_workers}")
+        results = generate_layout_with_graph(
+            sigma=5,
+            n_samples=60,
+            vector_width=3,
+            vector_heigth=3,
+            save_directory=save_directory,
+            n_layouts=2,
+            m_graphs=2,
+            map_size=50,
+            master_seed=7,
+            max_workers=max_workers,
+            file_format=file_format,
+        )
+        assert all(results)
+        outputs.append(generated_files(save_directory))
+    assert len(outputs[0]) == 12
+    assert outputs[0] == outputs[1]
+
+
+def test_layout_cache_file_depends_on_every_parameter(tmp_path, monkeypatch):
+    settings = GenerationSettings(5, 100, 3, 3, 50, str(tmp_path))
+    files = {
+        layout_cache_file(settings, 0, 0),
+        layout_cache_file(settings, 1, 0),
+        layout_cache_file(settings, 0, 1),
+        layout_cache_file(settings._replace(sigma=8), 0, 0),
+        layout_cache_file(settings._replace(vector_width=4), 0, 0),
+        layout_cache_file(settings._replace(vector_heigth=4), 0, 0),
+    }
+    assert len(files) == 6
+    # graph parameters do not change the layout
+    assert layout_cache_file(settings._replace(n_samples=10, file_format="npz"), 0, 0) == layout_cache_file(settings, 0, 0)
+    monkeypatch.setattr(generator, "LAYOUT_CACHE_VERSION", generator.LAYOUT_CACHE_VERSION + 1)
+    assert layout_cache_file(settings, 0, 0) not in files
+
+
+def merge_points_brute_force(points: np.ndarray, radius: int) -> np.ndarray:
+    kept = []
+    for p in points.tolist():
+        if all(math.dist(p, q) > radius for q in kept):
+            kept.append(p)
+    return np.array(kept, dtype=points.dtype).reshape(-1, 2)
+
+
+@pytest.mark.parametrize(
+    "points, radius, expected",
+    [
+        # neighbours in the cells to the right, below and diagonally
+        ([(2, 0), (4, 0)], 3, [(2, 0)]),
+        ([(0, 5), (0, 6)], 3, [(0, 5)]),
+        ([(1, 1), (2, 2)], 2, [(1, 1)]),
+        ([(-1, -1), (0, 0)], 2, [(-1, -1)]),
+        # farther than the radius, although in neighbouring cells
+        ([(0, 0), (5, 0)], 3, [(0, 0), (5, 0)]),
+    ],
+)
+def test_merge_points_across_cell_borders(points, radius, expected):
+    assert merge_points(np.array(points), radius).tolist() == [list(p) for p in expected]
+
+
+@pytest.mark.parametrize("radius", [1, 3, 7])
+def test_merge_points_matches_pairwise_check(radius):
+    points = np.random.default_rng(radius).integers(-40, 40, size=(400, 2))
+    assert merge_points(points, radius).tolist() == merge_points_brute_force(points, radius).tolist()
+
+
+def graph_around_square(point_merger) -> VisibilityGraph:
+    square = np.array([(-5, -5), (5, -5), (5, 5), (-5, 5)], dtype=float)
+    return VisibilityGraph(
+        polygons=[square],
+        sampler=partial(sample_normal_points, center=np.zeros(2), sigma=10, rng=np.random.default_rng(0)),
+        proximity_estimator=lambda point: 3,
+        point_merger=point_merger,
+    )
+
+
+def test_batched_sampling_keeps_the_sample_size_outside_obstacles():
+    graph = graph_around_square(point_merger=lambda points: points)
+    graph._create_nodes(sample_size=300)
+    nodes = graph.nodes
+    assert len(nodes) == 300
+    assert len(set(map(tuple, nodes.tolist()))) == 300
+    assert not graph.obstacles.contains(nodes).any()
+
+
+def test_batched_sampling_keeps_merged_nodes_apart():
+    radius = 3
+    graph = graph_around_square(point_merger=partial(merge_points, radius=radius))
+    graph._create_nodes(sample_size=300)
+    nodes = graph.nodes
+    distances = np.hypot(*(nodes[:, None, :] - nodes[None, :, :]).transpose(2, 0, 1))
+    np.fill_diagonal(distances, np.inf)
+    assert 0 < len(nodes) <= 300
+    assert distances.min() > radius
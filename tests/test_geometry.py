@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+from sim.geometry import create_robot_moves, create_route_moves
+
+create_robot_moves_test_sets = [
+    ((0, 0, 7, 3, 2), [(2, 1), (2, 1), (1, 0), (2, 1)]),
+    ((0, 0, 1, 0, 2), [(1, 0)]),
+    ((0, 0, 0, -4, 2), [(0, -2), (0, -2)]),
+    ((5, 5, 5, 5, 2), []),
+]
+
+
+@pytest.mark.parametrize("arguments, expected_moves", create_robot_moves_test_sets)
+def test_create_robot_moves(arguments, expected_moves):
+    assert create_robot_moves(*arguments) == expected_moves
+
+
+def test_create_route_moves_end_on_every_leg_end():
+    points = np.random.default_rng(0).integers(0, 500, (50, 2))
+    points[10] = points[9]  # zero-length leg
+    moves, n_steps = create_route_moves(points, 3)
+    assert len(moves) == n_steps.sum() and n_steps[9] == 0
+    positions = points[0] + np.cumsum(moves, axis=0)
+    leg_ends = np.cumsum(n_steps)[n_steps > 0] - 1
+    assert (positions[leg_ends] == points[1:][n_steps > 0]).all()
+    assert np.abs(moves).max() <= 3
@@ -42,3 +42,65 @@ def test_create_cost_matrix():
         test_model.graph.nodes[node]['color'] = COLOR_MAP[Origin.USER_NODE]
     expected_distance_matrix = [[0, 4, 8, 10, 6], [4, 0, 4, 8, 10], [8, 4, 0, 4, 8], [10, 8, 4, 0, 4], [6, 10, 8, 4, 0]]
     assert test_model.create_distance_matrix() == expected_distance_matrix
+
+
+def model_with_user_nodes() -> GraphModel:
+    model = GraphModel(data_path="tests/data/graph.json")
+    for node in [(3, 3), (5, 4), (2, 3)]:
+        model.insert_node(node)
+    return model
+
+
+@pytest.mark.parametrize("edge", [((2, 1), (7, 2)), ((3, 6), (6, 5))])
+def test_block_and_unblock_edge_repair_only_affected_paths(edge):
+    model = model_with_user_nodes()
+    matrix = model.create_distance_matrix()
+    affected = sum(edge in zip(p[:-1], p[1:]) or edge[::-1] in zip(p[:-1], p[1:]) for p in model.path_cache.values())
+    assert model.block_edge(*edge) == affected
+    fresh = model_with_user_nodes()
+    fresh.graph.remove_edge(*edge)
+    assert model.create_distance_matrix() == fresh.create_distance_matrix()
+    model.unblock_edge(*edge)
+    assert model.create_distance_matrix() == matrix
+
+
+def test_block_node_keeps_unreachable_pairs_out_of_the_cache():
+    model = model_with_user_nodes()
+    model.create_distance_matrix()
+    model.block_node((2, 1))
+    # (2, 3) hangs off (2, 1) only
+    assert not any((2, 3) in pair and pair[0] != pair[1] for pair in model.path_cache)
+    model.unblock_node((2, 1))
+    assert model.create_distance_matrix() == model_with_user_nodes().create_distance_matrix()
+
+
+def test_blocking_a_node_twice_still_restores_it():
+    model = GraphModel(data_path="tests/data/graph.json")
+    model.block_node((2, 1))
+    assert model.block_node((2, 1)) == 0
+    model.unblock_node((2, 1))
+    assert set(model.graph.neighbors((2, 1))) == {(1, 4), (7, 2)}
+
+
+@pytest.mark.parametrize("first, second", [((2, 1), (1, 4)), ((1, 4), (2, 1))])
+def test_edges_between_blocked_nodes_stay_blocked_until_both_are_unblocked(first, second):
+    model = GraphModel(data_path="tests/data/graph.json")
+    model.block_node(first)
+    model.block_node(second)
+    model.unblock_node(first)
+    assert not model.graph.has_edge(first, second)
+    model.unblock_node(second)
+    assert model.graph.has_edge(first, second)
+    assert not model.blocked_edges and not model.blocked_nodes
+
+
+@pytest.mark.parametrize("edge", [((2, 1), (7, 2)), ((3, 6), (6, 5)), ((1, 4), (3, 6))])
+def test_unblock_edge_repairs_only_paths_it_shortens(edge):
+    model = model_with_user_nodes()
+    model.block_edge(*edge)
+    model.create_distance_matrix()
+    blocked_lengths = {pair: model.path_length(path) for pair, path in model.path_cache.items()}
+    fresh = model_with_user_nodes()
+    shortened = sum(model.path_length(fresh.path_between(*pair)) < length for pair, length in blocked_lengths.items())
+    assert model.unblock_edge(*edge) == shortened
+    assert model.create_distance_matrix() == fresh.create_distance_matrix()
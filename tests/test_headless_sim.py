@@ -0,0 +1,46 @@
+import json
+import numpy as np
+import pytest
+from headless_sim import load_pick_lists, random_pick_lists, run_missions, simulate_missions, summarize_missions
+from sim.utils import load_points
+
+
+@pytest.fixture
+def packages_path(tmp_path):
+    path = tmp_path / "packages.json"
+    path.write_text(json.dumps({"nodes": [[3, 3], [5, 4], [2, 3], [6, 2]]}))
+    return str(path)
+
+
+def test_run_missions_is_deterministic_and_completes(packages_path):
+    seed = np.random.SeedSequence(0)
+    stats = run_missions("test", "tests/data/graph.json", packages_path, 3, 2, seed)
+    again = run_missions("test", "tests/data/graph.json", packages_path, 3, 2, seed)
+    assert [s.distance for s in stats] == [s.distance for s in again]
+    assert all(s.picks == 2 and s.mission_time > 0 and s.distance > 0 for s in stats)
+
+    summary = summarize_missions(stats)
+    assert summary["all"]["missions"] == 3 and summary["all"]["picks"] == 6
+    assert summary["test"]["picks_per_hour"] == pytest.approx(6 / sum(s.mission_time for s in stats) * 3600)
+
+
+def test_load_pick_lists_streams_lines(tmp_path):
+    path = tmp_path / "picks.jsonl"
+    path.write_text("[[3, 3], [5, 4]]\n\n[[6, 2]]\n")
+    pick_lists = load_pick_lists(str(path))
+    assert next(pick_lists) == [(3, 3), (5, 4)]
+    assert list(pick_lists) == [[(6, 2)]]
+
+
+def test_simulate_missions_runs_given_pick_lists_in_order(packages_path):
+    pick_lists = [[(3, 3), (5, 4)], [(6, 2), (6, 2), (2, 3)], [(2, 3)]]
+    stats = simulate_missions("test", "tests/data/graph.json", iter(pick_lists))
+    assert [s.mission for s in stats] == [0, 1, 2]
+    assert [s.picks for s in stats] == [2, 2, 1]
+
+    seed = np.random.SeedSequence(0)
+    drawn = random_pick_lists(load_points(packages_path), 3, 2, np.random.default_rng(seed))
+    random_stats = run_missions("test", "tests/data/graph.json", packages_path, 3, 2, seed)
+    assert [s.distance for s in simulate_missions("test", "tests/data/graph.json", drawn)] == [
+        s.distance for s in random_stats
+    ]
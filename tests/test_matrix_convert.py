@@ -1,5 +1,6 @@
+import numpy as np
 import tsplib95
-from solvers.convert import convert_distance_matrix_to_string, render_tsplib_file
+from solvers.convert import convert_distance_matrix_to_string, render_tsplib_file, load_distance_matrix
 
 def test_matrix_conversion_to_string():
     matrix = [
@@ -12,3 +13,14 @@ def test_matrix_conversion_to_string():
     ]
     matrix_str = " 0 1 2 4 5 6\n 1 0 3 8 9 10\n 2 3 0 3 4 5\n 4 8 3 0 8 9\n 5 9 4 8 0 4\n 6 10 5 9 4 0\n"
     assert convert_distance_matrix_to_string(matrix) == matrix_str
+
+
+def test_render_tsplib_file_writes_binary_matrix(tmp_path):
+    matrix = [[0, 3, 4], [3, 0, 5], [4, 5, 0]]
+    tsplib_file = render_tsplib_file(
+        name="test", dimension=3, distance_matrix=np.array(matrix), output_dir=tmp_path
+    )
+    binary_matrix = load_distance_matrix(tsplib_file)
+    assert binary_matrix.dtype == np.int32
+    assert binary_matrix.tolist() == matrix
+    assert binary_matrix.tolist() == tsplib95.load(tsplib_file).edge_weights
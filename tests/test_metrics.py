@@ -0,0 +1,32 @@
+import json
+import pytest
+from sim.graph_model import GraphModel
+from sim.metrics import Metrics
+from sim.planner import plan_route
+
+
+def test_sections_are_recorded_as_rolling_percentiles_and_trace_events(tmp_path):
+    metrics = Metrics(window=3)
+    for duration in [0.004, 0.001, 0.002, 0.003]:
+        metrics.record("draw", 1.0, duration)
+    with metrics.section("tsp", "planning"):
+        pass
+    # only the last three samples are kept
+    assert metrics.percentiles("draw", (0, 50, 100)) == pytest.approx({0: 0.001, 50: 0.002, 100: 0.003})
+    assert metrics.percentiles("missing") == {}
+
+    metrics.export_chrome_trace(str(tmp_path / "trace.json"))
+    with open(tmp_path / "trace.json") as f:
+        events = json.load(f)["traceEvents"]
+    assert [e["name"] for e in events] == ["draw"] * 4 + ["tsp"]
+    assert events[0]["ph"] == "X" and events[0]["dur"] == pytest.approx(4000)
+
+
+def test_plan_route_records_planning_stages():
+    model = GraphModel(data_path="tests/data/graph.json")
+    for node in [(3, 3), (5, 4), (2, 3)]:
+        model.insert_node(node)
+    metrics = Metrics()
+    plan_route(model, metrics=metrics)
+    assert {e["name"] for e in metrics.events} == {"matrix", "tsp", "route"}
+    assert {e["cat"] for e in metrics.events} == {"planning"}
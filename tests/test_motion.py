@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from sim.control import RobotController
+from sim.entities import Robot
+from sim.motion import MotionProfile, Trajectory, route_duration
+
+PROFILE = MotionProfile(max_speed=100, acceleration=200)
+
+route_duration_test_sets = [
+    # 0.5 s accelerating, 0.5 s cruising and 0.5 s braking
+    ([(0, 0), (100, 0)], 1.5),
+    # too short to reach max_speed: accelerate over 10 px and brake over 10 px
+    ([(0, 0), (20, 0)], 2 * np.sqrt(0.1)),
+    # a straight junction does not slow down
+    ([(0, 0), (50, 0), (100, 0)], 1.5),
+    ([(0, 0), (0, 0)], 0.0),
+]
+
+
+@pytest.mark.parametrize("points, expected_duration", route_duration_test_sets)
+def test_route_duration(points, expected_duration):
+    assert route_duration(np.array(points), PROFILE) == pytest.approx(expected_duration)
+
+
+def test_trajectory_respects_profile():
+    trajectory = Trajectory(np.array([(0, 0), (100, 0), (100, 100), (100, 100), (0, 100)]), PROFILE)
+    t = np.linspace(0, trajectory.duration, 4001)
+    positions = trajectory.position_at(t)
+    speeds = np.hypot(*np.diff(positions, axis=0).T) / np.diff(t)
+    assert positions[-1] == pytest.approx((0, 100))
+    assert speeds.max() <= PROFILE.max_speed + 1e-6
+    # a right angle halves the speed
+    assert trajectory.speed_at(trajectory.leg_start_times[1]) == pytest.approx(50)
+
+
+def test_controller_follows_trajectory_in_time():
+    robot = Robot(0, 0, 5, 5)
+    controller = RobotController(robot, step_size=2, motion=PROFILE)
+    controller.push_new_instructions([(100, 0)])
+    elapsed = 0.0
+    while not controller.idle:
+        controller.update(0.01)
+        elapsed += 0.01
+    assert (robot.x, robot.y) == (100, 0)
+    assert elapsed == pytest.approx(1.5, abs=0.01)
+
+
+def test_controller_appends_without_stopping():
+    robot = Robot(0, 0, 5, 5)
+    controller = RobotController(robot, step_size=2, motion=PROFILE)
+    controller.push_new_instructions([(100, 0)])
+    controller.update(0.5)
+    controller.push_new_instructions([(200, 0)])
+    assert controller.trajectory.entry_speeds[0] == pytest.approx(100)
+    while not controller.idle:
+        controller.update(0.01)
+    assert (robot.x, robot.y) == (200, 0)
@@ -0,0 +1,94 @@
+import math
+import pytest
+from functools import partial
+from sim.constants import COLOR_MAP, Origin
+from sim.control import RobotController
+from sim.entities import Robot
+from sim.fleet import ReservationTable, Schedule, plan_fleet
+from sim.graph_model import GraphModel
+from sim.online import OnlineInserter, cheapest_insertion, two_opt
+
+cheapest_insertion_test_sets = [
+    ([(10, 0), (20, 0)], (5, 1), 0),
+    ([(10, 0), (20, 0)], (15, 1), 1),
+    ([(10, 0), (20, 0)], (30, 0), 2),
+    ([], (30, 0), 0),
+]
+
+
+@pytest.mark.parametrize("stops, node, expected_position", cheapest_insertion_test_sets)
+def test_cheapest_insertion(stops, node, expected_position):
+    assert cheapest_insertion((0, 0), stops, node, math.dist) == expected_position
+
+
+def test_two_opt_untangles_open_tour():
+    stops = [(20, 0), (10, 0), (30, 0), (40, 0)]
+    assert two_opt((0, 0), stops, math.dist) == [(10, 0), (20, 0), (30, 0), (40, 0)]
+    assert two_opt((0, 0), stops, math.dist, max_evaluations=0) == stops
+
+
+def test_online_insertion_splices_remaining_route():
+    model = GraphModel(data_path="tests/data/graph.json")
+    for node in [(1, 4), (5, 4)]:
+        model.insert_node(node)
+    robot = Robot(1, 4, 5, 5)
+    controller = RobotController(robot, step_size=1)
+    controller.push_new_instructions(model.route_through((1, 4), [(5, 4)]))
+    controller.move_robot()
+    before = controller.remaining_route()
+
+    OnlineInserter(model, controller).insert((8, 1))
+    after = controller.remaining_route()
+    assert after[0] == before[0]
+    assert (8, 1) in after
+    assert after[-1] == (5, 4) or after[-1] == (8, 1)
+    while not controller.idle:
+        controller.move_robot()
+    assert (robot.x, robot.y) == after[-1]
+
+
+def test_unreachable_stop_is_rejected():
+    model = GraphModel(data_path="tests/data/graph.json")
+    for node in [(1, 4), (5, 4)]:
+        model.insert_node(node)
+    controller = RobotController(Robot(1, 4, 5, 5), step_size=1)
+    controller.push_new_instructions(model.route_through((1, 4), [(5, 4)]))
+    route = controller.remaining_route()
+    # (8, 1) hangs off (7, 2), which is cut off from the rest of the graph
+    model.block_node((7, 2))
+    assert OnlineInserter(model, controller).insert((8, 1)) is None
+    assert (8, 1) not in model.graph and controller.remaining_route() == route
+
+
+def test_idle_robot_off_the_graph_does_not_become_a_stop():
+    model = GraphModel(data_path="tests/data/graph.json")
+    robot = Robot(3, 3, 5, 5)
+    controller = RobotController(robot, step_size=1)
+    assert OnlineInserter(model, controller).insert((5, 4)) is not None
+    assert model.list_nodes_from(Origin.USER_NODE) == [(5, 4)]
+    while not controller.idle:
+        controller.move_robot()
+    assert (robot.x, robot.y) == (5, 4)
+
+
+def test_insertion_into_a_fleet_schedule_keeps_it_reserved():
+    model = GraphModel(data_path="tests/data/graph.json")
+    plan = plan_fleet(model, [(2, 1), (6, 5)], [[(3, 6)], [(7, 2)]], speed=1, hold=0.5)
+    controllers = [RobotController(Robot(*start, 1, 1), step_size=1) for start in [(2, 1), (6, 5)]]
+    for controller, robot_schedule in zip(controllers, plan.robots):
+        controller.follow(robot_schedule.schedule)
+        controller.update(1.0)
+    for node in [(2, 1), (6, 5), (3, 6), (7, 2)]:
+        model.graph.nodes[node]["color"] = COLOR_MAP[Origin.USER_NODE]
+
+    splice = partial(plan.splice, 0, controllers[0], model)
+    assert OnlineInserter(model, controllers[0], splice=splice).insert((8, 1)) is not None
+    schedule = controllers[0].trajectory
+    assert isinstance(schedule, Schedule) and controllers[0].elapsed == 1.0
+    assert (8, 1) in controllers[0].remaining_route()
+    assert any(r == 0 for _, _, r in plan.reservations.intervals[ReservationTable.node((8, 1))])
+    # the schedule still starts where the robot started, so its position is continuous
+    assert tuple(schedule.points[0]) == (2, 1)
+    while not controllers[0].idle:
+        controllers[0].update(0.5)
+    assert (controllers[0].robot.x, controllers[0].robot.y) == tuple(schedule.points[-1])
@@ -0,0 +1,26 @@
+import json
+import shutil
+import pytest
+from pipeline_benchmark import STAGES, StageRecorder, find_regressions, run_pipeline
+
+
+def test_run_pipeline_times_every_stage(tmp_path):
+    graph_path = tmp_path / "visibility_graph.json"
+    shutil.copy("tests/data/graph.json", graph_path)
+    packages_path = tmp_path / "packages.json"
+    packages_path.write_text(json.dumps({"nodes": [[3, 3], [5, 4], [2, 3]]}))
+    recorder = StageRecorder(trace_memory=False)
+    run_pipeline(str(graph_path), str(packages_path), recorder)
+    assert tuple(recorder.times) == STAGES
+    assert all(t >= 0 for t in recorder.times.values())
+
+
+def test_find_regressions_reports_slower_or_larger_stages():
+    baseline = {"gen3": {"tsp": {"p50": 1.0, "peak_bytes": 100}, "route": {"p50": 1.0, "peak_bytes": 100}}}
+    results = {
+        "gen3": {"tsp": {"p50": 1.1, "peak_bytes": 130}, "route": {"p50": 1.3, "peak_bytes": 100}},
+        "gen4": {"tsp": {"p50": 9.0, "peak_bytes": 900}},
+    }
+    regressions = find_regressions(results, baseline, tolerance=0.2)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("gen3/tsp peak_bytes") and regressions[1].startswith("gen3/route p50")
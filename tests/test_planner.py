@@ -0,0 +1,63 @@
+import threading
+import time
+from sim.graph_model import GraphModel
+from sim.control import RobotController
+from sim.entities import Robot
+from sim.planner import BackgroundPlanner, replan_remaining
+
+
+def wait_for_plan(planner: BackgroundPlanner, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        plan = planner.poll()
+        if plan is not None:
+            return plan
+        time.sleep(0.01)
+    raise TimeoutError
+
+
+def test_plan_runs_on_a_snapshot():
+    model = GraphModel(data_path="tests/data/graph.json")
+    for node in [(3, 3), (5, 4), (2, 3)]:
+        model.insert_node(node)
+    version = model.version
+    planner = BackgroundPlanner()
+    planner.submit(model)
+    plan = wait_for_plan(planner)
+    assert set(plan.route) >= {(5, 4), (2, 3)} and plan.shortcut == plan.route
+    # colouring happened on the snapshot only, until the plan is applied
+    assert model.version == version
+    model.highlight_route(plan.route)
+    assert model.version == version + 1
+    assert planner.poll() is None and not planner.busy
+
+
+def test_newer_plan_supersedes_older_one():
+    release = threading.Event()
+    planner = BackgroundPlanner()
+    planner.executor.submit(release.wait)  # keeps the worker busy
+    model = GraphModel(data_path="tests/data/graph.json")
+    for node in [(3, 3), (5, 4)]:
+        model.insert_node(node)
+    planner.submit(model)
+    model.insert_node((2, 3))
+    planner.submit(model)
+    release.set()
+    plan = wait_for_plan(planner)
+    assert (2, 3) in plan.route
+    planner.shutdown()
+
+
+def test_replan_remaining_avoids_blocked_edge():
+    model = GraphModel(data_path="tests/data/graph.json")
+    robot = Robot(1, 4, 5, 5)
+    controller = RobotController(robot, step_size=1)
+    model.insert_node((5, 4))
+    controller.push_new_instructions([(2, 1), (7, 2), (6, 5), (5, 4)])
+    controller.move_robot()
+    model.block_edge((2, 1), (7, 2))
+    assert replan_remaining(model, controller)
+    assert controller.remaining_route() == [(2, 1), (1, 4), (3, 6), (6, 5), (5, 4)]
+    model.block_node((6, 5))
+    assert not replan_remaining(model, controller)
+    assert controller.remaining_route() == [(2, 1)]
@@ -0,0 +1,45 @@
+import json
+import pytest
+import numpy as np
+from geometry.render import render_graph, render_saved_graph, saved_layout_files
+
+POLYGONS = [[(0, 0), (0, 2), (2, 0)], [(5, 5), (5, 6), (6, 6), (6, 5)]]
+NODES = [(3, 3), (7, 7), (3, 7)]
+EDGES = [(0, 1), (1, 2)]
+PACKAGES = [(4, 4)]
+
+
+def save_layout(directory, extension: str) -> None:
+    if extension == "npz":
+        np.savez(
+            directory / "polygon-0-0.npz",
+            vertices=np.array([v for polygon in POLYGONS for v in polygon], dtype=np.int32),
+            polygon_ids=np.repeat(np.arange(len(POLYGONS), dtype=np.int32), [len(p) for p in POLYGONS]),
+        )
+        np.savez(
+            directory / "visibility_graph-0-0.npz",
+            nodes=np.array(NODES, dtype=np.int32),
+            edges=np.array(EDGES, dtype=np.int32),
+        )
+        np.savez(directory / "packages-0-0.npz", nodes=np.array(PACKAGES, dtype=np.int32))
+        return
+    (directory / "polygon-0-0.json").write_text(json.dumps(POLYGONS))
+    edges = [[NODES[start], NODES[end]] for start, end in EDGES]
+    (directory / "visibility_graph-0-0.json").write_text(json.dumps({"nodes": NODES, "edges": edges}))
+    (directory / "packages-0-0.json").write_text(json.dumps({"nodes": PACKAGES}))
+
+
+@pytest.mark.parametrize("extension", ["json", "npz"])
+def test_render_saved_layout(tmp_path, extension):
+    save_layout(tmp_path, extension)
+    polygon_file, graph_file, packages_file = saved_layout_files(str(tmp_path), "0-0")
+    assert polygon_file.endswith(extension)
+    render_saved_graph(polygon_file, graph_file, packages_file, save_file=str(tmp_path / "fig-0-0.png"))
+    assert (tmp_path / "fig-0-0.png").stat().st_size > 0
+
+
+def test_render_graph_without_obstacles(tmp_path):
+    save_file = tmp_path / "fig.png"
+    nodes = np.array(NODES, dtype=float)
+    render_graph([], nodes=nodes, edges=nodes[np.array(EDGES)], save_file=str(save_file))
+    assert save_file.stat().st_size > 0
@@ -0,0 +1,98 @@
+import os
+import shutil
+import socket
+import time
+import asyncio
+import threading
+import pytest
+from sim.graph_model import GraphModel
+from sim.service import PlanningClient, PlanningServer, is_listening
+from sim.waves import BaseDistances, solve_wave
+
+LAYOUT = "tests/data/graph.json"
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    path = str(tmp_path / "planner.sock")
+    server = PlanningServer(max_workers=1)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_until_complete, args=(server.serve(path),), daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield path
+    server.shutdown()
+
+
+def test_client_plans_waves_and_solves_matrices(socket_path):
+    client = PlanningClient(socket_path)
+    wave = [(1, 4), (5, 4), (8, 1)]
+    assert client.plan(LAYOUT, wave) == solve_wave(BaseDistances.from_model(GraphModel(LAYOUT)), wave)
+
+    model = GraphModel(data_path=LAYOUT, tsp_solver=client)
+    for node in wave:
+        model.insert_node(node)
+    assert set(wave[1:]) <= set(model.solve_tsp())
+    with pytest.raises(RuntimeError):
+        client.plan("tests/data/missing.json", wave)
+    client.close()
+
+
+def test_identical_requests_in_flight_are_coalesced():
+    server = PlanningServer(max_workers=1)
+    request = {"matrix": [[0, 2, 9], [2, 0, 3], [9, 3, 0]]}
+
+    async def solve_twice():
+        return await asyncio.gather(server.handle(request), server.handle(dict(request)))
+
+    first, second = asyncio.run(solve_twice())
+    server.shutdown()
+    assert first == second and first["tour"][0] == 0
+    assert server.coalesced == 1 and not server.in_flight
+
+
+def test_layouts_share_one_pool(socket_path, tmp_path):
+    copy = str(tmp_path / "copy.json")
+    shutil.copy(LAYOUT, copy)
+    client = PlanningClient(socket_path)
+    wave = [(1, 4), (5, 4), (8, 1)]
+    assert client.plan(copy, wave) == client.plan(LAYOUT, wave)
+    client.close()
+
+
+def test_serve_refuses_a_path_that_is_not_a_socket(tmp_path):
+    path = tmp_path / "planner.sock"
+    path.write_text("keep me")
+    server = PlanningServer(max_workers=1)
+    with pytest.raises(FileExistsError):
+        asyncio.run(server.serve(str(path)))
+    server.shutdown()
+    assert path.read_text() == "keep me"
+
+
+def test_serve_refuses_the_socket_of_a_running_server(socket_path):
+    server = PlanningServer(max_workers=1)
+    with pytest.raises(FileExistsError):
+        asyncio.run(server.serve(socket_path))
+    server.shutdown()
+    assert PlanningClient(socket_path)([[0, 1], [1, 0]]) == [0, 1]
+
+
+def test_serve_replaces_a_stale_socket(tmp_path):
+    path = str(tmp_path / "planner.sock")
+    socket.socket(socket.AF_UNIX, socket.SOCK_STREAM).bind(path)
+    server = PlanningServer(max_workers=1)
+
+    async def serve_briefly():
+        task = asyncio.ensure_future(server.serve(path))
+        while not task.done():
+            await asyncio.sleep(0.01)
+            if os.path.exists(path) and await asyncio.to_thread(is_listening, path):
+                task.cancel()
+        return task
+
+    asyncio.run(serve_briefly())
+    server.shutdown()
+    assert not os.path.exists(path)
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from geometry.visibility import ObstacleEdgeIndex
+from sim.shortcut import route_length, shortcut_route
+
+# a 10x10 block with its lower left corner at (10, 10)
+OBSTACLES = ObstacleEdgeIndex([np.array([(10, 10), (10, 20), (20, 20), (20, 10)])])
+
+# zig-zags along the bottom of the block and around its corner
+ROUTE = [(0, 5), (5, 2), (10, 4), (15, 2), (20, 4), (25, 2), (30, 5), (26, 15), (30, 25)]
+
+shortcut_route_test_sets = [
+    (0, (), [(0, 5), (30, 5), (30, 25)]),
+    # with clearance the route has to stay away from the bottom edge
+    (6, (), [(0, 5), (25, 2), (30, 25)]),
+    # stops are kept and never skipped
+    (0, [(20, 4)], [(0, 5), (20, 4), (30, 25)]),
+]
+
+
+@pytest.mark.parametrize("clearance, stops, expected_route", shortcut_route_test_sets)
+def test_shortcut_route(clearance, stops, expected_route):
+    route, saved = shortcut_route(ROUTE, OBSTACLES, clearance, stops)
+    assert route == expected_route
+    assert saved == pytest.approx(route_length(ROUTE) - route_length(expected_route))
+
+
+def test_shortcut_route_from_start():
+    route, saved = shortcut_route(ROUTE[1:], OBSTACLES, 0, start=ROUTE[0])
+    assert route == [(30, 5), (30, 25)] and saved > 0
@@ -0,0 +1,82 @@
+import sys
+import json
+import importlib.util
+import pytest
+from solvers.convert import save_distance_matrix
+
+MATRIX = [[0, 3, 4, 2], [3, 0, 5, 4], [4, 5, 0, 3], [2, 4, 3, 0]]
+# 1-2-3-4 is the optimal tour
+OPTIMUM = 13
+
+PROBLEM = """NAME: tiny
+TYPE: TSP
+DIMENSION: 4
+EDGE_WEIGHT_TYPE: EXPLICIT
+EDGE_WEIGHT_FORMAT: FULL_MATRIX
+EDGE_WEIGHT_SECTION
+ 0 3 4 2
+ 3 0 5 4
+ 4 5 0 3
+ 2 4 3 0
+EOF
+"""
+
+TOUR = """NAME: tiny.opt.tour
+TYPE: TOUR
+DIMENSION: 4
+TOUR_SECTION
+1
+2
+3
+4
+-1
+EOF
+"""
+
+
+@pytest.fixture(scope="module")
+def solver_benchmark():
+    # the solver benchmark imports its siblings as top-level modules, as when it is run from solvers/
+    sys.path.insert(0, "solvers")
+    spec = importlib.util.spec_from_file_location("solver_benchmark", "solvers/benchmark.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    yield module
+    sys.path.remove("solvers")
+
+
+@pytest.fixture
+def problem_path(tmp_path):
+    path = tmp_path / "tiny.tsp"
+    path.write_text(PROBLEM)
+    return str(path)
+
+
+def test_reference_comes_from_the_manifest(solver_benchmark, problem_path, tmp_path):
+    (tmp_path / "manifest.json").write_text(json.dumps({"tiny": {"optimum": 12}}))
+    assert solver_benchmark.load_reference(problem_path) == (12, True)
+
+
+def test_reference_comes_from_the_optimal_tour(solver_benchmark, problem_path, tmp_path):
+    (tmp_path / "tiny.opt.tour").write_text(TOUR)
+    assert solver_benchmark.load_reference(problem_path) == (OPTIMUM, True)
+
+
+@pytest.mark.parametrize("with_binary_matrix", [False, True])
+def test_reference_falls_back_to_the_lower_bound(solver_benchmark, problem_path, with_binary_matrix):
+    if with_binary_matrix:
+        save_distance_matrix(MATRIX, problem_path.replace(".tsp", ".npy"))
+    reference, is_optimal = solver_benchmark.load_reference(problem_path)
+    assert not is_optimal
+    assert 0.9 * OPTIMUM <= reference <= OPTIMUM
+
+
+def test_with_gap(solver_benchmark):
+    results = [
+        solver_benchmark.ExperimentResult(time=1.0, score=110, solver="a", problem="p"),
+        solver_benchmark.ExperimentResult(time=1.0, score=100, solver="b", problem="p"),
+    ]
+    with_gap = solver_benchmark.with_gap(results, 100, True)
+    assert [r.gap for r in with_gap] == [pytest.approx(10.0), 0.0]
+    assert all(r.reference == 100 and r.reference_is_optimal for r in with_gap)
+    assert [r.gap for r in solver_benchmark.with_gap(results, 0, False)] == [0.0, 0.0]
@@ -1,5 +1,6 @@
 import pytest
-from sim.utils import make_tuples_out_of_child_elements
+import numpy as np
+from sim.utils import load_graph_data, load_points, load_polygons, make_tuples_out_of_child_elements
 
 make_tuples_out_of_child_elements_test_sets = [
     ([[[1, 2], [3, 4]], [[5, 6], [8, 9]]], [[(1, 2), (3, 4)], [(5, 6), (8, 9)]]),
@@ -12,3 +13,24 @@ make_tuples_out_of_child_elements_test_sets = [
 def test_make_tuples_out_of_child_elements(input_list, expected_list):
     test_list = make_tuples_out_of_child_elements(input_list)
     assert test_list == expected_list
+
+
+def test_load_graph_data_from_npz_matches_json(tmp_path):
+    graph_data = load_graph_data("tests/data/graph.json")
+    index = {node: i for i, node in enumerate(graph_data["nodes"])}
+    edges = [(index[start], index[end]) for start, end in graph_data["edges"]]
+    np.savez(tmp_path / "graph.npz", nodes=np.array(graph_data["nodes"], dtype=np.int32), edges=np.array(edges, dtype=np.int32))
+    assert load_graph_data(str(tmp_path / "graph.npz")) == graph_data
+
+
+def test_load_points_and_polygons_from_npz(tmp_path):
+    points = [(1, 2), (3, 4)]
+    polygons = [[(0, 0), (0, 2), (2, 0)], [(5, 5), (5, 6), (6, 6), (6, 5)]]
+    np.savez(tmp_path / "packages.npz", nodes=np.array(points, dtype=np.int32))
+    np.savez(
+        tmp_path / "polygon.npz",
+        vertices=np.array([v for polygon in polygons for v in polygon], dtype=np.int32),
+        polygon_ids=np.array([0, 0, 0, 1, 1, 1, 1], dtype=np.int32),
+    )
+    assert load_points(str(tmp_path / "packages.npz")) == points
+    assert load_polygons(str(tmp_path / "polygon.npz")) == polygons
@@ -0,0 +1,90 @@
+import pytest
+import numpy as np
+from geometry.visibility import (
+    ObstacleEdgeIndex,
+    DisconnectedGraphError,
+    nearest_visible,
+    component_labels,
+    connect_components,
+)
+
+square = ObstacleEdgeIndex([np.array([(2, 2), (4, 2), (4, 4), (2, 4)])])
+
+visible_from_test_sets = [
+    ((0, 3), (6, 3), False),
+    ((0, 0), (6, 0), True),
+    ((0, 2), (6, 2), True),
+    ((0, 1), (6, 5), False),
+    ((0, 6), (6, 6), True),
+    ((2, 2), (4, 4), False),
+    ((2, 2), (4, 2), True),
+    ((0, 0), (8, 8), False),
+    ((0, 0), (2, 2), True),
+    ((0, 4), (6, 4), True),
+]
+
+
+@pytest.mark.parametrize("origin, target, expected_visibility", visible_from_test_sets)
+def test_visible_from(origin, target, expected_visibility):
+    assert square.visible_from(np.array(origin), np.array([target]))[0] == expected_visibility
+
+
+@pytest.mark.parametrize("target, expected_visibility", [((10, 2), False), ((10, 14), True), ((2, -2), True)])
+def test_visible_from_through_diamond_vertices(target, expected_visibility):
+    diamond = ObstacleEdgeIndex([np.array([(0, 2), (2, 0), (4, 2), (2, 4)])])
+    assert diamond.visible_from(np.array((-2, 2)), np.array([target]))[0] == expected_visibility
+
+
+def test_nearest_visible_skips_hidden_points():
+    coords = np.array([(1, 3), (5, 3), (1, 0), (1, 6), (0, 3)], dtype=float)
+    assert nearest_visible(0, coords, k=3, obstacles=square, batch_size=1) == [4, 2, 3]
+
+
+def test_contains():
+    points = np.array([(3, 3), (5, 3), (2, 3), (4, 4), (1, 1)])
+    assert square.contains(points).tolist() == [True, False, True, True, False]
+    assert square.contains(points, include_boundary=False).tolist() == [True, False, False, False, False]
+
+
+def test_contains_single_point():
+    assert square.contains(np.array([(3, 3)])).tolist() == [True]
+
+
+def test_connect_components_links_nearest_visible_pair():
+    coords = np.array([(0, 3), (1, 3), (6, 3), (7, 3), (3, 0)], dtype=float)
+    edges = connect_components(coords, np.array([(0, 1), (2, 3)]), square)
+    assert len(set(component_labels(len(coords), edges))) == 1
+    assert {frozenset(e) for e in edges.tolist()} == {
+        frozenset((0, 1)), frozenset((2, 3)), frozenset((1, 4)), frozenset((2, 4))
+    }
+
+
+def test_connect_components_fails_for_enclosed_points():
+    coords = np.array([(0, 3), (3, 3)], dtype=float)
+    with pytest.raises(DisconnectedGraphError):
+        connect_components(coords, np.empty((0, 2), dtype=int), square)
+
+
+def test_save_and_load(tmp_path):
+    save_file = str(tmp_path / "obstacles.npz")
+    square.save(save_file)
+    loaded = ObstacleEdgeIndex.load(save_file)
+    assert [p.tolist() for p in loaded.polygons] == [p.tolist() for p in square.polygons]
+
+
+@pytest.mark.parametrize("clearance, expected", [(0, [True, True]), (3, [False, True])])
+def test_visible_from_with_clearance(clearance, expected):
+    obstacles = ObstacleEdgeIndex([np.array([(0, 0), (0, 10), (10, 10), (10, 0)])])
+    visible = obstacles.visible_from(np.array((-5, -2)), np.array([(15, -2), (-5, 15)]), clearance)
+    assert visible.tolist() == expected
+
+
+def test_contains_on_a_warehouse_sized_layout():
+    # 2500 racks of 4x2 on a 10 unit grid, about the size of a 71x71 generated layout
+    corners = np.stack(np.meshgrid(np.arange(50) * 10, np.arange(50) * 10), axis=-1).reshape(-1, 1, 2)
+    racks = corners + np.array([(0, 0), (4, 0), (4, 2), (0, 2)])
+    obstacles = ObstacleEdgeIndex(list(racks))
+    points = np.random.default_rng(0).random((4096, 2)) * 500
+    offsets = points % 10
+    expected = (offsets[:, 0] <= 4) & (offsets[:, 1] <= 2)
+    assert obstacles.contains(points).tolist() == expected.tolist()
@@ -0,0 +1,41 @@
+import pytest
+from sim.constants import Origin
+from sim.graph_model import GraphModel
+from sim.waves import BaseDistances, plan_waves, solve_wave
+
+waves_test_sets = [
+    [(1, 4), (5, 4), (8, 1)],
+    [(3, 3), (5, 4), (2, 3), (7, 2)],
+    [(2, 1), (8, 1), (3, 7), (5, 4)],
+]
+
+
+@pytest.mark.parametrize("wave", waves_test_sets)
+def test_distance_matrix_matches_graph_model(wave):
+    model = GraphModel(data_path="tests/data/graph.json")
+    base = BaseDistances.from_model(model)
+    for node in wave:
+        model.insert_node(node)
+    # base nodes among the points keep their place in the model's node order
+    nodes = model.list_nodes_from(origin=Origin.USER_NODE)
+    assert base.distance_matrix(nodes).tolist() == model.create_distance_matrix()
+
+
+@pytest.mark.parametrize("wave", waves_test_sets)
+def test_wave_route_visits_every_point_over_the_graph(wave):
+    model = GraphModel(data_path="tests/data/graph.json")
+    base = BaseDistances.from_model(model)
+    plan = solve_wave(base, wave)
+    assert plan.order[0] == wave[0] and set(plan.order) == set(wave)
+    assert set(wave[1:]) <= set(plan.route)
+    for n1, n2 in zip([wave[0]] + plan.route[:-1], plan.route):
+        assert model.graph.has_edge(n1, n2) or base.nodes[base.anchor(n1)] == n2 or base.nodes[base.anchor(n2)] == n1
+
+
+def test_waves_are_planned_in_a_pool_without_changing_the_model():
+    model = GraphModel(data_path="tests/data/graph.json")
+    version = model.version
+    plans = plan_waves(model, waves_test_sets, max_workers=2)
+    base = BaseDistances.from_model(model)
+    assert plans == [solve_wave(base, wave) for wave in waves_test_sets]
+    assert model.version == version and not model.list_nodes_from(origin=Origin.USER_NODE)